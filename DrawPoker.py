@@ -1,18 +1,24 @@
 ##drawPoker.py
-import os
 import sys
 import threading
 from decimal import Decimal, ROUND_HALF_UP
 
 import pygame
 import pygame_gui
-import json
-from getCardCoords import get_card_coordinates
-from dealCard import deal_card as original_deal_card
+from getCardCoords import get_card_coordinates, CARD_BACK
+from dealCard import deal_card as original_deal_card, deal_card_from
+from cards import card_bit, card_name, make_card
 import pygame.mixer
 from collections import deque
-from pokerHandEvaluator import evaluate_hand
-from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
+from functools import lru_cache
+from pokerEngine import DBL_UP, DEAL, NEW_GAME, DrawPokerEngine, sequential_card_source
+from dealingService import DealingService, HandPrefetcher
+from eventLog import EventLog
+from assetManager import AssetManager
+from balanceTracker import BalanceTracker
+from uiTimeline import Timeline
+from payTable import pay_table
+from rpcClient import JSONRPCException, get_rpc_client
 
 from cashOut import send_lucky
 from buyIn import process_transaction
@@ -23,38 +29,28 @@ pygame.init()
 # Initialize Pygame mixer
 pygame.mixer.init()
 
-# Load the shuffling sound
-shuffling_sound = pygame.mixer.Sound("./data/shuffling-cards-4.mp3")
-
 # Set up the display
 WINDOW_WIDTH = 1000
 WINDOW_HEIGHT = 700
 screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 pygame.display.set_caption("Five Card Draw Poker")
 
-# Load the sprite sheet
-sprite_sheet = pygame.image.load("./data/cardDeck.png").convert_alpha()
-
-# Embed the JSON pay table
-pay_table_json = '''
-{
-  "PayTable": {
-    "RoyalFlush": [250, 500, 750, 1000, 4000],
-    "StraightFlush": [50, 100, 150, 200, 250],
-    "FourOfAKind": [25, 50, 75, 100, 125],
-    "FullHouse": [8, 16, 24, 32, 40],
-    "Flush": [5, 10, 15, 20, 25],
-    "Straight": [4, 8, 12, 16, 20],
-    "ThreeOfAKind": [3, 6, 9, 12, 15],
-    "TwoPair": [2, 4, 6, 8, 10],
-    "JacksOrBetter": [1, 2, 3, 4, 5]
-  }
-}
-'''
-pay_table = json.loads(pay_table_json)["PayTable"]
+# Files under data/ the game uses, decoded in bulk on a background thread at startup
+SPRITE_SHEET = "cardDeck.png"
+SHUFFLE_SOUND = "shuffling-cards-4.mp3"
+WALLET_BUTTON_IMAGE = "wallet.png"
+PRELOAD_MANIFEST = [SPRITE_SHEET, SHUFFLE_SOUND, WALLET_BUTTON_IMAGE]
+
+assets = AssetManager()
+assets.preload(PRELOAD_MANIFEST)
+
+def play_sound(name):
+    sound = assets.sound(name)
+    if sound is not None:
+        sound.play()
 
-# Get the coordinates for the back of the card
-back_coords = get_card_coordinates("Back")
+# Load the sprite sheet
+sprite_sheet = assets.image(SPRITE_SHEET)
 
 # Define the size of each card in the sprite sheet
 CARD_WIDTH = 148
@@ -65,30 +61,19 @@ SCALE_FACTOR = WINDOW_WIDTH / (8 * CARD_WIDTH)
 SCALED_CARD_WIDTH = int(CARD_WIDTH * SCALE_FACTOR)
 SCALED_CARD_HEIGHT = int(CARD_HEIGHT * SCALE_FACTOR)
 
-# Create a surface for the card back
-card_back = pygame.Surface((CARD_WIDTH, CARD_HEIGHT), pygame.SRCALPHA)
-card_back.blit(sprite_sheet, (0, 0), (*back_coords, CARD_WIDTH, CARD_HEIGHT))
-
-# Scale the card to fit the window (make it slightly smaller)
+# Scale the card to fit the window (make it slightly smaller); card surfaces are
+# scaled once to this size by get_scaled_card
 SCALED_CARD_WIDTH = int(WINDOW_WIDTH / 8)
 SCALED_CARD_HEIGHT = int(SCALED_CARD_WIDTH * (CARD_HEIGHT / CARD_WIDTH))
-scaled_card = pygame.transform.smoothscale(card_back, (SCALED_CARD_WIDTH, SCALED_CARD_HEIGHT))
-
-# Global variables
-credits = 0  # Starting credits
-current_bet = 1
-max_bet = 5
-held_cards = [False] * 5
-game_state = "NEW_GAME"  # Can be "NEW_GAME", "DEAL", or "DBL_UP"
-current_win = 0
-dbl_choice = None  # Store the player's double-up choice
-drawn_card = None  # Initialize drawn_card to None
+
+# Global variables (the game itself lives in `engine`, below)
 player_address = None
 player_balance = None
 buy_in_total = 0
 win_differential = 0
 player_pool_address = "<player pool address>"
-player_pool_balance = Decimal('0')
+# Pool balance, refreshed from the node on a background thread (see balanceTracker.py)
+pool_balance_tracker = BalanceTracker([player_pool_address])
 
 # Define a refined color palette
 COLORS = {
@@ -101,136 +86,248 @@ COLORS = {
     'table_bg': (25, 25, 50)  # Darker navy blue
 }
 
-# Add this variable to store the current hand
-current_hand = [None] * 5
+# Fonts by (name, size, bold), loaded once; name None is pygame's default font
+@lru_cache(maxsize=None)
+def get_font(name, size, bold=False):
+    if name is None:
+        return pygame.font.Font(None, size)
+    return pygame.font.SysFont(name, size, bold=bold)
+
+# Rendered text surfaces by (font, text, color). Labels are redrawn every frame but
+# rarely change, so most renders are cache hits; the bound keeps changing texts
+# (credits, balances) from piling up. Callers only blit the shared surfaces.
+TEXT_CACHE_SIZE = 512
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(font, text, color):
+    return font.render(text, True, color)
 
 # Add these global variables
-cards_drawn = ['Joker 1', 'Joker 2']
 MAX_DRAW_ATTEMPTS = 100  # To prevent infinite loops
-
-# Modify the deal_card function to use the cards_drawn list
-def deal_card():
-    global cards_drawn
+# Draw each card directly from the cards left in the deck (one bounded draw per card).
+# False falls back to drawing from the whole deck and retrying on duplicates.
+SAMPLE_FROM_REMAINING = True
+
+# One card from the bitmask of cards still in the deck
+def deal_from_remaining(remaining):
+    if SAMPLE_FROM_REMAINING:
+        return deal_card_from(remaining)
     attempts = 0
     while attempts < MAX_DRAW_ATTEMPTS:
         card = original_deal_card()  # Rename the original deal_card function to original_deal_card
-        if card not in cards_drawn:
-            cards_drawn.append(card)
+        if remaining & card_bit(card):
             return card
         attempts += 1
     raise RuntimeError("Unable to draw a unique card after multiple attempts")
 
-# Modify the deal_initial_hand function
+# The game state machine; this module draws it and turns clicks into engine calls
+engine = DrawPokerEngine(sequential_card_source(deal_from_remaining), pay_table)
+
+# Cards are dealt on a worker thread and arrive as a CARDS_DEALT event, so the window
+# keeps drawing (card backs in the meantime) while the node answers
+CARDS_DEALT = pygame.event.custom_type()
+dealing_service = DealingService(lambda result: pygame.event.post(pygame.event.Event(CARDS_DEALT, result)), deal_from_remaining)
+pending_deal = None  # Id of the dealing request in flight, if any
+
+def request_cards(purpose, count):
+    global pending_deal
+    pending_deal = dealing_service.request(purpose, count, engine.drawn)
+
+# Hand events, written to disk once per finished hand
+event_log = EventLog()
+
+# The next hand's cards are dealt ahead while the player is idle in NEW_GAME
+hand_prefetcher = HandPrefetcher(deal_from_remaining)
+hand_reservation = None  # The prefetched cards of the hand in play, if it was prefetched
+
+# Messages, overlays and the double up reveal are timed states on this timeline, which
+# the main loop advances every frame, so showing one never stops event handling
+MESSAGE_MS = 2000
+OVERLAY_MS = 2000
+BUYIN_ERROR_MS = 3000
+DOUBLE_UP_REVEAL_MS = 1000
+timeline = Timeline(pygame.time.get_ticks)
+
+# Start a hand: the prefetched cards if they are ready, else a dealing request
 def deal_initial_hand():
-    global credits, current_bet, game_state, cards_drawn
-    if credits >= current_bet:
-        credits -= current_bet
-        shuffling_sound.play()
-        cards_drawn.clear()
-        cards_drawn.extend(['Joker 1', 'Joker 2'])  # Reset the drawn cards, keeping jokers out
-        hand = [deal_card() for _ in range(5)]
-        return hand
+    global hand_reservation
+    engine.begin_hand()
+    play_sound(SHUFFLE_SOUND)
+    hand_reservation = hand_prefetcher.take()
+    if hand_reservation is not None:
+        engine.deal(hand_reservation.cards[:5])
+        log_dealt_hand()
     else:
-        display_message("Not enough credits!")  # Use display_message here
-        return None
-
-# Add a function to reset the game
-def reset_game():
-    global current_hand, held_cards, cards_drawn, drawn_card, dbl_choice
-    current_hand = [None] * 5
-    held_cards = [False] * 5
-    drawn_card = None
-    dbl_choice = None
-    cards_drawn.clear()
-    cards_drawn.extend(['Joker 1', 'Joker 2'])
+        request_cards("deal", 5)  # Face down until the cards arrive
 
 # Modify the handle_game_buttons function
 def handle_game_buttons(pos, main_button_rect, double_up_rect, dbl_draw_button_rect, take_win_rect):
-    global game_state, held_cards, dbl_choice, credits, current_win, current_hand
-    if main_button_rect.collidepoint(pos):
-        if game_state in ["NEW_GAME", "DBL_UP"]:
-            if credits == 0:
-                display_message("Add Credits To Play")
-            else:
-                reset_game()
-                current_hand = deal_initial_hand()
-                if current_hand:
-                    credits += current_win
-                    game_state = "DEAL"
-                    current_win = 0
+    if pending_deal is not None:
+        return  # Wait for the cards in flight
+    try:
+        if main_button_rect.collidepoint(pos):
+            if engine.state in [NEW_GAME, DBL_UP]:
+                deal_initial_hand()
+            elif engine.state == DEAL:
+                # Replace the cards that are not held; they stay face down until the draw arrives
+                replaced = engine.begin_draw()
+                if hand_reservation is not None:
+                    # Replacements come from the prefetched cards, in the order they were dealt
+                    finish_draw(hand_reservation.cards[5:5 + len(replaced)])
                 else:
-                    display_message("Not enough credits!")  # Use display_message here
-        elif game_state == "DEAL":
-            # Replace held cards
-            for i in range(5):
-                if not held_cards[i]:
-                    current_hand[i] = deal_card()
-            # Evaluate the hand and update the win
-            hand_ranking = evaluate_hand(current_hand)
-            if hand_ranking in pay_table:
-                current_win = pay_table[hand_ranking][current_bet - 1]
-            else:
-                current_win = 0
-            game_state = "NEW_GAME"
-    elif double_up_rect and double_up_rect.collidepoint(pos) and game_state == "NEW_GAME" and current_win > 0:
-        game_state = "DBL_UP"
-        reset_game()  # Reset variables specific to double up
-    elif take_win_rect and take_win_rect.collidepoint(pos) and game_state == "NEW_GAME" and current_win > 0:
-        credits += current_win
-        current_win = 0
+                    request_cards("draw", len(replaced))
+        elif double_up_rect and double_up_rect.collidepoint(pos) and engine.state == NEW_GAME and engine.win > 0:
+            engine.enter_double_up()
+        elif take_win_rect and take_win_rect.collidepoint(pos):
+            engine.take_win()
+    except ValueError as e:
+        display_message(str(e))
+
+def log_dealt_hand():
+    if hand_reservation is None:
+        event_log.record("deal", cards=[card_name(card) for card in engine.hand], bet=engine.bet, prefetched=False)
+        return
+    # Publish the commitment to all ten cards before the hand is shown; the reveal
+    # follows after the draw
+    event_log.record("deal", cards=[card_name(card) for card in engine.hand], bet=engine.bet, prefetched=True,
+                     commitment=hand_reservation.commitment)
+    event_log.flush()
+
+def finish_draw(replacements):
+    # Score the hand with its replacements and log it
+    global hand_reservation
+    engine.finish_draw(replacements)
+    fields = {}
+    if hand_reservation is not None:
+        # Publish what was committed so the hand can be checked against the deal's commitment
+        fields = {"reveal": hand_reservation.reveal()}
+        hand_reservation = None
+    event_log.record("hand", cards=[card_name(card) for card in engine.hand], held=list(engine.held),
+                     ranking=engine.ranking, bet=engine.bet, win=engine.win, **fields)
+    event_log.flush()
+
+def handle_cards_dealt(event):
+    global pending_deal
+    if event.request_id != pending_deal:
+        return  # Left over from a request the game no longer waits for
+    pending_deal = None
+    if event.error is not None:
+        if event.purpose == "deal":
+            # Nothing was dealt, so give the bet back
+            engine.cancel_hand()
+            display_message("Dealing failed, bet refunded")
+        else:
+            display_message("Dealing failed, please try again")
+        return
+
+    if event.purpose == "deal":
+        engine.deal(event.cards)
+        log_dealt_hand()
+    elif event.purpose == "draw":
+        finish_draw(event.cards)
+    elif event.purpose == "double_up":
+        settle_double_up(event.cards[0])
 
 def get_current_hand_ranking():
-    if game_state in ["NEW_GAME", "DEAL"] and all(current_hand):
-        return evaluate_hand(current_hand)
+    # Computed by the engine once per change of the hand
+    if engine.state in [NEW_GAME, DEAL]:
+        return engine.ranking
     return None
 
-def draw_pay_table(current_hand_ranking=None):
-    font = pygame.font.SysFont('Arial', 22, bold=True)
-    first_col_width = 180
-    other_col_width = 90
-    cell_height = 30
+# Pay table layout, in pixels
+PAY_TABLE_FIRST_COL_WIDTH = 180
+PAY_TABLE_OTHER_COL_WIDTH = 90
+PAY_TABLE_CELL_HEIGHT = 30
+PAY_TABLE_TOP = 20
+
+def render_pay_table(surface, current_hand_ranking=None, highlight_bet=None):
+    # Draw the whole pay table at the surface's origin, with the ranking's row and the
+    # bet's column highlighted (either may be None)
+    font = get_font('Arial', 22, bold=True)
+    first_col_width = PAY_TABLE_FIRST_COL_WIDTH
+    other_col_width = PAY_TABLE_OTHER_COL_WIDTH
+    cell_height = PAY_TABLE_CELL_HEIGHT
     table_width = first_col_width + 5 * other_col_width
     table_height = cell_height * (len(pay_table) + 1)
-    start_x = (WINDOW_WIDTH - table_width) // 2
-    start_y = 20
+    start_x = 0
+    start_y = 0
 
     # Draw background for the pay table
-    pygame.draw.rect(screen, COLORS['table_bg'], (start_x, start_y, table_width, table_height))
+    pygame.draw.rect(surface, COLORS['table_bg'], (start_x, start_y, table_width, table_height))
 
     # Draw column headers
     headers = ["", "1 Coin", "2 Coins", "3 Coins", "4 Coins", "5 Coins"]
     for i, header in enumerate(headers):
         x = start_x + (first_col_width if i == 0 else first_col_width + (i - 1) * other_col_width)
-        text = font.render(header, True, COLORS['highlight'])
+        text = render_text(font, header, COLORS['highlight'])
         text_rect = text.get_rect(center=(x + (first_col_width if i == 0 else other_col_width) // 2, start_y + cell_height // 2))
-        screen.blit(text, text_rect)
+        surface.blit(text, text_rect)
 
     # Draw pay table rows
     for i, (hand, payouts) in enumerate(pay_table.items()):
         y = start_y + (i + 1) * cell_height
         row_color = COLORS['highlight'] if hand == current_hand_ranking else COLORS['text']
-        text = font.render(hand, True, row_color)
+        text = render_text(font, hand, row_color)
         text_rect = text.get_rect(midleft=(start_x + 5, y + cell_height // 2))
-        screen.blit(text, text_rect)
+        surface.blit(text, text_rect)
         for j, payout in enumerate(payouts):
             x = start_x + first_col_width + j * other_col_width
-            if j + 1 == current_bet:
-                pygame.draw.rect(screen, COLORS['highlight'], (x, y, other_col_width, cell_height))
-            text = font.render(str(payout), True, COLORS['table_bg'] if j + 1 == current_bet else row_color)
+            if j + 1 == highlight_bet:
+                pygame.draw.rect(surface, COLORS['highlight'], (x, y, other_col_width, cell_height))
+            text = render_text(font, str(payout), COLORS['table_bg'] if j + 1 == highlight_bet else row_color)
             text_rect = text.get_rect(center=(x + other_col_width // 2, y + cell_height // 2))
-            screen.blit(text, text_rect)
+            surface.blit(text, text_rect)
 
     # Draw grid lines
     for i in range(len(pay_table) + 2):
         y = start_y + i * cell_height
-        pygame.draw.line(screen, COLORS['grid'], (start_x, y), (start_x + table_width, y))
-    pygame.draw.line(screen, COLORS['grid'], (start_x, start_y), (start_x, start_y + table_height))
-    pygame.draw.line(screen, COLORS['grid'], (start_x + first_col_width, start_y), (start_x + first_col_width, start_y + table_height))
+        pygame.draw.line(surface, COLORS['grid'], (start_x, y), (start_x + table_width, y))
+    pygame.draw.line(surface, COLORS['grid'], (start_x, start_y), (start_x, start_y + table_height))
+    pygame.draw.line(surface, COLORS['grid'], (start_x + first_col_width, start_y), (start_x + first_col_width, start_y + table_height))
     for i in range(1, 6):
         x = start_x + first_col_width + i * other_col_width
-        pygame.draw.line(screen, COLORS['grid'], (x, start_y), (x, start_y + table_height))
+        pygame.draw.line(surface, COLORS['grid'], (x, start_y), (x, start_y + table_height))
+
+# Pre-rendered pay table: the plain table, plus one strip per highlighted row and per
+# bet column to paste over it. Rebuilt when the pay table's contents change.
+pay_table_layers = {'key': None}
+
+def get_pay_table_layers():
+    key = tuple((hand, tuple(payouts)) for hand, payouts in pay_table.items())
+    if pay_table_layers['key'] != key:
+        table_width = PAY_TABLE_FIRST_COL_WIDTH + 5 * PAY_TABLE_OTHER_COL_WIDTH
+        table_height = PAY_TABLE_CELL_HEIGHT * (len(pay_table) + 1)
+        # One pixel wider and taller for the closing grid lines; transparent outside the table
+        size = (table_width + 1, table_height + 1)
+
+        def rendered(current_hand_ranking=None, highlight_bet=None):
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            render_pay_table(surface, current_hand_ranking, highlight_bet)
+            return surface
+
+        rows = {}
+        for i, hand in enumerate(pay_table):
+            rect = pygame.Rect(0, (i + 1) * PAY_TABLE_CELL_HEIGHT, table_width, PAY_TABLE_CELL_HEIGHT)
+            rows[hand] = (rendered(current_hand_ranking=hand).subsurface(rect).copy(), rect.topleft)
+        columns = {}
+        for bet in range(1, engine.max_bet + 1):
+            rect = pygame.Rect(PAY_TABLE_FIRST_COL_WIDTH + (bet - 1) * PAY_TABLE_OTHER_COL_WIDTH, PAY_TABLE_CELL_HEIGHT,
+                               PAY_TABLE_OTHER_COL_WIDTH, table_height - PAY_TABLE_CELL_HEIGHT)
+            columns[bet] = (rendered(highlight_bet=bet).subsurface(rect).copy(), rect.topleft)
+        pay_table_layers.update(key=key, base=rendered(), rows=rows, columns=columns)
+    return pay_table_layers
 
-    return start_y + table_height
+def draw_pay_table(current_hand_ranking=None):
+    layers = get_pay_table_layers()
+    start_x = (WINDOW_WIDTH - (PAY_TABLE_FIRST_COL_WIDTH + 5 * PAY_TABLE_OTHER_COL_WIDTH)) // 2
+    start_y = PAY_TABLE_TOP
+    screen.blit(layers['base'], (start_x, start_y))
+    # The row first, so the bet column's highlighted cell stays on top where they cross
+    for layer in (layers['rows'].get(current_hand_ranking), layers['columns'].get(engine.bet)):
+        if layer is not None:
+            surface, (x, y) = layer
+            screen.blit(surface, (start_x + x, start_y + y))
+    return start_y + PAY_TABLE_CELL_HEIGHT * (len(pay_table) + 1)
 
 def draw_cards(cards, y_position):
     total_width = 5 * SCALED_CARD_WIDTH + 4 * 10  # 10px gap between cards
@@ -240,25 +337,17 @@ def draw_cards(cards, y_position):
     card_positions = []
     for i, card in enumerate(cards):
         x = start_x + i * (SCALED_CARD_WIDTH + 10)
-        if card:
+        if card is not None:
             card_image = get_card_image(card)
         else:
-            card_image = scaled_card  # This is the back of the card
+            card_image = get_card_back_image()
         screen.blit(card_image, (x, y))
         card_positions.append(pygame.Rect(x, y, SCALED_CARD_WIDTH, SCALED_CARD_HEIGHT))
 
-    # Print the cards in the hand and their rank
-    if all(cards):
-        hand_str = ", ".join(cards)
-        rank = evaluate_hand(cards)
-        print(f"Current hand: {hand_str}", file=sys.stderr)
-        print(f"Hand rank: {rank}", file=sys.stderr)
-        print("------------------------", file=sys.stderr)
-
     return card_positions
 
 def draw_hold_buttons(card_positions):
-    font = pygame.font.SysFont('Arial', 24, bold=True)
+    font = get_font('Arial', 24, bold=True)
     button_width = SCALED_CARD_WIDTH
     button_height = 40
     button_y_offset = 10
@@ -269,16 +358,16 @@ def draw_hold_buttons(card_positions):
         button_y = card_rect.y + SCALED_CARD_HEIGHT + button_y_offset
         button_rect = pygame.Rect(button_x, button_y, button_width, button_height)
 
-        if held_cards[i]:
+        if engine.held[i]:
             pygame.draw.rect(screen, COLORS['highlight'], button_rect, border_radius=5)
-            text = font.render("HELD", True, COLORS['table_bg'])
+            text = render_text(font, "HELD", COLORS['table_bg'])
         else:
-            if game_state == "DEAL":
+            if engine.state == DEAL:
                 pygame.draw.rect(screen, COLORS['button'], button_rect, border_radius=5)
-                text = font.render("HOLD", True, COLORS['button_text'])
+                text = render_text(font, "HOLD", COLORS['button_text'])
             else:
                 pygame.draw.rect(screen, COLORS['grid'], button_rect, border_radius=5)
-                text = font.render("HOLD", True, COLORS['text'])
+                text = render_text(font, "HOLD", COLORS['text'])
 
         text_rect = text.get_rect(center=button_rect.center)
         screen.blit(text, text_rect)
@@ -287,36 +376,38 @@ def draw_hold_buttons(card_positions):
     return hold_buttons
 
 def handle_hold_buttons(pos, hold_buttons, card_positions):
-    global held_cards
-    if game_state == "DEAL":
+    if engine.state == DEAL and pending_deal is None:
         for i, (button_rect, card_rect) in enumerate(zip(hold_buttons, card_positions)):
             if button_rect.collidepoint(pos) or card_rect.collidepoint(pos):
-                held_cards[i] = not held_cards[i]
+                engine.toggle_hold(i)
                 break
 
 def draw_credits():
-    font = pygame.font.SysFont('Arial', 28, bold=True)
-    credits_text = font.render(f"Credits: {credits}", True, COLORS['text'])
+    font = get_font('Arial', 28, bold=True)
+    credits_text = render_text(font, f"Credits: {engine.credits}", COLORS['text'])
     credits_rect = credits_text.get_rect()
     credits_rect.bottomright = (WINDOW_WIDTH - 20, WINDOW_HEIGHT - 70)
     screen.blit(credits_text, credits_rect)
+    return credits_rect
 
 def draw_bet():
-    font = pygame.font.SysFont('Arial', 28, bold=True)
-    bet_text = font.render(f"Bet: {current_bet}", True, COLORS['text'])
+    font = get_font('Arial', 28, bold=True)
+    bet_text = render_text(font, f"Bet: {engine.bet}", COLORS['text'])
     bet_rect = bet_text.get_rect()
     bet_rect.bottomleft = (20, WINDOW_HEIGHT - 70)
     screen.blit(bet_text, bet_rect)
+    return bet_rect
 
 def draw_win():
-    font = pygame.font.SysFont('Arial', 28, bold=True)
-    win_text = font.render(f"Win: {current_win}", True, COLORS['text'])
+    font = get_font('Arial', 28, bold=True)
+    win_text = render_text(font, f"Win: {engine.win}", COLORS['text'])
     win_rect = win_text.get_rect()
     win_rect.bottomleft = (150, WINDOW_HEIGHT - 70)  # Adjusted x-coordinate
     screen.blit(win_text, win_rect)
+    return win_rect
 
 def draw_bet_buttons():
-    font = pygame.font.SysFont('Arial', 24, bold=True)
+    font = get_font('Arial', 24, bold=True)
     button_width = 30
     button_height = 30
     button_y = WINDOW_HEIGHT - 60
@@ -324,7 +415,7 @@ def draw_bet_buttons():
     minus_rect = pygame.Rect(20, button_y, button_width, button_height)
     plus_rect = pygame.Rect(60, button_y, button_width, button_height)
 
-    if game_state != "DEAL":
+    if engine.state != DEAL:
         pygame.draw.rect(screen, COLORS['button'], minus_rect, border_radius=5)
         pygame.draw.rect(screen, COLORS['button'], plus_rect, border_radius=5)
         color = COLORS['button_text']
@@ -333,8 +424,8 @@ def draw_bet_buttons():
         pygame.draw.rect(screen, COLORS['grid'], plus_rect, border_radius=5)
         color = COLORS['text']
 
-    minus_text = font.render("-", True, color)
-    plus_text = font.render("+", True, color)
+    minus_text = render_text(font, "-", color)
+    plus_text = render_text(font, "+", color)
 
     minus_text_rect = minus_text.get_rect(center=minus_rect.center)
     plus_text_rect = plus_text.get_rect(center=plus_rect.center)
@@ -345,15 +436,13 @@ def draw_bet_buttons():
     return minus_rect, plus_rect
 
 def handle_bet_buttons(pos, minus_rect, plus_rect):
-    global current_bet
-    if game_state != "DEAL":
-        if minus_rect.collidepoint(pos) and current_bet > 1:
-            current_bet -= 1
-        elif plus_rect.collidepoint(pos) and current_bet < max_bet:
-            current_bet += 1
+    if minus_rect.collidepoint(pos):
+        engine.change_bet(-1)
+    elif plus_rect.collidepoint(pos):
+        engine.change_bet(1)
 
 def draw_buy_cash_buttons():
-    font = pygame.font.SysFont('Arial', 24, bold=True)
+    font = get_font('Arial', 24, bold=True)
     button_width = 110
     button_height = 40
     button_y = WINDOW_HEIGHT - 60
@@ -361,7 +450,7 @@ def draw_buy_cash_buttons():
     buy_in_rect = pygame.Rect(WINDOW_WIDTH - 240, button_y, button_width, button_height)
     cash_out_rect = pygame.Rect(WINDOW_WIDTH - 120, button_y, button_width, button_height)
 
-    if game_state != "DEAL":
+    if engine.state != DEAL:
         pygame.draw.rect(screen, COLORS['button'], buy_in_rect, border_radius=5)
         pygame.draw.rect(screen, COLORS['button'], cash_out_rect, border_radius=5)
         color = COLORS['button_text']
@@ -370,8 +459,8 @@ def draw_buy_cash_buttons():
         pygame.draw.rect(screen, COLORS['grid'], cash_out_rect, border_radius=5)
         color = COLORS['text']
 
-    buy_in_text = font.render("Buy In", True, color)
-    cash_out_text = font.render("Cash Out", True, color)
+    buy_in_text = render_text(font, "Buy In", color)
+    cash_out_text = render_text(font, "Cash Out", color)
 
     buy_in_text_rect = buy_in_text.get_rect(center=buy_in_rect.center)
     cash_out_text_rect = cash_out_text.get_rect(center=cash_out_rect.center)
@@ -382,16 +471,16 @@ def draw_buy_cash_buttons():
     return buy_in_rect, cash_out_rect
 
 def handle_buy_cash_buttons(pos, buy_in_rect, cash_out_rect):
-    global credits, buy_in_total, player_address, player_balance
-    if game_state != "DEAL":
+    global buy_in_total, player_address, player_balance
+    if engine.state != DEAL:
         if buy_in_rect.collidepoint(pos):
             buyin_ui()
         elif cash_out_rect.collidepoint(pos):
             if player_address is None:
                 show_loading_screen("Load Wallet First")
-            elif credits > 0:
+            elif engine.credits > 0:
                 recipient_address = player_address
-                amount_to_send = credits
+                amount_to_send = engine.credits
                 win_differential = amount_to_send - buy_in_total
                 txid = cashOut_doge(recipient_address, amount_to_send, win_differential)
                 if txid:
@@ -399,7 +488,8 @@ def handle_buy_cash_buttons(pos, buy_in_rect, cash_out_rect):
                     print(f"Amount cashed out: {amount_to_send} LKY")
                     print(f"Total bought in: {buy_in_total} LKY")
                     print(f"Win Differential: {win_differential} LKY")
-                    credits = 0
+                    engine.credits = 0
+                    pool_balance_tracker.refresh_soon()
                     buy_in_total = 0  # Reset buy_in_total after cashout
                     win_differential = 0  # Reset win_differential after cashout
                 else:
@@ -408,7 +498,7 @@ def handle_buy_cash_buttons(pos, buy_in_rect, cash_out_rect):
                 print("No credits to cash out.")
 
 def draw_game_buttons():
-    font = pygame.font.SysFont('Arial', 24, bold=True)
+    font = get_font('Arial', 24, bold=True)
     button_width = 150
     button_height = 40
     button_y = WINDOW_HEIGHT - 100
@@ -417,10 +507,10 @@ def draw_game_buttons():
     main_button_rect = pygame.Rect((WINDOW_WIDTH - button_width * 2 - gap) // 2, button_y, button_width, button_height)
     pygame.draw.rect(screen, COLORS['button'], main_button_rect, border_radius=5)
 
-    if game_state == "DEAL":
-        main_button_text = font.render("Deal", True, COLORS['button_text'])
+    if engine.state == DEAL:
+        main_button_text = render_text(font, "Deal", COLORS['button_text'])
     else:
-        main_button_text = font.render("New Game", True, COLORS['button_text'])
+        main_button_text = render_text(font, "New Game", COLORS['button_text'])
 
     main_button_text_rect = main_button_text.get_rect(center=main_button_rect.center)
     screen.blit(main_button_text, main_button_text_rect)
@@ -428,10 +518,10 @@ def draw_game_buttons():
     double_up_rect = None
     take_win_rect = None
 
-    if game_state == "NEW_GAME" and current_win > 0:
+    if engine.state == NEW_GAME and engine.win > 0:
         double_up_rect = pygame.Rect(main_button_rect.right + gap, button_y, button_width, button_height)
         pygame.draw.rect(screen, COLORS['button'], double_up_rect, border_radius=5)
-        double_up_text = font.render("Double Up", True, COLORS['button_text'])
+        double_up_text = render_text(font, "Double Up", COLORS['button_text'])
         double_up_text_rect = double_up_text.get_rect(center=double_up_rect.center)
         screen.blit(double_up_text, double_up_text_rect)
 
@@ -439,35 +529,51 @@ def draw_game_buttons():
         take_win_y = button_y + button_height + (WINDOW_HEIGHT - button_y - 2 * button_height) // 2
         take_win_rect = pygame.Rect(double_up_rect.left, take_win_y, button_width, button_height)
         pygame.draw.rect(screen, COLORS['button'], take_win_rect, border_radius=5)
-        take_win_text = font.render("Take Win", True, COLORS['button_text'])
+        take_win_text = render_text(font, "Take Win", COLORS['button_text'])
         take_win_text_rect = take_win_text.get_rect(center=take_win_rect.center)
         screen.blit(take_win_text, take_win_text_rect)
 
     return main_button_rect, double_up_rect, take_win_rect
 
+# Scaled card surfaces by card id (CARD_BACK for the back), all at card_surface_size.
+# Slicing and smoothscaling happen once per card; asking for another size starts over.
+card_surfaces = {}
+card_surface_size = None
+
+def get_scaled_card(card, size=None):
+    global card_surface_size
+    size = size or (SCALED_CARD_WIDTH, SCALED_CARD_HEIGHT)
+    if size != card_surface_size:
+        card_surfaces.clear()
+        card_surface_size = size
+    surface = card_surfaces.get(card)
+    if surface is None:
+        coords = get_card_coordinates(card)
+
+        # Check if coordinates are valid
+        if coords == (None, None):
+            raise ValueError(f"Invalid card: {card}")
+
+        card_surface = pygame.Surface((CARD_WIDTH, CARD_HEIGHT), pygame.SRCALPHA)
+        card_surface.blit(sprite_sheet, (0, 0), (*coords, CARD_WIDTH, CARD_HEIGHT))
+        surface = pygame.transform.smoothscale(card_surface, size).convert_alpha()
+        card_surfaces[card] = surface
+    return surface
+
+def preload_card_surfaces(size=None):
+    # All 55 surfaces (52 cards, 2 jokers, the back), so no frame pays for the first use
+    for card in range(CARD_BACK + 1):
+        get_scaled_card(card, size)
+
 def get_ace_image(suit):
     full_suit_name = {'D': 'Diamonds', 'H': 'Hearts', 'C': 'Clubs', 'S': 'Spades'}[suit[0].upper()]
-    coords = get_card_coordinates(f"Ace of {full_suit_name}")
-    ace_surface = pygame.Surface((CARD_WIDTH, CARD_HEIGHT), pygame.SRCALPHA)
-    ace_surface.blit(sprite_sheet, (0, 0), (*coords, CARD_WIDTH, CARD_HEIGHT))
-    return pygame.transform.smoothscale(ace_surface, (SCALED_CARD_WIDTH, SCALED_CARD_HEIGHT))
+    return get_scaled_card(make_card('Ace', full_suit_name))
 
 def get_card_back_image():
-    coords = get_card_coordinates("Back")
-    back_surface = pygame.Surface((CARD_WIDTH, CARD_HEIGHT), pygame.SRCALPHA)
-    back_surface.blit(sprite_sheet, (0, 0), (*coords, CARD_WIDTH, CARD_HEIGHT))
-    return pygame.transform.smoothscale(back_surface, (SCALED_CARD_WIDTH, SCALED_CARD_HEIGHT))
+    return get_scaled_card(CARD_BACK)
 
 def get_card_image(card):
-    coords = get_card_coordinates(card)
-    
-    # Check if coordinates are valid
-    if coords == (None, None):
-        raise ValueError(f"Invalid card name: {card}")
-
-    card_surface = pygame.Surface((CARD_WIDTH, CARD_HEIGHT), pygame.SRCALPHA)
-    card_surface.blit(sprite_sheet, (0, 0), (*coords, CARD_WIDTH, CARD_HEIGHT))
-    return pygame.transform.smoothscale(card_surface, (SCALED_CARD_WIDTH, SCALED_CARD_HEIGHT))
+    return get_scaled_card(card)
 
 def draw_double_up_cards():
     card_width = SCALED_CARD_WIDTH
@@ -476,11 +582,11 @@ def draw_double_up_cards():
     start_x = (WINDOW_WIDTH - total_width) // 2
     start_y = 50  # Start cards higher on the screen
 
-    # Draw drawn_card (card back or drawn card) centered above the aces
+    # Draw the double up card (card back or drawn card) centered above the aces
     dbl_draw_card_x = WINDOW_WIDTH // 2 - card_width // 2
     dbl_draw_card_y = start_y
-    if drawn_card:
-        dbl_draw_card_image = get_card_image(drawn_card)  # Use the drawn card image
+    if engine.double_up_card is not None:
+        dbl_draw_card_image = get_card_image(engine.double_up_card)  # Use the drawn card image
     else:
         dbl_draw_card_image = get_card_back_image()  # Use the card back image
     screen.blit(dbl_draw_card_image, (dbl_draw_card_x, dbl_draw_card_y))
@@ -503,7 +609,6 @@ def draw_double_up_cards():
     return dbl_draw_card_pos, ace_positions
 
 def draw_double_up_buttons(screen, window_width, window_height, card_positions):
-    global dbl_choice
     suit_buttons = []
     button_width = 100
     button_height = 50
@@ -521,12 +626,12 @@ def draw_double_up_buttons(screen, window_width, window_height, card_positions):
         button_rect = pygame.Rect(x, start_y, button_width, button_height)
         suit_buttons.append(button_rect)
 
-        button_color = COLORS['highlight'] if dbl_choice == suit_names[i] else COLORS['button']
+        button_color = COLORS['highlight'] if engine.double_up_choice == suit_names[i] else COLORS['button']
         pygame.draw.rect(screen, button_color, button_rect, border_radius=5)
 
-        font = pygame.font.SysFont('Arial', 24, bold=True)
-        text_color = COLORS['table_bg'] if dbl_choice == suit_names[i] else COLORS['text']
-        text = font.render(suit, True, text_color)
+        font = get_font('Arial', 24, bold=True)
+        text_color = COLORS['table_bg'] if engine.double_up_choice == suit_names[i] else COLORS['text']
+        text = render_text(font, suit, text_color)
         text_rect = text.get_rect(center=button_rect.center)
         screen.blit(text, text_rect)
 
@@ -534,125 +639,121 @@ def draw_double_up_buttons(screen, window_width, window_height, card_positions):
     black_button_rect = pygame.Rect(start_x + button_width * 2 + spacing * 2, start_y + button_height + spacing, button_width * 2 + spacing, button_height)
 
     for button, color in [(red_button_rect, 'red'), (black_button_rect, 'black')]:
-        button_color = COLORS['highlight'] if dbl_choice == color else COLORS['button']
+        button_color = COLORS['highlight'] if engine.double_up_choice == color else COLORS['button']
         pygame.draw.rect(screen, button_color, button, border_radius=5)
 
-        font = pygame.font.SysFont('Arial', 24, bold=True)
-        text_color = COLORS['table_bg'] if dbl_choice == color else COLORS['text']
-        text = font.render(color.upper(), True, text_color)
+        font = get_font('Arial', 24, bold=True)
+        text_color = COLORS['table_bg'] if engine.double_up_choice == color else COLORS['text']
+        text = render_text(font, color.upper(), text_color)
         text_rect = text.get_rect(center=button.center)
         screen.blit(text, text_rect)
 
     # Add "To Game" button
     to_game_rect = pygame.Rect(start_x, start_y + (button_height + spacing) * 2, button_width * 2 + spacing, button_height)
     pygame.draw.rect(screen, COLORS['button'], to_game_rect, border_radius=5)
-    font = pygame.font.SysFont('Arial', 24, bold=True)
-    text_surface = font.render("To Game", True, COLORS['text'])
+    font = get_font('Arial', 24, bold=True)
+    text_surface = render_text(font, "To Game", COLORS['text'])
     text_rect = text_surface.get_rect(center=to_game_rect.center)
     screen.blit(text_surface, text_rect)
 
     # Add "Draw" button
     action_rect = pygame.Rect(start_x + button_width * 2 + spacing * 2, start_y + (button_height + spacing) * 2, button_width * 2 + spacing, button_height)
     pygame.draw.rect(screen, COLORS['button'], action_rect, border_radius=5)
-    text_surface = font.render("Draw", True, COLORS['text'])
+    text_surface = render_text(font, "Draw", COLORS['text'])
     text_rect = text_surface.get_rect(center=action_rect.center)
     screen.blit(text_surface, text_rect)
 
     return suit_buttons, red_button_rect, black_button_rect, to_game_rect, action_rect
 
 def perform_double_up():
-    global current_win, credits, drawn_card, dbl_choice
+    # Draw a card, face down until it arrives; settle_double_up runs then
+    engine.begin_double_up()
+    request_cards("double_up", 1)
 
-    # Draw a card
-    drawn_card = deal_card()
+def settle_double_up(card):
+    choice = engine.double_up_choice
+    engine.settle_double_up(card)
 
-    # Redraw the screen to show the drawn card
-    screen.fill(COLORS['background'])
-    draw_game_elements()
-    pygame.display.flip()
-    pygame.time.wait(1000)  # Wait for 1 second to show the card
-
-    # Determine if the player's choice was correct
-    if dbl_choice in ['red', 'black']:
-        # Red cards are hearts and diamonds
-        card_suit = drawn_card.split(' of ')[1]
-        card_color = 'red' if card_suit in ['Hearts', 'Diamonds'] else 'black'
-        if dbl_choice == card_color:
-            current_win *= 2
-        else:
-            current_win = 0
-    else:
-        # Suit match
-        card_suit = drawn_card.split(' of ')[1].lower()
-        if dbl_choice == card_suit.lower():
-            current_win *= 4
-        else:
-            current_win = 0
+    # Keep the double up screen up with the drawn card for a moment, even when the
+    # loss ends the double up
+    timeline.add("double_up_reveal", DOUBLE_UP_REVEAL_MS)
 
-    # Reset the choice after processing
-    dbl_choice = None
+    event_log.record("double_up", card=card_name(card), choice=choice, win=engine.win)
+    event_log.flush()
+
+def showing_double_up():
+    return engine.state == DBL_UP or timeline.is_active("double_up_reveal")
 
 def handle_double_up_choice(pos, card_positions, suit_buttons, red_button_rect, black_button_rect, to_game_rect, action_rect):
-    global dbl_choice, game_state, current_win, drawn_card, credits
+    if pending_deal is not None or timeline.is_active("double_up_reveal"):
+        return True  # Ignore clicks until the drawn card arrives and has been shown
 
     # Handle suit buttons
     for i, (card_rect, button_rect) in enumerate(zip(card_positions, suit_buttons)):
         if card_rect.collidepoint(pos) or button_rect.collidepoint(pos):
             suits = ['diamonds', 'hearts', 'clubs', 'spades']
-            dbl_choice = suits[i]
+            engine.choose_double_up(suits[i])
             return True  # Handled
 
     # Handle color buttons
     if red_button_rect.collidepoint(pos):
-        dbl_choice = 'red'
+        engine.choose_double_up('red')
         return True  # Handled
     elif black_button_rect.collidepoint(pos):
-        dbl_choice = 'black'
+        engine.choose_double_up('black')
         return True  # Handled
 
     # Handle "To Game" button
     elif to_game_rect.collidepoint(pos):
-        credits += current_win
-        current_win = 0
-        game_state = "NEW_GAME"
-        drawn_card = None
-        dbl_choice = None
+        engine.leave_double_up()
         return True  # Handled
 
     # Handle "Draw" button
     elif action_rect.collidepoint(pos):
-        if dbl_choice is None:
-            display_message("Please select a suit or color.")
-            return True  # Handled
-        else:
+        try:
             perform_double_up()
-            if current_win == 0:
-                game_state = "NEW_GAME"
-            return True  # Handled
+        except ValueError as e:
+            display_message(str(e))
+        return True  # Handled
 
     return False  # Not handled
 
 def display_message(message):
-    font = pygame.font.SysFont('Arial', 20, bold=True)
-    text = font.render(message, True, COLORS['highlight'])
-    text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 20))
-    screen.blit(text, text_rect)
-    pygame.display.flip()
-    pygame.time.wait(2000)  # Display the message for 2 seconds
+    # Shown for MESSAGE_MS over the game, after any messages already showing
+    timeline.queue("message", MESSAGE_MS, text=message)
+
+def draw_overlays():
+    # The timeline's overlay and message, drawn over the game
+    for overlay in timeline.active("overlay"):
+        dim = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+        dim.fill((0, 0, 0, 180))
+        screen.blit(dim, (0, 0))
+        font = get_font(None, 36)
+        lines = overlay.data['text'].split('\n')
+        line_height = font.get_linesize()
+        y = (WINDOW_HEIGHT - line_height * len(lines)) // 2
+        for line in lines:
+            text_surface = render_text(font, line, COLORS['text'])
+            screen.blit(text_surface, text_surface.get_rect(center=(WINDOW_WIDTH // 2, y)))
+            y += line_height
+    for message in timeline.active("message"):
+        font = get_font('Arial', 20, bold=True)
+        text = render_text(font, message.data['text'], COLORS['highlight'])
+        screen.blit(text, text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 20)))
 
 def draw_player_pool_balance():
-    balance_font = pygame.font.Font(None, 24)  # Smaller font size
-    balance_text = f"Player Pool: {player_pool_balance} LKY"
-    balance_surface = balance_font.render(balance_text, True, COLORS['text'])
+    balance_font = get_font(None, 24)  # Smaller font size
+    balance_text = f"Player Pool: {get_player_pool_balance()} LKY"
+    balance_surface = render_text(balance_font, balance_text, COLORS['text'])
     balance_rect = balance_surface.get_rect(midtop=(WINDOW_WIDTH // 2, 4))  # Move to the top
     screen.blit(balance_surface, balance_rect)
+    return balance_rect
 
 def draw_game_elements():
-    global game_state, current_hand
 
     card_positions = []  # Initialize card_positions
 
-    if game_state == "DBL_UP":
+    if showing_double_up():
         # Draw only double up elements when in DBL_UP state
         dbl_draw_card_pos, card_positions = draw_double_up_cards()
         suit_buttons, red_button_rect, black_button_rect, to_game_rect, action_rect = draw_double_up_buttons(screen, WINDOW_WIDTH, WINDOW_HEIGHT, card_positions)
@@ -671,15 +772,15 @@ def draw_game_elements():
         pay_table_bottom = draw_pay_table(current_hand_ranking)
 
         # Draw cards
-        card_positions = draw_cards(current_hand, pay_table_bottom)
+        card_positions = draw_cards(engine.hand, pay_table_bottom)
 
         # Draw hold buttons
         hold_buttons = draw_hold_buttons(card_positions)
 
         # Draw credits, bet, and win
-        draw_credits()
-        draw_bet()
-        draw_win()
+        credits_rect = draw_credits()
+        bet_rect = draw_bet()
+        win_rect = draw_win()
 
         # Draw bet buttons
         minus_rect, plus_rect = draw_bet_buttons()
@@ -694,7 +795,7 @@ def draw_game_elements():
         wallet_button_rect = draw_wallet_button()
 
         # Draw player pool balance
-        draw_player_pool_balance()
+        pool_balance_rect = draw_player_pool_balance()
 
         return {
             'card_positions': card_positions,  # Ensure this is always included
@@ -706,8 +807,100 @@ def draw_game_elements():
             'main_button_rect': main_button_rect,
             'double_up_rect': double_up_rect,
             'take_win_rect': take_win_rect,
-            'wallet_button_rect': wallet_button_rect
+            'wallet_button_rect': wallet_button_rect,
+            'pay_table_rect': pygame.Rect(0, 0, WINDOW_WIDTH, pay_table_bottom + 1),
+            'credits_rect': credits_rect,
+            'bet_rect': bet_rect,
+            'win_rect': win_rect,
+            'pool_balance_rect': pool_balance_rect
+        }
+
+# Redraw only the widgets whose state changed, and sleep in pygame.event.wait while
+# nothing does. False redraws and flips the whole window every frame.
+DIRTY_RECT_RENDERING = True
+# Longest idle wait, so state changed outside the event loop (balances) still shows
+IDLE_WAIT_MS = 500
+screen_invalidated = True  # Set when something drew over the window outside the renderer
+
+def invalidate_screen():
+    global screen_invalidated
+    screen_invalidated = True
+
+def widget_states():
+    # What each widget on screen depends on; a widget is redrawn when its entry changes
+    overlays = timeline.snapshot(("overlay", "message"))
+    if showing_double_up():
+        return {
+            'mode': DBL_UP,
+            'double_up': (engine.double_up_card, engine.double_up_choice, engine.credits, engine.bet, engine.win, pending_deal is None),
+            'overlays': overlays,
         }
+    return {
+        'mode': engine.state,
+        'pay_table': (get_current_hand_ranking(), engine.bet),
+        'cards': tuple(engine.hand),
+        'holds': (tuple(engine.held), engine.state, pending_deal is None),
+        'credits': engine.credits,
+        'bet': engine.bet,
+        'win': engine.win,
+        'buttons': (engine.state, engine.win > 0),
+        'pool_balance': get_player_pool_balance(),
+        'overlays': overlays,
+    }
+
+def widget_rects(ui_elements):
+    # Screen areas of the widgets in widget_states, from the rects draw_game_elements returned
+    if showing_double_up():
+        return {'double_up': [screen.get_rect()], 'overlays': [screen.get_rect()]}
+    buttons = [ui_elements[name] for name in ('minus_rect', 'plus_rect', 'buy_in_rect', 'cash_out_rect',
+                                             'main_button_rect', 'double_up_rect', 'take_win_rect')
+               if ui_elements.get(name) is not None]
+    return {
+        'pay_table': [ui_elements['pay_table_rect']],
+        'cards': ui_elements['card_positions'],
+        'holds': ui_elements['hold_buttons'],
+        'credits': [ui_elements['credits_rect']],
+        'bet': [ui_elements['bet_rect']],
+        'win': [ui_elements['win_rect']],
+        'buttons': buttons,
+        'pool_balance': [ui_elements['pool_balance_rect']],
+        'overlays': [screen.get_rect()],
+    }
+
+def draw_frame():
+    # Paint the background, the game and its overlays (within the screen's clip)
+    screen.fill(COLORS['background'])
+    ui_elements = draw_game_elements()
+    draw_overlays()
+    return ui_elements
+
+def redraw(states, drawn_states, drawn_rects):
+    # Repaint the widgets whose state changed and push their areas (old and new extents)
+    # to the display. The screen keeps the last frame, so everything outside the changed
+    # areas is left as it is. Returns the widget states and rects that are now on screen.
+    global screen_invalidated
+    if not DIRTY_RECT_RENDERING or screen_invalidated or drawn_states is None or states['mode'] != drawn_states['mode']:
+        ui_elements = draw_frame()
+        rects = widget_rects(ui_elements)
+        pygame.display.flip()
+    else:
+        # Lay the frame out with nothing painted, to learn where each widget now sits
+        screen.set_clip(pygame.Rect(0, 0, 0, 0))
+        ui_elements = draw_game_elements()
+        rects = widget_rects(ui_elements)
+        dirty = []
+        for widget, state in states.items():
+            if state != drawn_states.get(widget):
+                dirty.extend(drawn_rects.get(widget, []))
+                dirty.extend(rects.get(widget, []))
+        if dirty:
+            # One pass clipped to the changed areas; widgets in between repaint unchanged
+            screen.set_clip(pygame.Rect(dirty[0]).unionall(dirty[1:]))
+            draw_frame()
+        screen.set_clip(None)
+        pygame.display.update(dirty)
+    screen_invalidated = False
+    return ui_elements, states, rects
 
 def main_game_loop():
     running = True
@@ -716,18 +909,34 @@ def main_game_loop():
     # Display the message when the game starts
     display_message("Malfunctions Void All Payouts")
 
+    ui_elements, drawn_states, drawn_rects = redraw(widget_states(), None, {})
     while running:
         time_delta = clock.tick(60) / 1000.0
-        screen.fill(COLORS['background'])
-        ui_elements = draw_game_elements()
+        timeline.update()
+        if engine.state == NEW_GAME and pending_deal is None:
+            hand_prefetcher.prefetch()
+        states = widget_states()
+        if not DIRTY_RECT_RENDERING or screen_invalidated or states != drawn_states:
+            ui_elements, drawn_states, drawn_rects = redraw(states, drawn_states, drawn_rects)
+            events = pygame.event.get()
+        else:
+            # Nothing to animate: sleep until input, a dealt card, the next timeline
+            # change or the idle timeout
+            events = [pygame.event.wait(max(1, timeline.time_to_next_change(IDLE_WAIT_MS)))] + pygame.event.get()
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type == CARDS_DEALT:
+                handle_cards_dealt(event)
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                invalidate_screen()
+            elif event.type == pygame.MOUSEBUTTONDOWN and timeline.is_active("overlay"):
+                timeline.cancel("overlay")  # A click dismisses the overlay
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 pos = pygame.mouse.get_pos()
-                if game_state == "DBL_UP":
+                if showing_double_up():
                     handled = handle_double_up_choice(
                         pos,
                         ui_elements['card_positions'],
@@ -749,19 +958,12 @@ def main_game_loop():
                     # Handle wallet button click
                     if ui_elements.get('wallet_button_rect') and ui_elements['wallet_button_rect'].collidepoint(pos):
                         display_message("Loading Wallets Please Wait...")
-                        wallet_ui()
-
-        pygame.display.flip()
+                        timeline.after(50, wallet_ui)  # Once the message is on screen
 
 # Additional functions from slot.py adapted for drawPoker.py
 
 def draw_wallet_button():
-    wallet_button_path = os.path.join("data", "wallet.png")
-    if os.path.exists(wallet_button_path):
-        wallet_button_image = pygame.image.load(wallet_button_path).convert_alpha()
-        wallet_button_image = pygame.transform.smoothscale(wallet_button_image, (100, 40))
-    else:
-        wallet_button_image = None
+    wallet_button_image = assets.image(WALLET_BUTTON_IMAGE, (100, 40))  # None when the file is missing
 
     WALLET_BUTTON_X = WINDOW_WIDTH - 110
     WALLET_BUTTON_Y = 15 # Move to the top
@@ -771,60 +973,16 @@ def draw_wallet_button():
     else:
         # Draw a placeholder rectangle
         pygame.draw.rect(screen, COLORS['button'], (WALLET_BUTTON_X, WALLET_BUTTON_Y, 100, 40), border_radius=5)
-        font = pygame.font.SysFont('Arial', 24, bold=True)
-        text = font.render("Wallet", True, COLORS['button_text'])
+        font = get_font('Arial', 24, bold=True)
+        text = render_text(font, "Wallet", COLORS['button_text'])
         text_rect = text.get_rect(center=(WALLET_BUTTON_X + 50, WALLET_BUTTON_Y + 20))
         screen.blit(text, text_rect)
 
     return pygame.Rect(WALLET_BUTTON_X, WALLET_BUTTON_Y, 100, 40)
 
-def load_rpc_credentials(filename):
-    """Load RPC credentials from a configuration file."""
-    credentials = {}
-    with open(filename, 'r') as file:
-        for line in file:
-            if line.strip() and not line.strip().startswith('['):
-                parts = line.strip().split('=')
-                if len(parts) == 2:
-                    key = parts[0].strip().lower().replace('rpc', '')
-                    credentials[key] = parts[1].strip()
-    return credentials
-
 def initialize_rpc_connection():
-    # Determine the application's root directory
-    if getattr(sys, 'frozen', False):
-        # Running as compiled exe
-        app_dir = os.path.dirname(sys.executable)
-    else:
-        # Running as script
-        app_dir = os.path.dirname(os.path.abspath(__file__))
-
-    # Construct the path to RPC.conf
-    config_path = os.path.join(app_dir, 'RPC.conf')
-
-    # Check if the file exists
-    if not os.path.exists(config_path):
-        raise FileNotFoundError(f"RPC configuration file not found: {config_path}")
-
-    try:
-        credentials = load_rpc_credentials(config_path)
-    except Exception as e:
-        raise Exception(f"Failed to load RPC credentials: {str(e)}")
-
-    rpc_user = credentials.get('user')
-    rpc_password = credentials.get('password')
-    rpc_host = credentials.get('host', 'localhost')
-    rpc_port = credentials.get('port', '22555')
-
-    if not all([rpc_user, rpc_password, rpc_host, rpc_port]):
-        raise ValueError("Missing required RPC credentials in configuration file")
-
-    rpc_url = f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}"
-    
-    try:
-        return AuthServiceProxy(rpc_url)
-    except Exception as e:
-        raise Exception(f"Failed to establish RPC connection: {str(e)}")
+    # The shared node client; RPC.conf is read once, next to the game
+    return get_rpc_client()
 
 def get_player_addresses_and_balances():
     try:
@@ -855,6 +1013,7 @@ def get_player_addresses_and_balances():
 
 def wallet_ui():
     global player_address, player_balance, player_pool_address
+    invalidate_screen()
     manager = pygame_gui.UIManager((WINDOW_WIDTH, WINDOW_HEIGHT))
     try:
         addresses = get_player_addresses_and_balances()
@@ -913,11 +1072,11 @@ def wallet_ui():
         pygame.display.flip()
 
 def buyin_ui():
-    global credits, screen, player_pool_address, player_address, player_balance, buy_in_total
+    global screen, player_pool_address, player_address, player_balance, buy_in_total
+    invalidate_screen()
     if player_address is None or player_balance is None:
         print("No wallet selected. Please select a wallet first.")
         show_loading_screen("Load Wallet First")
-        pygame.display.flip()
         return
     BUTTON_COLORS = [
         (255, 0, 0, 128), (0, 255, 0, 128), (0, 0, 255, 128),
@@ -925,7 +1084,7 @@ def buyin_ui():
         (128, 0, 0, 128), (0, 128, 0, 128), (0, 0, 128, 128),
         (128, 128, 0, 128)
     ]
-    font = pygame.font.Font(None, 36)
+    font = get_font(None, 36)
     button_size = (100, 100)
     button_positions = [
         (50, 100), (150, 100), (250, 100),
@@ -936,26 +1095,29 @@ def buyin_ui():
     for i in range(9):
         button = pygame.Surface(button_size, pygame.SRCALPHA)
         button.fill(BUTTON_COLORS[i])
-        text = font.render(str(i + 1), True, COLORS['text'])
+        text = render_text(font, str(i + 1), COLORS['text'])
         text_rect = text.get_rect(center=(button_size[0] // 2, button_size[1] // 2))
         button.blit(text, text_rect)
         number_buttons.append((button, button_positions[i]))
     zero_button = pygame.Surface(button_size, pygame.SRCALPHA)
     zero_button.fill(BUTTON_COLORS[9])
-    zero_text = font.render('0', True, COLORS['text'])
+    zero_text = render_text(font, '0', COLORS['text'])
     zero_text_rect = zero_text.get_rect(center=(button_size[0] // 2, button_size[1] // 2))
     zero_button.blit(zero_text, zero_text_rect)
     submit_button = pygame.Surface((140, 50), pygame.SRCALPHA)
     cancel_button = pygame.Surface((140, 50), pygame.SRCALPHA)
     submit_button.fill((0, 200, 0, 128))
     cancel_button.fill((200, 0, 0, 128))
-    submit_text = font.render('Submit', True, COLORS['text'])
-    cancel_text = font.render('Cancel', True, COLORS['text'])
+    submit_text = render_text(font, 'Submit', COLORS['text'])
+    cancel_text = render_text(font, 'Cancel', COLORS['text'])
     submit_button.blit(submit_text, submit_text.get_rect(center=(70, 25)))
     cancel_button.blit(cancel_text, cancel_text.get_rect(center=(70, 25)))
     running = True
     current_value = ''
+    clock = pygame.time.Clock()
     while running:
+        clock.tick(60)
+        timeline.update()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
@@ -973,18 +1135,15 @@ def buyin_ui():
                         amount = int(current_value)
                         if amount > player_balance:
                             print(f"Insufficient balance. Available: {player_balance} LKY")
-                            error_text = font.render(f"Insufficient balance: {player_balance:.8f} LKY", True, (255, 0, 0))
-                            error_rect = error_text.get_rect(center=(500 // 2, 585 - 50))
-                            screen.blit(error_text, error_rect)
-                            pygame.display.flip()
-                            pygame.time.wait(3000)
+                            show_buyin_error(f"Insufficient balance: {player_balance:.8f} LKY")
                         else:
                             try:
                                 txid = buyIn_doge(player_address, amount)
                                 if txid:
-                                    credits += amount
+                                    engine.add_credits(amount)
                                     player_balance -= Decimal(amount)
                                     buy_in_total += amount  # Add the amount to buy_in_total
+                                    pool_balance_tracker.refresh_soon()
                                     print(f"Bought in {amount} credits! Transaction ID: {txid}")
                                     print(f"Total bought in: {buy_in_total} credits")
                                     running = False
@@ -992,11 +1151,7 @@ def buyin_ui():
                                     print("Transaction failed. No credits added.")
                             except Exception as e:
                                 print(f"An error occurred: {str(e)}")
-                                error_text = font.render(f"Error: {str(e)}", True, (255, 0, 0))
-                                error_rect = error_text.get_rect(center=(500 // 2, 585 - 50))
-                                screen.blit(error_text, error_rect)
-                                pygame.display.flip()
-                                pygame.time.wait(3000)
+                                show_buyin_error(f"Error: {str(e)}")
                 if pygame.Rect((240, 450), (140, 50)).collidepoint(relative_pos):
                     running = False
         screen.fill(COLORS['background'])
@@ -1005,31 +1160,28 @@ def buyin_ui():
             screen.blit(button, ((WINDOW_WIDTH - 500) // 2 + pos[0], (WINDOW_HEIGHT - 585) // 2 + pos[1]))
         screen.blit(zero_button, ((WINDOW_WIDTH - 500) // 2 + 150, (WINDOW_HEIGHT - 585) // 2 + 400))
         pygame.draw.rect(screen, COLORS['text'], ((WINDOW_WIDTH - 500) // 2 + 50, (WINDOW_HEIGHT - 585) // 2 + 30, 300, 50))
-        display_text = font.render(current_value, True, COLORS['table_bg'])
+        display_text = render_text(font, current_value, COLORS['table_bg'])
         screen.blit(display_text, ((WINDOW_WIDTH - 500) // 2 + 60, (WINDOW_HEIGHT - 585) // 2 + 40))
         screen.blit(submit_button, ((WINDOW_WIDTH - 500) // 2 + 20, (WINDOW_HEIGHT - 585) // 2 + 450))
         screen.blit(cancel_button, ((WINDOW_WIDTH - 500) // 2 + 240, (WINDOW_HEIGHT - 585) // 2 + 450))
-        balance_text = font.render(f"Balance: {player_balance:.8f} LKY", True, COLORS['text'])
+        balance_text = render_text(font, f"Balance: {player_balance:.8f} LKY", COLORS['text'])
         screen.blit(balance_text, ((WINDOW_WIDTH - 500) // 2 + 50, (WINDOW_HEIGHT - 585) // 2 + 500))
+        for error in timeline.active("buyin_error"):
+            error_text = render_text(font, error.data['text'], (255, 0, 0))
+            screen.blit(error_text, error_text.get_rect(center=(500 // 2, 585 - 50)))
         pygame.display.flip()
-    print(f"Current credits after buy-in: {credits}")
-
-def show_loading_screen(text, duration=2000):
-    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180))
-    screen.blit(overlay, (0, 0))
-    font = pygame.font.Font(None, 36)
-    lines = text.split('\n')
-    line_height = font.get_linesize()
-    total_height = line_height * len(lines)
-    y = (WINDOW_HEIGHT - total_height) // 2
-    for line in lines:
-        text_surface = font.render(line, True, COLORS['text'])
-        text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, y))
-        screen.blit(text_surface, text_rect)
-        y += line_height
-    pygame.display.flip()
-    pygame.time.wait(duration)
+    timeline.cancel("buyin_error")
+    print(f"Current credits after buy-in: {engine.credits}")
+
+def show_buyin_error(text):
+    # Shown in the buy in panel for BUYIN_ERROR_MS while it keeps taking input
+    timeline.cancel("buyin_error")
+    timeline.add("buyin_error", BUYIN_ERROR_MS, text=text)
+
+def show_loading_screen(text, duration=OVERLAY_MS):
+    # Dims the game under `text` for `duration` ms, or until the next click
+    timeline.cancel("overlay")
+    timeline.add("overlay", duration, text=text)
 
 def import_watch_only_address(rpc_connection, address):
     try:
@@ -1043,19 +1195,14 @@ def initialize_game():
     try:
         rpc_connection = initialize_rpc_connection()
         import_watch_only_address(rpc_connection, player_pool_address)
-        update_player_pool_balance()
     except Exception as e:
         print(f"Error initializing game: {str(e)}")
+    pool_balance_tracker.start()
 
-def update_player_pool_balance():
-    global player_pool_balance
-    try:
-        rpc_connection = initialize_rpc_connection()
-        unspent_outputs = rpc_connection.listunspent(0, 9999999, [player_pool_address])
-        total_balance = sum(Decimal(output['amount']) for output in unspent_outputs)
-        player_pool_balance = total_balance.quantize(Decimal('1.'), rounding=ROUND_HALF_UP)
-    except Exception as e:
-        print(f"Error updating player pool balance: {str(e)}")
+def get_player_pool_balance():
+    # The cached pool balance in whole LKY; 0 until the first scan finishes
+    balance = pool_balance_tracker.balance() or Decimal('0')
+    return balance.quantize(Decimal('1.'), rounding=ROUND_HALF_UP)
 
 def buyIn_doge(address, amount):
     
@@ -1066,5 +1213,6 @@ def cashOut_doge(recipient_address, amount, win_differential):
 
 # Ensure to call the main_game_loop() to start the game
 if __name__ == "__main__":
+    preload_card_surfaces()
     initialize_game()
     main_game_loop()
@@ -0,0 +1,102 @@
+"""
+assetManager.py
+
+Loads each image and sound under the data directory once and keeps it.
+
+preload(manifest) reads and decodes the listed files on a background thread, so
+startup I/O happens in bulk while the window comes up. image(name, size) converts
+a loaded image for the display and scales it on first use (pygame only allows
+convert_alpha on the main thread once the display exists), then returns the cached
+surface. A file that does not exist is remembered as missing and never looked up
+again; image() and sound() return None for it.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+DEFAULT_ASSET_DIR = "data"
+SOUND_EXTENSIONS = (".mp3", ".ogg", ".wav")
+
+class AssetManager:
+    def __init__(self, base_dir=DEFAULT_ASSET_DIR):
+        self.base_dir = base_dir
+        self.lock = threading.Lock()
+        self.loading = {}  # name -> future of the decoded file (or None when missing)
+        self.images = {}  # (name, size) -> converted, scaled surface
+        self.sounds = {}
+        self.missing = set()
+        self.executor = None
+
+    def path(self, name):
+        return os.path.join(self.base_dir, name)
+
+    def read(self, name):
+        # Decode one file; runs on the preload thread or the caller's
+        path = self.path(name)
+        if not os.path.exists(path):
+            logging.warning(f"Asset not found: {path}")
+            with self.lock:
+                self.missing.add(name)
+            return None
+        if name.lower().endswith(SOUND_EXTENSIONS):
+            return pygame.mixer.Sound(path)
+        return pygame.image.load(path)
+
+    def preload(self, manifest):
+        # Start decoding every file in `manifest` on a background thread
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+            for name in manifest:
+                if name not in self.loading:
+                    self.loading[name] = self.executor.submit(self.read, name)
+
+    def wait(self):
+        # Block until every preloaded file is decoded
+        with self.lock:
+            futures = list(self.loading.values())
+        for future in futures:
+            future.exception()
+
+    def load(self, name):
+        # The decoded file, from the preload if it was queued, else read now
+        with self.lock:
+            if name in self.missing:
+                return None
+            future = self.loading.get(name)
+        try:
+            return self.read(name) if future is None else future.result()
+        except (pygame.error, OSError) as e:
+            logging.error(f"Could not load asset {name}: {e}")
+            with self.lock:
+                self.missing.add(name)
+            return None
+
+    def image(self, name, size=None):
+        key = (name, size)
+        surface = self.images.get(key)
+        if surface is None and name not in self.missing:
+            loaded = self.load(name)
+            if loaded is None:
+                return None
+            surface = loaded.convert_alpha()
+            if size is not None:
+                surface = pygame.transform.smoothscale(surface, size)
+            self.images[key] = surface
+        return surface
+
+    def sound(self, name):
+        sound = self.sounds.get(name)
+        if sound is None and name not in self.missing:
+            sound = self.load(name)
+            if sound is not None:
+                self.sounds[name] = sound
+        return sound
+
+    def is_missing(self, name):
+        with self.lock:
+            return name in self.missing
@@ -0,0 +1,137 @@
+"""
+balanceTracker.py
+
+Keeps the balance of a set of (watch-only) addresses current without rescanning
+all of their unspent outputs.
+
+One full listunspent scan gives the starting outputs and a block to continue
+from. After that, each refresh asks listsinceblock for the wallet transactions
+since the last block seen. Outputs paid to the addresses are added, and the
+outputs those transactions spend are removed. Only transactions that can spend a
+wallet output (those with a send entry) and are new since the last refresh are
+decoded, in one batch request; other addresses' payments are never fetched. A reorg, an error
+in the deltas, or FULL_SCAN_INTERVAL passing falls back to a full scan, which
+also clears out unconfirmed transactions that were dropped.
+
+The refreshes run on a background thread; balance() only reads the cached total.
+"""
+
+import logging
+import threading
+import time
+from decimal import Decimal
+
+from rpcClient import JSONRPCException, RpcConnectionError, get_rpc_client
+
+REFRESH_INTERVAL = 30
+FULL_SCAN_INTERVAL = 60 * 60
+# Categories of listsinceblock entries that pay the wallet
+RECEIVE_CATEGORIES = ('receive', 'generate', 'immature')
+
+class BalanceTracker:
+    def __init__(self, addresses, rpc=None, refresh_interval=REFRESH_INTERVAL):
+        self.addresses = set(addresses)
+        self.rpc = rpc  # The shared client unless one is given, looked up on first use
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.outputs = {}  # (txid, vout) -> amount of each unspent output
+        self.spent = set()  # Outputs seen spent, so a re-listed receive is not added back
+        self.decoded = set()  # Transactions whose inputs were already applied
+        self.last_block = None
+        self.last_full_scan = 0.0
+        self.total = None  # Decimal once the first scan is done
+        self.wake = threading.Event()
+        self.thread = None
+        self.full_scans = 0
+        self.delta_refreshes = 0
+
+    def balance(self):
+        # The cached total, or None before the first scan has finished
+        with self.lock:
+            return self.total
+
+    def full_scan(self):
+        # The block is read first, so anything confirmed during the scan is seen again
+        # by the next listsinceblock; applying it twice changes nothing
+        best_block = self.rpc.getbestblockhash()
+        unspent = self.rpc.listunspent(0, 9999999, sorted(self.addresses))
+        outputs = {(output['txid'], output['vout']): Decimal(output['amount']) for output in unspent}
+        with self.lock:
+            self.outputs = outputs
+            # The scan supersedes everything the deltas kept, so they start over (at least hourly)
+            self.spent = set()
+            self.decoded = set()
+            self.last_block = best_block
+            self.last_full_scan = time.monotonic()
+            self.total = sum(outputs.values(), Decimal(0))
+            self.full_scans += 1
+
+    def spent_outputs(self, txids):
+        # The outputs spent by each transaction, from one batch of gettransaction and
+        # one of decoderawtransaction
+        if not txids:
+            return []
+        transactions = self.rpc.batch([("gettransaction", [txid, True]) for txid in txids])
+        decoded = self.rpc.batch([("decoderawtransaction", [transaction['hex']]) for transaction in transactions])
+        return [(vin['txid'], vin['vout']) for tx in decoded for vin in tx['vin'] if 'txid' in vin]
+
+    def apply_changes(self):
+        # Returns False when the deltas cannot be trusted and a full scan is needed
+        since = self.rpc.listsinceblock(self.last_block, 1, True)
+        if since.get('removed'):
+            return False  # Transactions were reorganised out
+        received = {}
+        txids = []
+        for entry in since['transactions']:
+            if entry.get('category') in RECEIVE_CATEGORIES and entry.get('address') in self.addresses:
+                received[(entry['txid'], entry['vout'])] = Decimal(entry['amount'])
+            # Only a transaction spending wallet outputs has a send entry, so only those
+            # can spend a tracked output and need decoding
+            if entry.get('category') == 'send' and entry['txid'] not in self.decoded and entry['txid'] not in txids:
+                txids.append(entry['txid'])
+        spent = self.spent_outputs(txids)
+        with self.lock:
+            self.spent.update(spent)
+            self.decoded.update(txids)
+            for outpoint, amount in received.items():
+                if outpoint not in self.spent:
+                    self.outputs[outpoint] = amount
+            for outpoint in spent:
+                self.outputs.pop(outpoint, None)
+            self.last_block = since['lastblock']
+            self.total = sum(self.outputs.values(), Decimal(0))
+            self.delta_refreshes += 1
+        return True
+
+    def refresh(self):
+        if self.rpc is None:
+            self.rpc = get_rpc_client()
+        if self.last_block is None or time.monotonic() - self.last_full_scan >= FULL_SCAN_INTERVAL:
+            self.full_scan()
+            return
+        try:
+            if self.apply_changes():
+                return
+            logging.info("Balance tracker saw a reorg; rescanning")
+        except JSONRPCException as e:
+            # e.g. the last block is no longer in the chain
+            logging.warning(f"Balance delta failed ({e}); rescanning")
+        self.full_scan()
+
+    def refresh_soon(self):
+        # Wake the background thread now, e.g. after a buy-in or cash-out
+        self.wake.set()
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            try:
+                self.refresh()
+            except (RpcConnectionError, JSONRPCException) as e:
+                logging.warning(f"Balance refresh failed: {e}")
+            self.wake.wait(self.refresh_interval)
+            self.wake.clear()
@@ -0,0 +1,81 @@
+"""
+Cost of cashOut.serialize_transaction and cashOut.sign_transaction as the
+number of spent UTXOs grows. Uses a throwaway key; nothing touches the node.
+
+Usage: python benchmarks/benchCashOut.py [utxo_count ...]
+"""
+import copy
+import hashlib
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ecdsa import SECP256k1, SigningKey
+
+import cashOut
+
+DEFAULT_UTXO_COUNTS = [1, 10, 50, 100, 200]
+BENCH_PRIVKEY_HEX = hashlib.sha256(b"benchmark key").hexdigest()
+
+def bench_address():
+    public_key = SigningKey.from_string(bytes.fromhex(BENCH_PRIVKEY_HEX), curve=SECP256k1).get_verifying_key()
+    return cashOut.public_key_to_address(public_key.to_string("compressed"))
+
+def make_utxos(count, address):
+    script_pubkey = cashOut.create_script_pubkey(address)
+    return [{
+        'transaction_hash': hashlib.sha256(f"utxo {index}".encode()).hexdigest(),
+        'index': index % 4,
+        'value': 100000000,
+        'scriptPubKey': script_pubkey,
+    } for index in range(count)]
+
+def best_of(repeats, function):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(utxo_counts=DEFAULT_UTXO_COUNTS):
+    # Change and the dev fee go to the benchmark key's address while the suite runs
+    address = bench_address()
+    saved_addresses = cashOut.from_address, cashOut.dev_fee_address
+    cashOut.from_address = address
+    cashOut.dev_fee_address = address
+    try:
+        results = [bench_utxo_count(count, address) for count in utxo_counts]
+    finally:
+        cashOut.from_address, cashOut.dev_fee_address = saved_addresses
+    return {"results": results}
+
+def bench_utxo_count(count, address):
+    utxos = make_utxos(count, address)
+    # Spend every UTXO: the amount needs all but a fraction of the last one
+    amount = count * 100000000 - 5000000
+    tx = cashOut.create_raw_transaction(utxos, address, amount, 2250000, 100000)
+    repeats = max(1, 20 // count)
+    sign_seconds = best_of(repeats, lambda: cashOut.sign_transaction(copy.deepcopy(tx), BENCH_PRIVKEY_HEX))
+    signed = cashOut.sign_transaction(copy.deepcopy(tx), BENCH_PRIVKEY_HEX)
+    serialize_seconds = best_of(max(3, repeats), lambda: cashOut.serialize_transaction(signed))
+    return {
+        "utxos": count,
+        "inputs": len(tx['inputs']),
+        "serialize_ms": 1000 * serialize_seconds,
+        "sign_ms": 1000 * sign_seconds,
+        "sign_ms_per_input": 1000 * sign_seconds / len(tx['inputs']),
+        "raw_tx_bytes": len(cashOut.serialize_transaction(signed)),
+    }
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_UTXO_COUNTS
+    print(json.dumps(run(counts), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Dealing latency and JSON-RPC calls per dealt card, against the local stub node:
+deal_card_from and the word pool, as the game deals, and the legacy deal_card
+card pool as a second result.
+
+Usage: python benchmarks/benchDealing.py [number_of_cards] [latency_ms]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dealCard
+from cards import FULL_DECK, JOKER_CARDS
+import rpcClient
+from stubRpcServer import StubRpcServer
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def close_block_hash_cache():
+    cache = dealCard.get_block_hash_cache()
+    if cache is not None:
+        cache.close()
+    dealCard.get_block_hash_cache.cache_clear()
+
+def fresh_state(cache_path):
+    # An empty entropy pool and word pool, an unknown tip and an empty block hash cache
+    # (never the real one, which must not receive the stub's hashes)
+    dealCard.block_hash_cache_path = cache_path
+    dealCard.get_block_hash_cache.cache_clear()
+    dealCard.get_entropy_pool.cache_clear()
+    dealCard.get_word_pool.cache_clear()
+    dealCard.clear_tip_height_cache()
+
+def time_dealing(stub, count, deal, cache_path):
+    fresh_state(cache_path)
+    try:
+        deal()  # open the keep-alive connection outside the timings
+        stub.reset_counts()
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(count):
+            card_start = time.perf_counter()
+            deal()
+            latencies.append(time.perf_counter() - card_start)
+        elapsed = time.perf_counter() - start
+    finally:
+        # Let a background refill finish before its cache is closed
+        for pool in (dealCard.get_entropy_pool(), dealCard.get_word_pool()):
+            if pool.refill_thread is not None:
+                pool.refill_thread.join()
+        close_block_hash_cache()
+    calls = dict(stub.calls)
+    latencies.sort()
+    return {
+        "cards_per_second": count / elapsed,
+        "latency_ms": {
+            "mean": 1000 * elapsed / count,
+            "p50": 1000 * percentile(latencies, 0.50),
+            "p99": 1000 * percentile(latencies, 0.99),
+        },
+        "rpc_calls_per_card": sum(calls.values()) / count,
+        "http_requests_per_card": stub.http_requests / count,
+        "rpc_calls": calls,
+    }
+
+def run(count=500, latency_ms=0.0):
+    # Times deal_card_from over a full deck, the way the game deals, and the legacy
+    # card pool (deal_card) for comparison
+    stub = StubRpcServer(latency=latency_ms / 1000.0).start()
+    cache_dir = tempfile.TemporaryDirectory()
+    rpcClient.get_rpc_client().url = stub.url
+    try:
+        results = {"cards": count, "stub_latency_ms": latency_ms}
+        results.update(time_dealing(stub, count, lambda: dealCard.deal_card_from(FULL_DECK & ~JOKER_CARDS),
+                                    os.path.join(cache_dir.name, "words.dat")))
+        results["legacy_deal_card"] = time_dealing(stub, count, dealCard.deal_card,
+                                                   os.path.join(cache_dir.name, "cards.dat"))
+    finally:
+        stub.stop()
+        cache_dir.cleanup()
+    return results
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    print(json.dumps(run(count, latency_ms), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Hand evaluation throughput: the lookup-table evaluator against the original
+string-parsing one, on random hands and on joker-heavy hands.
+
+Usage: python benchmarks/benchEvaluator.py [number_of_hands]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cards import CARD_NAMES, JOKER_1, JOKER_2
+from pokerHandEvaluator import evaluate_cards, evaluate_hand, evaluate_hand_reference, evaluate_hands
+
+def random_hands(count, seed=1):
+    rng = random.Random(seed)
+    return [rng.sample(range(len(CARD_NAMES)), 5) for _ in range(count)]
+
+def joker_heavy_hands(count, seed=2):
+    # Every hand holds at least one joker; half of them hold both
+    rng = random.Random(seed)
+    hands = []
+    for index in range(count):
+        jokers = [JOKER_1, JOKER_2] if index % 2 else [rng.choice([JOKER_1, JOKER_2])]
+        hand = rng.sample(range(52), 5 - len(jokers)) + jokers
+        rng.shuffle(hand)
+        hands.append(hand)
+    return hands
+
+def time_calls(function, hands):
+    start = time.perf_counter()
+    for hand in hands:
+        function(hand)
+    return time.perf_counter() - start
+
+def run(count=200000):
+    evaluate_hands(np.array(random_hands(1), dtype=np.int8))  # build the batch tables outside the timings
+    results = {}
+    for label, hands in [("random", random_hands(count)), ("joker_heavy", joker_heavy_hands(count))]:
+        named_hands = [[CARD_NAMES[card] for card in hand] for hand in hands]
+        hand_array = np.array(hands, dtype=np.int8)
+        timings = {
+            "evaluate_hand_reference": time_calls(evaluate_hand_reference, named_hands),
+            "evaluate_hand_names": time_calls(evaluate_hand, named_hands),
+            "evaluate_hand_ids": time_calls(evaluate_hand, hands),
+            "evaluate_cards": time_calls(evaluate_cards, hands),
+            "evaluate_hands": time_calls(evaluate_hands, [hand_array]),
+        }
+        baseline = timings["evaluate_hand_reference"]
+        results[label] = {
+            name: {"seconds": elapsed, "hands_per_second": count / elapsed, "speedup": baseline / elapsed}
+            for name, elapsed in timings.items()
+        }
+    return {"hands": count, "results": results}
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(json.dumps(run(count), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Load test for gameServer: many concurrent sessions, each on its own keep-alive
+connection, playing hands as fast as the server answers. Reports the action
+latency p50/p99 overall and per action.
+
+Without --url, a game server is started in this process on a background thread,
+dealing from the local stub node.
+
+Usage: python benchmarks/benchGameServer.py [--sessions N] [--hands N] [--url http://host:port] [--latency-ms MS]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dealCard
+import gameServer
+import rpcClient
+from benchDealing import percentile
+from cards import card_rank
+from stubRpcServer import StubRpcServer
+
+STARTING_CREDITS = 1000
+
+class Client:
+    # One session's keep-alive HTTP connection
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, body=None):
+        payload = json.dumps(body or {}).encode()
+        self.writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           "Content-Type: application/json\r\n"
+                           f"Content-Length: {len(payload)}\r\n\r\n").encode("latin-1") + payload)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+def holds_for(hand):
+    # Hold every card whose rank is paired or better; enough to exercise the draw
+    ranks = Counter(card_rank(card) for card in hand)
+    return [position for position, card in enumerate(hand) if ranks[card_rank(card)] > 1]
+
+async def play_session(host, port, hands, latencies, errors):
+    client = Client(host, port)
+    await client.connect()
+
+    async def act(action, path, method="POST", body=None):
+        start = time.perf_counter()
+        status, reply = await client.request(method, path, body)
+        latencies[action].append(time.perf_counter() - start)
+        if status != 200:
+            errors[f"{action}: {reply.get('error')}"] += 1
+        return reply
+
+    try:
+        state = await act("open", "/sessions", body={"credits": STARTING_CREDITS})
+        path = f"/sessions/{state['session']}"
+        for hand in range(hands):
+            state = await act("deal", f"{path}/deal")
+            if state.get("state") != "DEAL":
+                break
+            state = await act("draw", f"{path}/draw", body={"held": holds_for(state["hand"])})
+            if state["win"]:
+                # Double up every other win, take the rest
+                if hand % 2:
+                    state = await act("double_up", f"{path}/double_up", body={"choice": "red"})
+                    if state["state"] == "DBL_UP":
+                        await act("leave", f"{path}/leave")
+                else:
+                    await act("take", f"{path}/take")
+        await act("close", path, method="DELETE")
+    finally:
+        await client.close()
+
+async def run_load(host, port, sessions, hands):
+    latencies = defaultdict(list)
+    errors = Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(play_session(host, port, hands, latencies, errors) for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+def start_local_server(latency_ms):
+    # A stub node, a throwaway block hash cache and closed-session log, and a game server
+    # on its own event loop
+    stub = StubRpcServer(latency=latency_ms / 1000.0).start()
+    cache_dir = tempfile.TemporaryDirectory()
+    rpcClient.get_rpc_client().url = stub.url
+    dealCard.block_hash_cache_path = os.path.join(cache_dir.name, "block_hashes.dat")
+    dealCard.get_block_hash_cache.cache_clear()
+    dealCard.get_word_pool.cache_clear()
+    dealCard.clear_tip_height_cache()
+
+    game_server = gameServer.GameServer(closed_sessions_path=os.path.join(cache_dir.name, "closed_sessions.jsonl"))
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(game_server.start(port=0), loop).result()
+    port = server.sockets[0].getsockname()[1]
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(game_server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        game_server.shutdown()
+        stub.stop()
+        cache = dealCard.get_block_hash_cache()
+        if cache is not None:
+            cache.close()
+        dealCard.get_block_hash_cache.cache_clear()
+        cache_dir.cleanup()
+    return gameServer.DEFAULT_HOST, port, stop
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50_ms": 1000 * percentile(values, 0.50),
+        "p99_ms": 1000 * percentile(values, 0.99),
+    }
+
+def run(sessions=200, hands=20, url=None, latency_ms=0.0):
+    if url:
+        parts = urlsplit(url)
+        host, port, stop = parts.hostname, parts.port, None
+    else:
+        host, port, stop = start_local_server(latency_ms)
+    try:
+        latencies, errors, elapsed = asyncio.run(run_load(host, port, sessions, hands))
+    finally:
+        if stop is not None:
+            stop()
+    every_action = [value for action, values in latencies.items() if action not in ("open", "close")
+                    for value in values]
+    return {
+        "sessions": sessions,
+        "hands_per_session": hands,
+        "stub_latency_ms": None if url else latency_ms,
+        "seconds": elapsed,
+        "actions_per_second": len(every_action) / elapsed,
+        "latency": summarize(every_action),
+        "by_action": {action: summarize(values) for action, values in sorted(latencies.items())},
+        "errors": dict(errors),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the game server")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--hands", type=int, default=20, help="hands per session")
+    parser.add_argument("--url", help="an already running game server (default: start one against the stub node)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated RPC latency of the stub node")
+    args = parser.parse_args()
+    print(json.dumps(run(args.sessions, args.hands, args.url, args.latency_ms), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Runs the benchmark suite and writes the results as one JSON document, so that
+runs from different releases can be compared.
+
+Usage: python benchmarks/runBenchmarks.py [--output results.json] [--only evaluator,dealing,cashout,server]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import benchCashOut
+import benchDealing
+import benchEvaluator
+import benchGameServer
+
+SUITES = ["evaluator", "dealing", "cashout", "server"]
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--only", default=",".join(SUITES), help="comma-separated subset of " + ",".join(SUITES))
+    parser.add_argument("--hands", type=int, default=200000, help="hands per evaluator benchmark")
+    parser.add_argument("--cards", type=int, default=500, help="cards dealt by the dealing benchmark")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated RPC latency per request")
+    parser.add_argument("--utxos", default="1,10,50,100,200", help="UTXO counts for the cashout benchmark")
+    parser.add_argument("--sessions", type=int, default=200, help="concurrent sessions for the server load test")
+    args = parser.parse_args()
+
+    suites = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = sorted(set(suites) - set(SUITES))
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": {},
+    }
+    if "evaluator" in suites:
+        report["results"]["evaluator"] = benchEvaluator.run(args.hands)
+    if "dealing" in suites:
+        report["results"]["dealing"] = benchDealing.run(args.cards, args.latency_ms)
+    if "cashout" in suites:
+        report["results"]["cashout"] = benchCashOut.run([int(count) for count in args.utxos.split(",")])
+    if "server" in suites:
+        report["results"]["server"] = benchGameServer.run(args.sessions, latency_ms=args.latency_ms)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
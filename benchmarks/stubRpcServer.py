@@ -0,0 +1,97 @@
+"""
+Local stand-in for the node's JSON-RPC interface, for benchmarks.
+
+Answers getblockcount and getblockhash (single calls and batch arrays) with
+deterministic hashes, and counts HTTP requests and calls per method. An optional
+per-request delay imitates network latency.
+"""
+import hashlib
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def block_hash(height):
+    return hashlib.sha256(f"block {height}".encode()).hexdigest()
+
+class StubRpcServer:
+    def __init__(self, tip_height=1000000, latency=0.0):
+        self.tip_height = tip_height
+        self.latency = latency
+        self.http_requests = 0
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counts(self):
+        with self.lock:
+            self.http_requests = 0
+            self.calls.clear()
+
+    def call_count(self):
+        with self.lock:
+            return sum(self.calls.values())
+
+    def answer(self, call):
+        method = call.get("method")
+        params = call.get("params", [])
+        with self.lock:
+            self.calls[method] += 1
+        if method == "getblockcount":
+            result, error = self.tip_height, None
+        elif method == "getblockhash":
+            height = params[0]
+            if 0 <= height <= self.tip_height:
+                result, error = block_hash(height), None
+            else:
+                result, error = None, {"code": -8, "message": "Block height out of range"}
+        else:
+            result, error = None, {"code": -32601, "message": "Method not found"}
+        return {"result": result, "error": error, "id": call.get("id")}
+
+    def make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub.lock:
+                    stub.http_requests += 1
+                if stub.latency:
+                    stub.event.wait(stub.latency)
+                request = json.loads(body)
+                if isinstance(request, list):
+                    response = [stub.answer(call) for call in request]
+                else:
+                    response = stub.answer(request)
+                payload = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
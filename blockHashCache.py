@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+"""
+blockHashCache.py
+
+On-disk height -> block hash store for dealCard.
+
+The file is a flat array of 32-byte records, record N holding the hash of the
+block at height N, and is memory-mapped so a lookup is a slice of the map. A
+record of all zeros means the height has not been fetched yet (no block hash is
+zero). The file grows as higher heights are stored; heights in between stay
+unwritten and take no disk space on filesystems with sparse files.
+
+Blocks near the tip can still be replaced by a reorganisation, so only heights
+at least REORG_DEPTH below the tip are stored.
+
+The file is block_hashes.dat next to RPC.conf unless the BLOCK_HASH_CACHE
+environment variable names another path; an empty value turns the cache off.
+
+Usage: python blockHashCache.py backfill [--start HEIGHT] [--end HEIGHT] [--batch-size N] [--path FILE]
+"""
+
+import argparse
+import logging
+import mmap
+import os
+import random
+import sys
+import threading
+
+RECORD_SIZE = 32
+EMPTY_RECORD = bytes(RECORD_SIZE)
+# The file is grown in steps of this many records to avoid remapping on every store
+GROWTH_RECORDS = 1 << 16
+REORG_DEPTH = 6
+BACKFILL_BATCH_SIZE = 1000
+CACHE_PATH_ENV = "BLOCK_HASH_CACHE"
+
+def default_cache_path():
+    # $BLOCK_HASH_CACHE if set (None when it is empty: no cache), else next to RPC.conf
+    path = os.environ.get(CACHE_PATH_ENV)
+    if path is not None:
+        return path or None
+    if getattr(sys, 'frozen', False):
+        return os.path.join(os.path.dirname(sys.executable), 'block_hashes.dat')
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'block_hashes.dat')
+
+class BlockHashCache:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a+b')
+        self.map = None
+        self.records = 0
+        self.stored_heights = None  # Heights holding a hash, listed on first use by random_hashes
+        self.remap()
+        self.hits = 0
+        self.misses = 0
+
+    def remap(self):
+        if self.map is not None:
+            self.map.close()
+        size = os.fstat(self.file.fileno()).st_size
+        self.records = size // RECORD_SIZE
+        self.map = mmap.mmap(self.file.fileno(), size) if size else None
+
+    def close(self):
+        with self.lock:
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.file.close()
+
+    def __len__(self):
+        # Number of heights the file has room for, stored or not
+        return self.records
+
+    def read_record(self, height):
+        if height < 0 or height >= self.records:
+            return None
+        offset = height * RECORD_SIZE
+        record = self.map[offset:offset + RECORD_SIZE]
+        return None if record == EMPTY_RECORD else record.hex()
+
+    def get(self, height):
+        with self.lock:
+            block_hash = self.read_record(height)
+            if block_hash is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return block_hash
+
+    def put_many(self, items):
+        # Store (height, hash) pairs, growing the file to fit the highest height
+        items = [(height, bytes.fromhex(block_hash)) for height, block_hash in items]
+        if not items:
+            return
+        for height, record in items:
+            if height < 0 or len(record) != RECORD_SIZE:
+                raise ValueError(f"Invalid block hash record for height {height}")
+        with self.lock:
+            highest = max(height for height, record in items)
+            if highest >= self.records:
+                records = (highest // GROWTH_RECORDS + 1) * GROWTH_RECORDS
+                self.file.truncate(records * RECORD_SIZE)
+                self.remap()
+            for height, record in items:
+                if self.stored_heights is not None and self.read_record(height) is None:
+                    self.stored_heights.append(height)
+                offset = height * RECORD_SIZE
+                self.map[offset:offset + RECORD_SIZE] = record
+
+    def put(self, height, block_hash):
+        self.put_many([(height, block_hash)])
+
+    def flush(self):
+        with self.lock:
+            if self.map is not None:
+                self.map.flush()
+
+    def random_hashes(self, count, min_heights=0):
+        # Hashes of `count` distinct stored heights drawn at random, for dealing while the
+        # node is unreachable. Raises ValueError when fewer than min_heights heights are
+        # stored: drawing from a handful of hashes would deal the same cards again and again.
+        with self.lock:
+            if self.stored_heights is None:
+                self.stored_heights = [height for height in range(self.records) if self.read_record(height) is not None]
+            if len(self.stored_heights) < max(count, min_heights):
+                raise ValueError(f"Only {len(self.stored_heights)} block hashes cached, "
+                                 f"at least {max(count, min_heights)} needed")
+            return [self.read_record(height) for height in random.sample(self.stored_heights, count)]
+
+    def missing_heights(self, start, end):
+        with self.lock:
+            return [height for height in range(start, end + 1) if self.read_record(height) is None]
+
+def backfill(cache, start, end, batch_size=BACKFILL_BATCH_SIZE):
+    # Fetch and store every missing height in [start, end], one batch request at a time
+    from dealCard import get_block_hashes
+
+    missing = cache.missing_heights(start, end)
+    print(f"{len(missing)} of {end - start + 1} heights to fetch")
+    for index in range(0, len(missing), batch_size):
+        heights = missing[index:index + batch_size]
+        cache.put_many(zip(heights, get_block_hashes(heights)))
+        print(f"  stored up to height {heights[-1]} ({index + len(heights)}/{len(missing)})", file=sys.stderr)
+    cache.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the on-disk block hash cache")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subcommands.add_parser("backfill", help="fetch and store a range of block hashes")
+    backfill_parser.add_argument("--start", type=int, default=0)
+    backfill_parser.add_argument("--end", type=int, help=f"last height (default: {REORG_DEPTH} below the tip)")
+    backfill_parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    backfill_parser.add_argument("--path", default=default_cache_path())
+    args = parser.parse_args()
+
+    from dealCard import get_block_count
+
+    end = args.end
+    if end is None:
+        end = get_block_count() - REORG_DEPTH
+    cache = BlockHashCache(args.path)
+    try:
+        backfill(cache, args.start, end, args.batch_size)
+    except KeyboardInterrupt:
+        print("Interrupted; the heights stored so far are kept")
+        sys.exit(1)
+    finally:
+        cache.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
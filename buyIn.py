@@ -1,21 +1,6 @@
-import configparser
-from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
 from decimal import Decimal
 
-# Load RPC credentials from RPC.conf
-config = configparser.ConfigParser()
-config.read('RPC.conf')
-
-rpc_user = config['rpcconfig']['rpcuser']
-rpc_password = config['rpcconfig']['rpcpassword']
-rpc_host = config['rpcconfig']['rpchost']
-rpc_port = config['rpcconfig']['rpcport']
-
-# Create a connection to the Litecoin RPC server
-def create_rpc_connection():
-    return AuthServiceProxy(f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}")
-
-rpc_connection = create_rpc_connection()
+from rpcClient import JSONRPCException, get_rpc_client
 
 # Define the recipient address (update with your recipient address)
 recipient_address = "<player pool address>"
@@ -25,6 +10,7 @@ def process_transaction(from_address, amount_ltc):
         # Set up transaction details
         to_address = recipient_address
         amount = Decimal(str(amount_ltc))
+        rpc_connection = get_rpc_client()
         
         # List unspent transactions for the from_address
         unspent_txs = rpc_connection.listunspent(0, 9999999, [from_address])
@@ -0,0 +1,83 @@
+"""
+cards.py
+
+Compact card representation shared by dealing, evaluation and rendering.
+
+A card is a small int: suit * 13 + rank for the 52 natural cards (suits in
+dealCard order, ranks running 2..Ace), then 52 and 53 for the two jokers.
+Sets of cards (a hand, the dealt cards, the live deck) are int bitmasks with
+bit n standing for card n. Names like "10 of Hearts" are only produced at
+the display and logging edges.
+"""
+
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
+JOKERS = ['Joker 1', 'Joker 2']
+
+CARD_NAMES = [f"{rank} of {suit}" for suit in SUITS for rank in RANKS] + JOKERS
+CARD_INDEX = {name: index for index, name in enumerate(CARD_NAMES)}
+
+JOKER_1 = 52
+JOKER_2 = 53
+DECK_SIZE = len(CARD_NAMES)
+
+# Bitmask card sets
+NO_CARDS = 0
+NATURAL_CARDS = (1 << 52) - 1
+JOKER_CARDS = (1 << JOKER_1) | (1 << JOKER_2)
+FULL_DECK = NATURAL_CARDS | JOKER_CARDS
+
+def card_name(card):
+    return CARD_NAMES[card]
+
+def card_index(name):
+    if name not in CARD_INDEX:
+        raise ValueError(f"Unknown card: {name}")
+    return CARD_INDEX[name]
+
+def to_card(card):
+    # Accept either a card id or a card name
+    return card_index(card) if isinstance(card, str) else card
+
+def is_joker(card):
+    return card >= JOKER_1
+
+def card_rank(card):
+    # Index into RANKS; None for jokers
+    return None if card >= JOKER_1 else card % 13
+
+def card_suit(card):
+    # Index into SUITS; None for jokers
+    return None if card >= JOKER_1 else card // 13
+
+def make_card(rank, suit):
+    return SUITS.index(suit) * 13 + RANKS.index(rank)
+
+def card_bit(card):
+    return 1 << card
+
+def card_set(cards):
+    mask = NO_CARDS
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
+def cards_in(mask):
+    # Card ids in a bitmask, lowest first
+    cards = []
+    while mask:
+        low_bit = mask & -mask
+        cards.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return cards
+
+def card_count(mask):
+    return bin(mask).count('1')
+
+def nth_card(mask, index):
+    # The card id of the index-th set bit of a bitmask, lowest first
+    for _ in range(index):
+        mask &= mask - 1
+    if not mask:
+        raise IndexError("Card index out of range")
+    return (mask & -mask).bit_length() - 1
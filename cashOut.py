@@ -7,22 +7,15 @@ This script signs and sends a luckycoin transaction from a specified address usi
 without importing the address into the luckycoin Core wallet.
 """
 
-from decimal import Decimal
-from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
 from ecdsa import SigningKey, SECP256k1, util
 import hashlib
 import struct
 import base58
-import configparser
+import threading
+from functools import lru_cache
 
-# Load RPC configuration from RPC.conf
-config = configparser.ConfigParser()
-config.read('RPC.conf')
-
-rpc_user = config['rpcconfig']['rpcuser']
-rpc_password = config['rpcconfig']['rpcpassword']
-rpc_host = config['rpcconfig']['rpchost']
-rpc_port = int(config['rpcconfig']['rpcport'])
+from rpcClient import JSONRPCException, RpcConnectionError, get_rpc_client
+from utxoIndex import UtxoIndex
 
 # Wallet information
 dev_fee_address = "<dev fee address>"
@@ -39,29 +32,13 @@ def varint(n):
     else:
         return b'\xff' + struct.pack('<Q', n)
 
-def get_utxos(address):
-    """
-    Retrieve UTXOs for the given address using luckycoin Core RPC.
-    """
-    rpc_connection = AuthServiceProxy(f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}")
-    utxos = []
+@lru_cache(maxsize=1)
+def get_utxo_index(address):
+    # The pool's outputs, listed once and then kept current (see utxoIndex.py)
+    return UtxoIndex(address)
 
-    try:
-        # Get the list of unspent transaction outputs for the address
-        utxos_list = rpc_connection.listunspent(1, 9999999, [address])
-        for utxo in utxos_list:
-            utxo_info = {
-                'transaction_hash': utxo['txid'],
-                'index': utxo['vout'],
-                'value': int(Decimal(str(utxo['amount'])) * Decimal('1e8')),  # Convert lucky to satoshis
-                'scriptPubKey': utxo['scriptPubKey'],
-            }
-            utxos.append(utxo_info)
-            print(f"UTXO: {utxo_info}")  # Print UTXO details
-    except JSONRPCException as e:
-        print(f"An error occurred while retrieving UTXOs: {e.error['message']}")
-
-    return utxos
+# One cashout at a time, so two cannot select the same outputs
+cashout_lock = threading.Lock()
 
 def create_script_pubkey(address):
     # Decode the address (assuming it's a base58check encoded address)
@@ -213,7 +190,7 @@ def broadcast_transaction(raw_tx_hex):
     """
     Broadcast the transaction to the network via luckycoin Core RPC.
     """
-    rpc_connection = AuthServiceProxy(f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}")
+    rpc_connection = get_rpc_client()
 
     try:
         txid = rpc_connection.sendrawtransaction(raw_tx_hex)
@@ -223,6 +200,10 @@ def broadcast_transaction(raw_tx_hex):
         print(f"An error occurred: {e.error['message']}")
         return None
 
+def transaction_id(raw_tx):
+    # Double SHA-256 of the serialized transaction, shown byte-reversed as the node does
+    return hashlib.sha256(hashlib.sha256(raw_tx).digest()).digest()[::-1].hex()
+
 def send_lucky(to_address, amount_lucky, win_differential):
     amount_satoshis = int(amount_lucky * 1e8)
     fee_lucky = 0.0225  # Define the transaction fee in lucky (adjust as needed)
@@ -231,23 +212,39 @@ def send_lucky(to_address, amount_lucky, win_differential):
     # Calculate dev fee based on win_differential
     dev_fee_satoshis = int(win_differential * 1e8 * 0.01)  # 1% of the win_differential
 
-    utxos = get_utxos(from_address)
-
-    # Create the raw transaction
-    tx = create_raw_transaction(utxos, to_address, amount_satoshis, fee_satoshis, dev_fee_satoshis)
-
-    # Sign the transaction
-    tx_signed = sign_transaction(tx, privkey_hex)
-
-    # Serialize the signed transaction
-    raw_tx = serialize_transaction(tx_signed)
-    raw_tx_hex = raw_tx.hex()
-
-    # Print the raw transaction hex
-    print(f"Raw transaction hex: {raw_tx_hex}")
-
-    # Broadcast the transaction
-    return broadcast_transaction(raw_tx_hex)
+    with cashout_lock:
+        utxo_index = get_utxo_index(from_address)
+        utxos = utxo_index.utxos()
+
+        # Create the raw transaction
+        tx = create_raw_transaction(utxos, to_address, amount_satoshis, fee_satoshis, dev_fee_satoshis)
+
+        # Sign the transaction
+        tx_signed = sign_transaction(tx, privkey_hex)
+
+        # Serialize the signed transaction
+        raw_tx = serialize_transaction(tx_signed)
+        raw_tx_hex = raw_tx.hex()
+
+        # Print the raw transaction hex
+        print(f"Raw transaction hex: {raw_tx_hex}")
+
+        # Broadcast the transaction
+        try:
+            txid = broadcast_transaction(raw_tx_hex)
+        except RpcConnectionError as e:
+            # The node may have accepted it before the connection failed; the call is
+            # never resent, so hold the inputs back rather than spend them twice
+            txid = transaction_id(raw_tx)
+            print(f"Broadcast outcome unknown ({e}). TXID if accepted: {txid}")
+            utxo_index.record_possible_broadcast(txid, tx)
+            return None
+        if txid:
+            utxo_index.record_broadcast(txid, tx)
+        else:
+            # The node refused it, perhaps over an output the index thought unspent
+            utxo_index.invalidate()
+        return txid
 
 def public_key_to_address(public_key_bytes):
     # Perform SHA256 hashing on the public key
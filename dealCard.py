@@ -1,125 +1,269 @@
 import random
-import requests
-from requests.auth import HTTPBasicAuth
-import configparser
 from functools import lru_cache
-import os
-import sys
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import logging
+import threading
 import time
+from collections import deque
 
-def get_config_path():
-    if getattr(sys, 'frozen', False):
-        # Running as compiled executable
-        return os.path.join(os.path.dirname(sys.executable), 'RPC.conf')
-    else:
-        # Running as script
-        return os.path.join(os.path.dirname(__file__), 'RPC.conf')
-
-# Read RPC configuration
-config = configparser.ConfigParser()
-config_path = get_config_path()
-if not os.path.exists(config_path):
-    raise FileNotFoundError(f"Config file not found: {config_path}")
-config.read(config_path)
-
-rpc_user = config['rpcconfig']['rpcuser']
-rpc_password = config['rpcconfig']['rpcpassword']
-rpc_host = config['rpcconfig']['rpchost']
-rpc_port = config['rpcconfig']['rpcport']
-
-# Define the deck of cards
-suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
-deck = [f"{rank} of {suit}" for suit in suits for rank in ranks]
+from blockHashCache import REORG_DEPTH, BlockHashCache, default_cache_path
+from cards import JOKER_1, JOKER_2, RANKS, SUITS, card_count, nth_card
+from rpcClient import RpcConnectionError, get_rpc_client
+
+# Define the deck of cards as card ids (see cards.py); deck[i] is named CARD_NAMES[i]
+suits = SUITS
+ranks = RANKS
+deck = list(range(52))
 
 # Define jokers
-jokers = ['Joker 1', 'Joker 2']
-
-# Prepare RPC request
-url = f"http://{rpc_host}:{rpc_port}"
-headers = {'content-type': 'application/json'}
-auth = HTTPBasicAuth(rpc_user, rpc_password)
-
-# Create a session with retry mechanism
-def create_session():
-    session = requests.Session()
-    retry = Retry(total=3, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    session.auth = HTTPBasicAuth(rpc_user, rpc_password)
-    session.headers.update({'content-type': 'application/json'})
-    return session
-
-# Use LRU cache to store the session
-@lru_cache(maxsize=1)
-def get_session():
-    return create_session()
+jokers = [JOKER_1, JOKER_2]
+
+# On-disk block hash cache (see blockHashCache.py); None turns it off
+block_hash_cache_path = default_cache_path()
+# Dealing falls back to cached hashes only once the node has failed every retry, and
+# only from at least this many distinct heights; fewer would repeat the same cards
+CACHE_FALLBACK_MIN_HEIGHTS = 10000
 
+# Node calls go through the shared client in rpcClient.py
 def get_block_count():
-    payload = {
-        "method": "getblockcount",
-        "params": [],
-        "jsonrpc": "2.0",
-        "id": 0,
-    }
-    session = get_session()
     try:
-        response = session.post(url, json=payload, timeout=10)
-        response.raise_for_status()
-        return response.json()['result']
-    except requests.RequestException as e:
+        return get_rpc_client().call("getblockcount")
+    except RpcConnectionError as e:
         logging.error(f"Error in get_block_count: {e}")
         raise
 
 def get_block_hash(height):
-    payload = {
-        "method": "getblockhash",
-        "params": [height],
-        "jsonrpc": "2.0",
-        "id": 0,
-    }
-    session = get_session()
     try:
-        response = session.post(url, json=payload, timeout=10)
-        response.raise_for_status()
-        return response.json()['result']
-    except requests.RequestException as e:
+        return get_rpc_client().call("getblockhash", height)
+    except RpcConnectionError as e:
         logging.error(f"Error in get_block_hash: {e}")
         raise
 
+def rpc_batch(calls):
+    # Send [(method, params), ...] as one batch request; the results in call order
+    try:
+        return get_rpc_client().batch(calls)
+    except RpcConnectionError as e:
+        logging.error(f"Error in rpc_batch: {e}")
+        raise
+
+def get_block_hashes(heights):
+    return rpc_batch([("getblockhash", [height]) for height in heights])
+
+# The chain tip only moves every few minutes, so it is re-read at most this often
+TIP_HEIGHT_TTL = 30.0
+tip_height_cache = {"height": None, "expires": 0.0}
+tip_height_lock = threading.Lock()
+
+def get_tip_height():
+    with tip_height_lock:
+        now = time.monotonic()
+        if tip_height_cache["height"] is None or now >= tip_height_cache["expires"]:
+            tip_height_cache["height"] = get_block_count()
+            tip_height_cache["expires"] = now + TIP_HEIGHT_TTL
+        return tip_height_cache["height"]
+
+def clear_tip_height_cache():
+    with tip_height_lock:
+        tip_height_cache["height"] = None
+
 def extract_random_digits(hash_data):
     if len(hash_data) < 3:
         raise ValueError("Hash data too short")
     start = random.randint(0, len(hash_data) - 3)
     return int(hash_data[start:start+3], 16)
 
-def deal_card():
+def card_from_digits(digits):
+    # Map a 3-hex-digit value (0-4095) to a card: 78 values per natural card, one per
+    # joker, and None for the values that are rejected to keep the mapping unbiased
+    if 4057 <= digits <= 4058:
+        return jokers[digits - 4057]
+    elif digits < 4056:
+        return deck[digits % 52]
+    return None
+
+def extract_cards(block_hash):
+    # Every card in a block hash, read as consecutive 3-hex-digit windows. The leading
+    # zeros and the first non-zero digit are bounded by the proof-of-work target, so
+    # they are skipped rather than treated as random.
+    digits = block_hash.lstrip('0')[1:]
+    cards = []
+    for start in range(0, len(digits) - 2, 3):
+        card = card_from_digits(int(digits[start:start+3], 16))
+        if card is not None:
+            cards.append(card)
+    return cards
+
+# Random words for bounded draws: 8 hex digits (32 bits) each
+WORD_DIGITS = 8
+WORD_BITS = 4 * WORD_DIGITS
+
+def extract_words(block_hash):
+    # Every whole 32-bit word in a block hash, after the same proof-of-work skip as
+    # extract_cards. No value is rejected here; bounded_draw removes the bias.
+    digits = block_hash.lstrip('0')[1:]
+    return [int(digits[start:start+WORD_DIGITS], 16) for start in range(0, len(digits) - WORD_DIGITS + 1, WORD_DIGITS)]
+
+@lru_cache(maxsize=1)
+def get_block_hash_cache():
+    # The on-disk block hash cache, or None when it is turned off or cannot be opened
+    if not block_hash_cache_path:
+        return None
+    try:
+        return BlockHashCache(block_hash_cache_path)
+    except OSError as e:
+        logging.warning(f"Block hash cache unavailable, fetching every hash from the node: {e}")
+        return None
+
+def lookup_block_hashes(heights, max_height):
+    # Hashes for `heights`, from the cache where possible and in one batch request
+    # for the rest. Fetched heights safely below the tip are added to the cache.
+    cache = get_block_hash_cache()
+    if cache is None:
+        return get_block_hashes(heights)
+    hashes = [cache.get(height) for height in heights]
+    missing = [height for height, block_hash in zip(heights, hashes) if block_hash is None]
+    if missing:
+        fetched = dict(zip(missing, get_block_hashes(missing)))
+        cache.put_many((height, block_hash) for height, block_hash in fetched.items()
+                       if height <= max_height - REORG_DEPTH)
+        hashes = [fetched[height] if block_hash is None else block_hash for height, block_hash in zip(heights, hashes)]
+    return hashes
+
+def fetch_random_block_hashes(count):
+    # Hashes of `count` random blocks, with at most one batch request to the node
     max_retries = 3
-    retry_count = 0
-    while retry_count < max_retries:
+    for attempt in range(1, max_retries + 1):
         try:
-            max_height = get_block_count()
-            random_height = random.randint(0, max_height)
-            block_hash = get_block_hash(random_height)
-
-            digits = extract_random_digits(block_hash)
-
-            if 4057 <= digits <= 4058:
-                return jokers[digits - 4057]
-            elif digits < 4056:
-                return deck[digits % 52]
-        except (requests.RequestException, ValueError, RuntimeError) as e:
-            retry_count += 1
-            logging.warning(f"Error occurred (attempt {retry_count}/{max_retries}): {e}. Retrying...")
-            # Clear the session cache to force a new connection
-            get_session.cache_clear()
-            # Add a small delay before retrying
-            time.sleep(1)
+            max_height = get_tip_height()
+            return lookup_block_hashes([random.randint(0, max_height) for _ in range(count)], max_height)
+        except (RpcConnectionError, ValueError, RuntimeError, KeyError) as e:
+            error = e
+            logging.warning(f"Error occurred (attempt {attempt}/{max_retries}): {e}")
+            if attempt < max_retries:
+                # Reopen the node connections, and re-read the tip in case a stale
+                # height caused the error
+                get_rpc_client().reset()
+                clear_tip_height_cache()
+                # Add a small delay before retrying
+                time.sleep(1)
+    return cached_block_hashes(count, error)
 
+def cached_block_hashes(count, error):
+    # Keep dealing from the cache once the node has failed every retry, if it holds
+    # enough distinct heights
+    cache = get_block_hash_cache()
+    if cache is not None:
+        try:
+            hashes = cache.random_hashes(count, CACHE_FALLBACK_MIN_HEIGHTS)
+            logging.error(f"Node unavailable ({error}); dealing from {len(hashes)} cached block hashes")
+            return hashes
+        except ValueError as e:
+            logging.error(f"Cannot deal from the block hash cache: {e}")
     error_message = "Max retries reached. Unable to deal card."
     logging.error(error_message)
     raise RuntimeError(error_message)
+
+# Entropy pool sizes, in cards (or words)
+POOL_LOW_WATER = 10
+POOL_TARGET = 40
+# One block hash yields about 19 cards or 5 words; refills ask for enough hashes at these rates
+CARDS_PER_HASH = 19
+WORDS_PER_HASH = 5
+
+class EntropyPool:
+    """
+    Values extracted from block hashes (cards by default), handed out in the order
+    they were fetched. When the pool runs below low_water, a background thread tops
+    it up to target, so taking a value is usually a local pop; an empty pool is
+    refilled on the caller's thread.
+    """
+
+    def __init__(self, low_water=POOL_LOW_WATER, target=POOL_TARGET, fetch_hashes=None,
+                 extract=extract_cards, items_per_hash=CARDS_PER_HASH):
+        self.low_water = low_water
+        self.target = target
+        self.fetch_hashes = fetch_hashes or fetch_random_block_hashes
+        self.extract = extract
+        self.items_per_hash = items_per_hash
+        self.items = deque()
+        self.lock = threading.Lock()
+        self.refill_thread = None
+        self.hashes_fetched = 0
+        self.items_taken = 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self.items)
+
+    def pop(self):
+        while True:
+            with self.lock:
+                if self.items:
+                    item = self.items.popleft()
+                    self.items_taken += 1
+                    running_low = len(self.items) < self.low_water
+                    break
+            self.fill()
+        if running_low:
+            self.refill_in_background()
+        return item
+
+    def add_hashes(self, block_hashes):
+        items = [item for block_hash in block_hashes for item in self.extract(block_hash)]
+        with self.lock:
+            self.items.extend(items)
+            self.hashes_fetched += len(block_hashes)
+
+    def fill(self):
+        while True:
+            missing = self.target - len(self)
+            if missing <= 0:
+                return
+            self.add_hashes(self.fetch_hashes(-(-missing // self.items_per_hash)))
+
+    def refill_in_background(self):
+        with self.lock:
+            if self.refill_thread is not None and self.refill_thread.is_alive():
+                return
+            self.refill_thread = threading.Thread(target=self.background_fill, daemon=True)
+            self.refill_thread.start()
+
+    def background_fill(self):
+        try:
+            self.fill()
+        except RuntimeError as e:
+            # The next pop refills on the caller's thread and raises if the node is still down
+            logging.warning(f"Background entropy refill failed: {e}")
+
+@lru_cache(maxsize=1)
+def get_entropy_pool():
+    return EntropyPool()
+
+@lru_cache(maxsize=1)
+def get_word_pool():
+    return EntropyPool(extract=extract_words, items_per_hash=WORDS_PER_HASH)
+
+def deal_card():
+    return get_entropy_pool().pop()
+
+def bounded_draw(bound, next_word=None):
+    # Uniform integer in [0, bound) from 32-bit random words, by Lemire's
+    # multiply-and-shift. A word is only redrawn when it lands in the
+    # (2**32 % bound) low values that would bias the result, which for a deck
+    # of at most 54 cards happens about once in 80 million draws.
+    next_word = next_word or get_word_pool().pop
+    product = next_word() * bound
+    low = product & ((1 << WORD_BITS) - 1)
+    if low < bound:
+        threshold = (1 << WORD_BITS) % bound
+        while low < threshold:
+            product = next_word() * bound
+            low = product & ((1 << WORD_BITS) - 1)
+    return product >> WORD_BITS
+
+def deal_card_from(remaining, next_word=None):
+    # A card drawn uniformly from the bitmask of cards still in the deck
+    count = card_count(remaining)
+    if count == 0:
+        raise ValueError("No cards left to deal")
+    return nth_card(remaining, bounded_draw(count, next_word))
@@ -0,0 +1,130 @@
+"""
+dealingService.py
+
+Deals cards on a worker thread so the caller (the pygame loop) never waits on the
+node. A request names how many cards to deal and the bitmask of cards already out;
+when the cards are ready the service calls notify(result) from the worker thread.
+DrawPoker's notify posts a pygame user event, which is safe from any thread.
+
+result is a dict with:
+    request_id  the id returned by request()
+    purpose     the caller's label for the request, e.g. "deal", "draw", "double_up"
+    cards       the dealt card ids, or None on failure
+    error       the error message on failure, else None
+
+HandPrefetcher deals the next hand ahead of time in the same way.
+"""
+
+import hashlib
+import logging
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cards import JOKER_CARDS
+from dealCard import deal_card_from
+from pokerEngine import sequential_card_source
+
+class DealingService:
+    # deal_from(remaining) returns one card from the bitmask of cards still in the deck
+
+    def __init__(self, notify, deal_from=deal_card_from, max_workers=1):
+        self.notify = notify
+        self.deal_cards = sequential_card_source(deal_from)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dealing")
+        self.lock = threading.Lock()
+        self.next_request_id = 0
+        self.pending = set()
+
+    def request(self, purpose, count, drawn):
+        # Queue `count` distinct cards dealt from outside the `drawn` bitmask; returns the request id
+        with self.lock:
+            request_id = self.next_request_id
+            self.next_request_id += 1
+            self.pending.add(request_id)
+        self.executor.submit(self.run, request_id, purpose, count, drawn)
+        return request_id
+
+    def busy(self):
+        with self.lock:
+            return bool(self.pending)
+
+    def run(self, request_id, purpose, count, drawn):
+        result = {"request_id": request_id, "purpose": purpose, "cards": None, "error": None}
+        try:
+            result["cards"] = self.deal_cards(count, drawn)
+        except Exception as e:
+            logging.error(f"Dealing {count} card(s) for {purpose} failed: {e}")
+            result["error"] = str(e)
+        finally:
+            with self.lock:
+                self.pending.discard(request_id)
+        self.notify(result)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class HandReservation:
+    # Ten cards for one hand, committed before the player sees any of them: cards[:5]
+    # are dealt, and the j-th replaced card is cards[5 + j] whatever the player holds
+    def __init__(self, cards):
+        self.cards = cards
+        self.nonce = secrets.token_hex(16)
+        self.commitment = hashlib.sha256(self.reveal().encode()).hexdigest()
+
+    def reveal(self):
+        # The committed text; publishing it after the hand lets anyone check the commitment
+        return f"{self.nonce}:{','.join(str(card) for card in self.cards)}"
+
+class HandPrefetcher:
+    """
+    Deals the next hand's five cards and five replacements on a worker thread while
+    the player is idle. The cards are fixed, and their commitment made, before the
+    hand starts, and are used in the order they were dealt. The caller publishes the
+    commitment when it deals the hand and the reveal once the hand is over.
+    """
+
+    CARDS = 10
+
+    def __init__(self, deal_from=deal_card_from, excluded=JOKER_CARDS):
+        self.deal_cards = sequential_card_source(deal_from)
+        self.excluded = excluded
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self.lock = threading.Lock()
+        self.future = None
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def prefetch(self):
+        # Start reserving the next hand unless one is reserved or on its way. A failed
+        # attempt (the node was down) is logged and started again.
+        with self.lock:
+            if self.future is not None and self.future.done() and self.future.exception() is not None:
+                logging.warning(f"Prefetching the next hand failed: {self.future.exception()}")
+                self.failures += 1
+                self.future = None
+            if self.future is None:
+                self.future = self.executor.submit(self.reserve)
+
+    def reserve(self):
+        return HandReservation(self.deal_cards(self.CARDS, self.excluded))
+
+    def take(self):
+        # The reserved hand if it is ready (a hit), else None (a miss). A reservation
+        # still on its way is kept for the hand after this one.
+        with self.lock:
+            future = self.future
+            if future is None or not future.done() or future.exception() is not None:
+                self.misses += 1
+                return None
+            self.future = None
+            self.hits += 1
+            return future.result()
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "failures": self.failures}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
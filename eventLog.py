@@ -0,0 +1,39 @@
+"""
+eventLog.py
+
+Buffered, structured game event log: one JSON object per line, each with the time,
+the event name and its fields. Events are collected in memory and written together
+by flush(), which the game calls once per finished hand and when it publishes a
+hand's commitment, so logging never costs a write per frame.
+"""
+
+import atexit
+import json
+import logging
+import threading
+import time
+
+DEFAULT_EVENT_LOG_PATH = "game_events.jsonl"
+
+class EventLog:
+    def __init__(self, path=DEFAULT_EVENT_LOG_PATH):
+        self.path = path
+        self.buffer = []
+        self.lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def record(self, event, **fields):
+        line = json.dumps({"time": time.time(), "event": event, **fields}, default=str)
+        with self.lock:
+            self.buffer.append(line)
+
+    def flush(self):
+        with self.lock:
+            lines, self.buffer = self.buffer, []
+        if not lines:
+            return
+        try:
+            with open(self.path, "a") as file:
+                file.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logging.error(f"Could not write {len(lines)} event(s) to {self.path}: {e}")
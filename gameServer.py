@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+
+"""
+gameServer.py
+
+Hosts many five card draw poker sessions in one process over a small JSON-over-HTTP
+API, for a venue with several seats. Every session is a DrawPokerEngine with the
+game's pay table. All sessions deal from dealCard's shared pool of random
+words (get_word_pool()), filled through the shared pooled RPC client
+(rpcClient.get_rpc_client()).
+Cards are dealt on a small thread pool, so the event loop never waits on the node.
+
+Credits and wallets stay with the venue's front end (buyIn/cashOut). A session is
+opened with the credits it bought in with, and its final credits are returned when
+it is closed. Closing finishes the session first: a dealt hand is drawn with its
+holds and any win is banked. Every close, including sessions closed for being idle,
+is appended to the closed-session log (CLOSED_SESSIONS_PATH) with its final credits
+and passed to the server's on_close callback, so the front end can pay out a session
+nobody closed. The server listens on localhost unless told otherwise.
+
+API (request and response bodies are JSON objects):
+    POST   /sessions               {"credits": n}  open a session
+    GET    /sessions/<id>                          the session's state
+    POST   /sessions/<id>/<action> {...}           play; actions below
+    DELETE /sessions/<id>                          close the session
+    GET    /stats                                  server counters
+
+Actions:
+    deal                          bet and deal a new hand
+    hold       {"position": i}    toggle the hold on card i (0-4)
+    draw       {"held": [i, ...]} replace the cards not held; "held" is optional
+                                  and sets the holds first
+    bet        {"delta": +1|-1}   change the bet between hands
+    take                          bank the last win
+    double_up  {"choice": c}      double the win on red, black or a suit
+    leave                         leave the double-up, banking the win
+
+A refused action answers 400 with {"error": message}, the message the pygame game
+would show.
+
+Usage: python gameServer.py [--host HOST] [--port PORT] [--deal-workers N]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cards import card_name
+from dealCard import deal_card_from, get_word_pool
+from eventLog import EventLog
+from payTable import pay_table
+from pokerEngine import DBL_UP, DEAL, NEW_GAME, DrawPokerEngine, sequential_card_source
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8750
+DEAL_WORKERS = 4
+# The server grows dealCard's shared word pool to this size for many seats: a refill
+# of 200 hashes (1000 words, one word per card) is a single batch request
+SERVER_POOL_LOW_WATER = 250
+SERVER_POOL_TARGET = 1000
+# Sessions left without an action this long are closed
+SESSION_IDLE_TIMEOUT = 30 * 60
+# Every closed session's final credits, one JSON object per line
+CLOSED_SESSIONS_PATH = "closed_sessions.jsonl"
+MAX_BODY_SIZE = 64 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class GameSession:
+    def __init__(self, session_id, engine):
+        self.session_id = session_id
+        self.engine = engine
+        # One action at a time per session, including the wait for its cards
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+
+    def state(self):
+        engine = self.engine
+        return {
+            "session": self.session_id,
+            "state": engine.state,
+            "credits": engine.credits,
+            "bet": engine.bet,
+            "win": engine.win,
+            "hand": engine.hand,
+            "cards": [card_name(card) if card is not None else None for card in engine.hand],
+            "held": engine.held,
+            "ranking": engine.ranking,
+            "double_up_card": engine.double_up_card,
+            "hands_played": engine.hands_played,
+        }
+
+class GameServer:
+    def __init__(self, deal_from=None, deal_workers=DEAL_WORKERS, pay_table=pay_table,
+                 closed_sessions_path=CLOSED_SESSIONS_PATH, on_close=None):
+        if deal_from is None:
+            # Deal from the one shared word pool, the game's own entropy source
+            word_pool = get_word_pool()
+            word_pool.low_water = max(word_pool.low_water, SERVER_POOL_LOW_WATER)
+            word_pool.target = max(word_pool.target, SERVER_POOL_TARGET)
+            deal_from = deal_card_from
+            self.word_pool = word_pool
+        else:
+            self.word_pool = None
+        self.card_source = sequential_card_source(deal_from)
+        self.pay_table = pay_table
+        self.executor = ThreadPoolExecutor(max_workers=deal_workers, thread_name_prefix="dealing")
+        self.sessions = {}
+        self.closed_log = EventLog(closed_sessions_path)
+        self.on_close = on_close  # on_close(state, reason) for each closed session
+        self.actions = 0
+        self.started = time.monotonic()
+        self.server = None
+        self.expiry_task = None
+
+    # Sessions
+
+    def open_session(self, credits):
+        # JSON true and false are ints to Python; they are not credits
+        if not isinstance(credits, int) or isinstance(credits, bool) or credits < 0:
+            raise HttpError(400, "credits must be a non-negative integer")
+        session_id = secrets.token_hex(8)
+        engine = DrawPokerEngine(self.card_source, self.pay_table, credits)
+        self.sessions[session_id] = GameSession(session_id, engine)
+        return self.sessions[session_id]
+
+    def get_session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HttpError(404, f"No session {session_id}")
+        session.last_active = time.monotonic()
+        return session
+
+    async def close_session(self, session_id, reason="closed"):
+        session = self.get_session(session_id)
+        async with session.lock:
+            return await self.finish_session(session, reason)
+
+    async def finish_session(self, session, reason):
+        # Settle the session and record its final credits; the caller holds session.lock
+        if self.sessions.get(session.session_id) is not session:
+            raise HttpError(404, f"No session {session.session_id}")
+        engine = session.engine
+        # Whatever is still won counts toward the credits paid out
+        if engine.state == DEAL:
+            if all(card is None for card in engine.hand):
+                engine.cancel_hand()
+            else:
+                # The bet is placed: draw to the holds, as the player would have
+                try:
+                    engine.finish_draw(await self.deal_cards(engine, len(engine.begin_draw())))
+                except Exception as e:
+                    logging.error(f"Drawing the open hand of session {session.session_id} failed: {e}")
+        if engine.state == DBL_UP:
+            engine.leave_double_up()
+        elif engine.state == NEW_GAME:
+            engine.take_win()
+        del self.sessions[session.session_id]
+        state = session.state()
+        self.closed_log.record("session_closed", reason=reason, **state)
+        self.closed_log.flush()
+        if self.on_close is not None:
+            try:
+                self.on_close(state, reason)
+            except Exception:
+                logging.exception(f"on_close failed for session {session.session_id}")
+        return session
+
+    async def expire_idle_sessions(self):
+        while True:
+            await asyncio.sleep(60)
+            cutoff = time.monotonic() - SESSION_IDLE_TIMEOUT
+            for session_id, session in list(self.sessions.items()):
+                if session.last_active < cutoff and not session.lock.locked():
+                    async with session.lock:
+                        # An action may have come in while waiting for the lock
+                        if session.last_active >= cutoff or self.sessions.get(session_id) is not session:
+                            continue
+                        logging.info(f"Closing idle session {session_id} with {session.engine.credits} credits")
+                        await self.finish_session(session, "idle")
+
+    async def deal_cards(self, engine, count):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.card_source, count, engine.drawn)
+
+    # Actions
+
+    async def act(self, session, action, params):
+        engine = session.engine
+        if action == "deal":
+            count = engine.begin_hand()
+            try:
+                engine.deal(await self.deal_cards(engine, count))
+            except Exception:
+                engine.cancel_hand()
+                raise
+        elif action == "hold":
+            engine.toggle_hold(self.position(params.get("position")))
+        elif action == "draw":
+            if "held" in params:
+                self.set_holds(engine, params["held"])
+            count = len(engine.begin_draw())
+            engine.finish_draw(await self.deal_cards(engine, count))
+        elif action == "bet":
+            delta = params.get("delta")
+            if delta not in (-1, 1):
+                raise HttpError(400, "delta must be 1 or -1")
+            if not engine.change_bet(delta):
+                raise ValueError("The bet cannot change now")
+        elif action == "take":
+            engine.take_win()
+        elif action == "double_up":
+            if engine.state == NEW_GAME:
+                engine.enter_double_up()
+            engine.choose_double_up(params.get("choice"))
+            engine.begin_double_up()
+            card = (await self.deal_cards(engine, 1))[0]
+            engine.settle_double_up(card)
+        elif action == "leave":
+            engine.leave_double_up()
+        else:
+            raise HttpError(404, f"Unknown action: {action}")
+
+    def position(self, position):
+        if not isinstance(position, int) or isinstance(position, bool) or not 0 <= position < 5:
+            raise HttpError(400, "position must be 0-4")
+        return position
+
+    def set_holds(self, engine, held):
+        if not isinstance(held, list):
+            raise HttpError(400, "held must be a list of positions")
+        positions = {self.position(position) for position in held}
+        for position in range(5):
+            if engine.held[position] != (position in positions):
+                engine.toggle_hold(position)
+
+    async def dispatch(self, method, path, body):
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["stats"] and method == "GET":
+            return self.stats()
+        if not parts or parts[0] != "sessions" or len(parts) > 3:
+            raise HttpError(404, f"No route for {path}")
+        if len(parts) == 1:
+            if method != "POST":
+                raise HttpError(405, f"{method} not allowed on {path}")
+            return self.open_session(body.get("credits", 0)).state()
+        if len(parts) == 2:
+            if method == "GET":
+                return self.get_session(parts[1]).state()
+            if method == "DELETE":
+                return (await self.close_session(parts[1])).state()
+            raise HttpError(405, f"{method} not allowed on {path}")
+        if method != "POST":
+            raise HttpError(405, f"{method} not allowed on {path}")
+        session = self.get_session(parts[1])
+        async with session.lock:
+            if self.sessions.get(session.session_id) is not session:
+                raise HttpError(404, f"No session {session.session_id}")  # Closed while waiting
+            await self.act(session, parts[2], body)
+            self.actions += 1
+            return session.state()
+
+    def stats(self):
+        return {
+            "sessions": len(self.sessions),
+            "actions": self.actions,
+            "uptime": time.monotonic() - self.started,
+            "entropy_pool": len(self.word_pool) if self.word_pool is not None else None,
+        }
+
+    # HTTP
+
+    async def read_request(self, reader):
+        # (method, path, body, keep_alive), or None when the client closed the connection
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY_SIZE:
+            raise HttpError(413, "Request body too large")
+        body = {}
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError:
+                raise HttpError(400, "Request body is not JSON")
+            if not isinstance(body, dict):
+                raise HttpError(400, "Request body must be a JSON object")
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, path, body, keep_alive
+
+    def write_response(self, writer, status, reply, keep_alive):
+        payload = json.dumps(reply).encode()
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self.read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    status, reply = 200, await self.dispatch(method, path, body)
+                except HttpError as e:
+                    status, reply = e.status, {"error": str(e)}
+                except ValueError as e:
+                    status, reply = 400, {"error": str(e)}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    logging.exception("Action failed")
+                    status, reply = 500, {"error": str(e)}
+                self.write_response(writer, status, reply, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        self.expiry_task = asyncio.get_running_loop().create_task(self.expire_idle_sessions())
+        return self.server
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        logging.info(f"Game server listening on http://{address[0]}:{address[1]}")
+        async with server:
+            await server.serve_forever()
+
+    async def stop(self):
+        if self.expiry_task is not None:
+            self.expiry_task.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve many draw poker sessions over HTTP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--deal-workers", type=int, default=DEAL_WORKERS)
+    args = parser.parse_args()
+
+    game_server = GameServer(deal_workers=args.deal_workers)
+    try:
+        asyncio.run(game_server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        game_server.shutdown()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,62 +1,72 @@
-def get_card_coordinates(card_name):
-    # Predefined card coordinates
-    card_coordinates = {
-        "Ace of Clubs": (-1, 0),
-        "2 of Clubs": (147, 0),
-        "3 of Clubs": (295, 0),
-        "4 of Clubs": (442, 0),
-        "5 of Clubs": (590, 0),
-        "6 of Clubs": (738, 0),
-        "7 of Clubs": (885, 0),
-        "8 of Clubs": (1033, 0),
-        "9 of Clubs": (1181, 0),
-        "10 of Clubs": (1328, 0),
-        "Jack of Clubs": (1476, 0),
-        "Queen of Clubs": (1623, 0),
-        "King of Clubs": (1771, 0),
-        "Ace of Diamonds": (-1, 230),
-        "2 of Diamonds": (147, 230),
-        "3 of Diamonds": (295, 230),
-        "4 of Diamonds": (442, 230),
-        "5 of Diamonds": (590, 230),
-        "6 of Diamonds": (738, 230),
-        "7 of Diamonds": (885, 230),
-        "8 of Diamonds": (1033, 230),
-        "9 of Diamonds": (1181, 230),
-        "10 of Diamonds": (1328, 230),
-        "Jack of Diamonds": (1476, 230),
-        "Queen of Diamonds": (1623, 230),
-        "King of Diamonds": (1771, 230),
-        "Ace of Hearts": (-1, 460),
-        "2 of Hearts": (147, 460),
-        "3 of Hearts": (294, 460),
-        "4 of Hearts": (442, 460),
-        "5 of Hearts": (590, 460),
-        "6 of Hearts": (737, 460),
-        "7 of Hearts": (885, 460),
-        "8 of Hearts": (1033, 460),
-        "9 of Hearts": (1181, 460),
-        "10 of Hearts": (1328, 460),
-        "Jack of Hearts": (1476, 460),
-        "Queen of Hearts": (1624, 460),
-        "King of Hearts": (1771, 460),
-        "Ace of Spades": (-1, 690),
-        "2 of Spades": (147, 690),
-        "3 of Spades": (294, 690),
-        "4 of Spades": (442, 690),
-        "5 of Spades": (590, 690),
-        "6 of Spades": (738, 690),
-        "7 of Spades": (885, 690),
-        "8 of Spades": (1033, 690),
-        "9 of Spades": (1180, 690),
-        "10 of Spades": (1328, 690),
-        "Jack of Spades": (1476, 690),
-        "Queen of Spades": (1624, 690),
-        "King of Spades": (1771, 690),
-        "Joker 1": (-1, 920),
-        "Joker 2": (147, 920),
-        "Back": (295, 920)
-    }
+from cards import CARD_NAMES, DECK_SIZE
 
-    # Return the coordinates for the given card name
-    return card_coordinates.get(card_name, (None, None))
+# Predefined card coordinates in the sprite sheet
+CARD_COORDINATES_BY_NAME = {
+    "Ace of Clubs": (-1, 0),
+    "2 of Clubs": (147, 0),
+    "3 of Clubs": (295, 0),
+    "4 of Clubs": (442, 0),
+    "5 of Clubs": (590, 0),
+    "6 of Clubs": (738, 0),
+    "7 of Clubs": (885, 0),
+    "8 of Clubs": (1033, 0),
+    "9 of Clubs": (1181, 0),
+    "10 of Clubs": (1328, 0),
+    "Jack of Clubs": (1476, 0),
+    "Queen of Clubs": (1623, 0),
+    "King of Clubs": (1771, 0),
+    "Ace of Diamonds": (-1, 230),
+    "2 of Diamonds": (147, 230),
+    "3 of Diamonds": (295, 230),
+    "4 of Diamonds": (442, 230),
+    "5 of Diamonds": (590, 230),
+    "6 of Diamonds": (738, 230),
+    "7 of Diamonds": (885, 230),
+    "8 of Diamonds": (1033, 230),
+    "9 of Diamonds": (1181, 230),
+    "10 of Diamonds": (1328, 230),
+    "Jack of Diamonds": (1476, 230),
+    "Queen of Diamonds": (1623, 230),
+    "King of Diamonds": (1771, 230),
+    "Ace of Hearts": (-1, 460),
+    "2 of Hearts": (147, 460),
+    "3 of Hearts": (294, 460),
+    "4 of Hearts": (442, 460),
+    "5 of Hearts": (590, 460),
+    "6 of Hearts": (737, 460),
+    "7 of Hearts": (885, 460),
+    "8 of Hearts": (1033, 460),
+    "9 of Hearts": (1181, 460),
+    "10 of Hearts": (1328, 460),
+    "Jack of Hearts": (1476, 460),
+    "Queen of Hearts": (1624, 460),
+    "King of Hearts": (1771, 460),
+    "Ace of Spades": (-1, 690),
+    "2 of Spades": (147, 690),
+    "3 of Spades": (294, 690),
+    "4 of Spades": (442, 690),
+    "5 of Spades": (590, 690),
+    "6 of Spades": (738, 690),
+    "7 of Spades": (885, 690),
+    "8 of Spades": (1033, 690),
+    "9 of Spades": (1180, 690),
+    "10 of Spades": (1328, 690),
+    "Jack of Spades": (1476, 690),
+    "Queen of Spades": (1624, 690),
+    "King of Spades": (1771, 690),
+    "Joker 1": (-1, 920),
+    "Joker 2": (147, 920),
+    "Back": (295, 920)
+}
+
+# The back of the card follows the 54 card ids
+CARD_BACK = DECK_SIZE
+CARD_COORDINATES = tuple(CARD_COORDINATES_BY_NAME[name] for name in CARD_NAMES) + (CARD_COORDINATES_BY_NAME["Back"],)
+
+def get_card_coordinates(card):
+    # Accepts a card id, CARD_BACK, or a card name such as "Ace of Clubs" or "Back"
+    if isinstance(card, str):
+        return CARD_COORDINATES_BY_NAME.get(card, (None, None))
+    if not 0 <= card <= CARD_BACK:
+        return (None, None)
+    return CARD_COORDINATES[card]
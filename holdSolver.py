@@ -0,0 +1,164 @@
+"""
+holdSolver.py
+
+Expected value of every hold pattern for a dealt five-card hand.
+
+For each card subset X of up to four cards, the subset tables hold the hand class
+counts over all final hands of the 54-card deck that contain X (built once with
+evaluate_hands). The draws for a hold H that discards D are the final hands
+containing H and nothing from D, so their class counts follow by
+inclusion-exclusion: the sum over S within D of (-1)^|S| * counts(H + S),
+computed for all 32 holds at once as a Mobius transform over the hand's subsets.
+The resulting counts do not depend on the pay table and are memoized per
+suit-canonical hand.
+
+Hold patterns are 5-bit masks over hand positions: bit i set means hand[i] is held.
+"""
+
+from functools import lru_cache
+from itertools import chain, combinations, permutations
+from math import comb
+
+import numpy as np
+
+from cards import DECK_SIZE, JOKER_1, JOKER_2, to_card
+from pokerHandEvaluator import HAND_CLASSES, evaluate_cards, evaluate_hands
+
+NUM_CLASSES = len(HAND_CLASSES)
+HOLD_PATTERNS = 32
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+# COMBINATIONS[n][k] = C(n, k), used to rank sorted card subsets (combinatorial number system)
+COMBINATIONS = [[comb(n, k) for k in range(6)] for n in range(DECK_SIZE + 1)]
+
+def subset_index(cards):
+    # Position of a sorted card subset among all subsets of the same size
+    return sum(COMBINATIONS[card][i + 1] for i, card in enumerate(cards))
+
+@lru_cache(maxsize=1)
+def get_subset_tables():
+    # SUBSET_TABLES[k][subset_index(X)] = class counts of the final hands containing X, |X| = k
+    count = comb(DECK_SIZE, 5)
+    hands = np.fromiter(chain.from_iterable(combinations(range(DECK_SIZE), 5)), dtype=np.int8, count=count * 5)
+    hands = hands.reshape(count, 5)
+    classes = evaluate_hands(hands).astype(np.int64)
+    columns = hands.T.astype(np.int64)
+    combinations_table = np.asarray(COMBINATIONS, dtype=np.int64)
+
+    tables = []
+    for size in range(5):
+        size_count = comb(DECK_SIZE, size)
+        table = np.zeros(size_count * NUM_CLASSES, dtype=np.int64)
+        for positions in combinations(range(5), size):
+            index = np.zeros(count, dtype=np.int64)
+            for i, position in enumerate(positions):
+                index += combinations_table[columns[position], i + 1]
+            table += np.bincount(index * NUM_CLASSES + classes, minlength=size_count * NUM_CLASSES)
+        table = table.reshape(size_count, NUM_CLASSES)
+        table.flags.writeable = False
+        tables.append(table)
+    return tables
+
+def containing_counts(cards, tables):
+    # Class counts of the final hands that contain every card in `cards`
+    cards = sorted(cards)
+    if len(cards) == 5:
+        counts = np.zeros(NUM_CLASSES, dtype=np.int64)
+        counts[evaluate_cards(cards)] = 1
+        return counts
+    return tables[len(cards)][subset_index(cards)]
+
+def canonical_hand(hand):
+    # Smallest sorted relabelling of the hand under suit permutations and joker swaps,
+    # plus, for each position of the canonical hand, the matching position in the input.
+    # The two jokers are interchangeable, so a lone joker is always relabelled Joker 1.
+    best = None
+    for permutation in SUIT_PERMUTATIONS:
+        relabelled = []
+        for position, card in enumerate(hand):
+            if card >= JOKER_1:
+                mapped = card if JOKER_2 in hand and JOKER_1 in hand else JOKER_1
+            else:
+                mapped = permutation[card // 13] * 13 + card % 13
+            relabelled.append((mapped, position))
+        relabelled.sort()
+        if best is None or relabelled < best:
+            best = relabelled
+    return tuple(card for card, position in best), tuple(position for card, position in best)
+
+def compute_class_counts(hand, include_jokers=True):
+    # (32, NUM_CLASSES) counts of final hand classes per hold pattern, without memoization.
+    # Subsets of the hand plus any cards out of play are indexed by bit mask over `universe`.
+    tables = get_subset_tables()
+    universe = list(hand) + ([] if include_jokers else [joker for joker in (JOKER_1, JOKER_2) if joker not in hand])
+    counts = np.zeros((1 << len(universe), NUM_CLASSES), dtype=np.int64)
+    for subset in range(1 << len(universe)):
+        cards = [card for j, card in enumerate(universe) if subset >> j & 1]
+        if len(cards) <= 5:
+            counts[subset] = containing_counts(cards, tables)
+    # Superset Mobius transform, one bit at a time: afterwards counts[X] is the number of
+    # final hands whose cards from the universe are exactly X, i.e. the draws for holding X
+    for bit in range(len(universe)):
+        view = counts.reshape(-1, 2, 1 << bit, NUM_CLASSES)
+        view[:, 0] -= view[:, 1]
+    return counts[:HOLD_PATTERNS]
+
+@lru_cache(maxsize=4096)
+def canonical_class_counts(canonical, include_jokers):
+    counts = compute_class_counts(canonical, include_jokers)
+    counts.flags.writeable = False
+    return counts
+
+def hold_class_counts(hand, include_jokers=True):
+    # Final hand class counts per hold pattern, with patterns over the positions of `hand`
+    hand = [to_card(card) for card in hand]
+    if len(set(hand)) != 5:
+        raise ValueError(f"Expected five distinct cards, got {hand}")
+    canonical, positions = canonical_hand(hand)
+    canonical_counts = canonical_class_counts(canonical, include_jokers)
+    # Canonical pattern bit j refers to input position positions[j]
+    counts = np.empty_like(canonical_counts)
+    for pattern in range(HOLD_PATTERNS):
+        original = 0
+        for j in range(5):
+            if pattern >> j & 1:
+                original |= 1 << positions[j]
+        counts[original] = canonical_counts[pattern]
+    return counts
+
+def payouts_for_bet(pay_table, bet):
+    # Payout per hand class code at a bet of 1..5 coins; classes not in the table pay 0
+    return [pay_table[name][bet - 1] if name in pay_table else 0 for name in HAND_CLASSES]
+
+def hold_evs(hand, bet, pay_table, include_jokers=True):
+    # Expected payout (in credits, at `bet` coins) of each of the 32 hold patterns.
+    # Jokers in the dealt hand stay in it; include_jokers only controls the draw deck.
+    counts = hold_class_counts(hand, include_jokers)
+    payouts = np.asarray(payouts_for_bet(pay_table, bet), dtype=np.float64)
+    # Each pattern's counts add up to its number of equally likely draws
+    return list(counts @ payouts / counts.sum(axis=1))
+
+def pattern_to_held(pattern):
+    return [bool(pattern >> position & 1) for position in range(5)]
+
+def best_hold(hand, bet, pay_table, include_jokers=True):
+    # (held_cards, ev) for the hold pattern with the highest expected payout
+    evs = hold_evs(hand, bet, pay_table, include_jokers)
+    pattern = max(range(HOLD_PATTERNS), key=lambda pattern: evs[pattern])
+    return pattern_to_held(pattern), evs[pattern]
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from payTable import pay_table
+
+    hand = sys.argv[1:6] or ["10 of Hearts", "Jack of Hearts", "Queen of Hearts", "King of Hearts", "2 of Spades"]
+    get_subset_tables()
+    start = time.perf_counter()
+    evs = hold_evs(hand, 5, pay_table)
+    elapsed = time.perf_counter() - start
+    for pattern in sorted(range(HOLD_PATTERNS), key=lambda pattern: -evs[pattern])[:5]:
+        held = [card for card, keep in zip(hand, pattern_to_held(pattern)) if keep]
+        print(f"{evs[pattern]:10.4f}  hold {held}")
+    print(f"Solved in {elapsed * 1000:.1f} ms")
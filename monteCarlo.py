@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+"""
+monteCarlo.py
+
+Monte Carlo simulator for quick what-if checks on the pay table and the double-up.
+
+Hands are played in fixed-size batches. Each batch gets its own numpy random stream,
+spawned from one root seed, so the totals for a given seed and hand count are the
+same no matter how many worker processes share the batches. Each batch deals ten
+distinct cards per hand (five dealt, five replacements) with a vectorized partial
+shuffle, asks the hold strategy for a hold mask per hand, and scores the final
+hands with evaluate_hands.
+
+Strategies are functions strategy(hands, bet, pay_table, include_jokers) that take
+an (N, 5) card array and return N hold masks (bit i set = hold hand[i]). Use one of
+the names in STRATEGIES or "module:function" for your own.
+
+Usage: python monteCarlo.py --hands 100000000 [--bet 5] [--strategy basic] [--seed 1] [--workers N]
+"""
+
+import argparse
+import importlib
+import json
+import math
+import sys
+import time
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from cards import DECK_SIZE, JOKER_1, RANKS
+from holdSolver import best_hold, payouts_for_bet
+from payTable import pay_table
+from pokerHandEvaluator import HAND_CLASS_CODES, HAND_CLASSES, evaluate_hands
+
+BATCH_SIZE = 1 << 18
+# Double-up as in DrawPoker.perform_double_up: one card from the 52 natural cards
+COLOR_MULTIPLIER = 2
+SUIT_MULTIPLIER = 4
+Z_95 = 1.959964
+
+def hold_nothing(hands, bet, pay_table, include_jokers):
+    return np.zeros(len(hands), dtype=np.int64)
+
+def basic_strategy(hands, bet, pay_table, include_jokers):
+    # Keep any made straight or better; otherwise keep jokers and paired cards, and
+    # failing that, Jacks or better
+    hands = np.asarray(hands, dtype=np.intp)
+    classes = evaluate_hands(hands)
+    is_joker = hands >= JOKER_1
+    ranks = np.where(is_joker, -1, hands % 13)
+    paired = np.zeros(hands.shape, dtype=bool)
+    for position in range(5):
+        matches = (ranks == ranks[:, position:position + 1]).sum(axis=1)
+        paired[:, position] = (matches >= 2) & ~is_joker[:, position]
+    keep = paired | is_joker
+    high = ranks >= RANKS.index('Jack')
+    keep = np.where(keep.any(axis=1)[:, None], keep, high)
+    keep[classes >= HAND_CLASS_CODES["Straight"]] = True
+    return (keep * (1 << np.arange(5))).sum(axis=1)
+
+def optimal_strategy(hands, bet, pay_table, include_jokers):
+    # Exact best hold per hand from holdSolver (about a thousand hands per second)
+    masks = np.empty(len(hands), dtype=np.int64)
+    for index, hand in enumerate(np.asarray(hands).tolist()):
+        held, ev = best_hold(hand, bet, pay_table, include_jokers)
+        masks[index] = sum(1 << position for position, keep in enumerate(held) if keep)
+    return masks
+
+STRATEGIES = {
+    "none": hold_nothing,
+    "basic": basic_strategy,
+    "optimal": optimal_strategy,
+}
+
+def load_strategy(spec):
+    if spec in STRATEGIES:
+        return STRATEGIES[spec]
+    if ":" not in spec:
+        raise ValueError(f"Unknown strategy '{spec}'; use one of {sorted(STRATEGIES)} or module:function")
+    module_name, function_name = spec.split(":", 1)
+    return getattr(importlib.import_module(module_name), function_name)
+
+def deal_batch(rng, count, deck_size):
+    # (count, 10) distinct cards per hand: a partial Fisher-Yates shuffle of each row
+    decks = np.tile(np.arange(deck_size, dtype=np.int8), (count, 1))
+    rows = np.arange(count)
+    for position in range(10):
+        swap = rng.integers(position, deck_size, size=count)
+        picked = decks[rows, swap]
+        decks[rows, swap] = decks[rows, position]
+        decks[rows, position] = picked
+    return decks[:, :10]
+
+def play_batch(task):
+    # Integer totals for one batch, so that batches can be summed in any order
+    batch_seed, count, bet, strategy_spec, include_jokers, color_multiplier, suit_multiplier = task
+    rng = np.random.default_rng(batch_seed)
+    strategy = load_strategy(strategy_spec)
+    payouts = np.asarray(payouts_for_bet(pay_table, bet), dtype=np.int64)
+    start = time.perf_counter()
+
+    cards = deal_batch(rng, count, DECK_SIZE if include_jokers else 52)
+    dealt = cards[:, :5]
+    held = strategy(dealt, bet, pay_table, include_jokers)
+    hold_bits = (np.asarray(held)[:, None] >> np.arange(5)) & 1
+    final = np.where(hold_bits == 1, dealt, cards[:, 5:])
+    classes = evaluate_hands(final)
+    wins = payouts[classes]
+
+    # One double-up round on every win, on red and on hearts
+    double_up_cards = rng.integers(0, 52, size=count)
+    red = double_up_cards // 13 <= 1  # Hearts and Diamonds
+    hearts = double_up_cards // 13 == 0
+    color_wins = np.where(red, wins * color_multiplier, 0)
+    suit_wins = np.where(hearts, wins * suit_multiplier, 0)
+
+    return {
+        "hands": count,
+        "class_counts": np.bincount(classes, minlength=len(HAND_CLASSES)).tolist(),
+        "win": [int(wins.sum()), int((wins * wins).sum())],
+        "color": [int(color_wins.sum()), int((color_wins * color_wins).sum())],
+        "suit": [int(suit_wins.sum()), int((suit_wins * suit_wins).sum())],
+        "seconds": time.perf_counter() - start,
+    }
+
+def summarize(totals, hands, bet):
+    # RTP with a 95% confidence interval and the per-hand variance of a payout total pair
+    total, total_squares = totals
+    mean = total / hands
+    variance = total_squares / hands - mean * mean
+    half_width = Z_95 * math.sqrt(variance / hands)
+    return {
+        "rtp": mean / bet,
+        "ci95": [(mean - half_width) / bet, (mean + half_width) / bet],
+        "variance": variance / (bet * bet),
+    }
+
+def run(hands, bet, strategy_spec="basic", seed=1, workers=1, include_jokers=True,
+        color_multiplier=COLOR_MULTIPLIER, suit_multiplier=SUIT_MULTIPLIER, batch_size=BATCH_SIZE):
+    batch_counts = [batch_size] * (hands // batch_size) + ([hands % batch_size] if hands % batch_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_counts))
+    tasks = [(batch_seed, count, bet, strategy_spec, include_jokers, color_multiplier, suit_multiplier)
+             for batch_seed, count in zip(seeds, batch_counts)]
+    totals = {"class_counts": [0] * len(HAND_CLASSES), "win": [0, 0], "color": [0, 0], "suit": [0, 0]}
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        for result in pool.imap_unordered(play_batch, tasks):
+            for key in totals:
+                totals[key] = [a + b for a, b in zip(totals[key], result[key])]
+    elapsed = time.perf_counter() - start
+
+    return {
+        "hands": hands,
+        "bet": bet,
+        "strategy": strategy_spec,
+        "seed": seed,
+        "jokers": include_jokers,
+        "no_double_up": summarize(totals["win"], hands, bet),
+        "double_up_color": summarize(totals["color"], hands, bet),
+        "double_up_suit": summarize(totals["suit"], hands, bet),
+        "multipliers": {"color": color_multiplier, "suit": suit_multiplier},
+        "hit_rates": {name: count / hands for name, count in zip(HAND_CLASSES, totals["class_counts"])},
+        "seconds": elapsed,
+        "hands_per_second": hands / elapsed if elapsed else None,
+    }
+
+def print_report(summary):
+    print(f"{summary['hands']} hands at {summary['bet']} coin(s), strategy '{summary['strategy']}', seed {summary['seed']}")
+    print("")
+    print(f"{'':26}{'RTP':>10}  {'95% CI':>23}  {'variance':>12}")
+    for key, label in [("no_double_up", "Take every win"),
+                       ("double_up_color", f"Double up, color ({summary['multipliers']['color']}x)"),
+                       ("double_up_suit", f"Double up, suit ({summary['multipliers']['suit']}x)")]:
+        result = summary[key]
+        low, high = result["ci95"]
+        print(f"{label:26}{result['rtp'] * 100:9.4f}%  [{low * 100:9.4f}%, {high * 100:9.4f}%]  {result['variance']:12.4f}")
+    print("")
+    print("Hit rates:")
+    for name, rate in summary["hit_rates"].items():
+        print(f"  {name:16}{rate:12.8f}")
+    if summary["hands_per_second"]:
+        print("")
+        print(f"{summary['hands_per_second']:,.0f} hands/s over {summary['seconds']:.1f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo RTP and double-up simulator")
+    parser.add_argument("--hands", type=int, default=10_000_000)
+    parser.add_argument("--bet", type=int, default=5, choices=range(1, 6))
+    parser.add_argument("--strategy", default="basic", help=f"one of {sorted(STRATEGIES)} or module:function")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=cpu_count())
+    parser.add_argument("--no-jokers", action="store_true", help="use the 52-card deck DrawPoker deals from")
+    parser.add_argument("--color-multiplier", type=int, default=COLOR_MULTIPLIER)
+    parser.add_argument("--suit-multiplier", type=int, default=SUIT_MULTIPLIER)
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        load_strategy(args.strategy)
+    except (ValueError, ImportError, AttributeError) as e:
+        print(e)
+        sys.exit(1)
+    summary = run(args.hands, args.bet, args.strategy, args.seed, args.workers, not args.no_jokers,
+                  args.color_multiplier, args.suit_multiplier)
+    print_report(summary)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=2)
+
+if __name__ == "__main__":
+    main()
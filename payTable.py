@@ -0,0 +1,20 @@
+import json
+
+# Embed the JSON pay table (imported by DrawPoker and the analysis tools)
+# Payout in credits per hand ranking for bets of 1 to 5 coins
+pay_table_json = '''
+{
+  "PayTable": {
+    "RoyalFlush": [250, 500, 750, 1000, 4000],
+    "StraightFlush": [50, 100, 150, 200, 250],
+    "FourOfAKind": [25, 50, 75, 100, 125],
+    "FullHouse": [8, 16, 24, 32, 40],
+    "Flush": [5, 10, 15, 20, 25],
+    "Straight": [4, 8, 12, 16, 20],
+    "ThreeOfAKind": [3, 6, 9, 12, 15],
+    "TwoPair": [2, 4, 6, 8, 10],
+    "JacksOrBetter": [1, 2, 3, 4, 5]
+  }
+}
+'''
+pay_table = json.loads(pay_table_json)["PayTable"]
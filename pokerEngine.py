@@ -0,0 +1,233 @@
+"""
+pokerEngine.py
+
+Headless game logic for five card draw poker: credits, bets, holds, the deal and
+the draw, and the double-up, as a state machine with no pygame dependency.
+
+States:
+    NEW_GAME  between hands; a win can be taken or doubled up
+    DEAL      five cards are out and holds can be toggled; the draw ends the hand
+    DBL_UP    the double-up: pick a color or suit, then one card is drawn
+
+Cards come from a card source, card_source(count, drawn), which returns `count`
+distinct card ids that are not in the `drawn` bitmask. Every step that needs cards
+has two halves, so a client can fetch the cards asynchronously:
+begin_hand()/deal(cards), begin_draw()/finish_draw(cards) and
+begin_double_up()/settle_double_up(card). start_hand(), draw() and double_up()
+do both halves with the card source.
+
+Actions that are not allowed in the current state raise ValueError with a message
+for the player.
+"""
+
+import random
+
+from cards import FULL_DECK, JOKER_CARDS, SUITS, card_bit, card_set, card_suit, cards_in
+from payTable import pay_table as default_pay_table
+from pokerHandEvaluator import evaluate_hand
+
+NEW_GAME = "NEW_GAME"
+DEAL = "DEAL"
+DBL_UP = "DBL_UP"
+
+MAX_BET = 5
+# Double-up multipliers for guessing the color or the suit of the drawn card
+COLOR_MULTIPLIER = 2
+SUIT_MULTIPLIER = 4
+RED_SUITS = ['Hearts', 'Diamonds']
+DOUBLE_UP_CHOICES = ['red', 'black'] + [suit.lower() for suit in SUITS]
+
+def random_card_source(rng=None):
+    # Card source backed by a local random generator (the OS one by default),
+    # for running the engine without a node
+    rng = rng or random.SystemRandom()
+
+    def card_source(count, drawn):
+        return rng.sample(cards_in(FULL_DECK & ~drawn), count)
+    return card_source
+
+def sequential_card_source(deal_from):
+    # Card source from a function that deals one card from a bitmask of remaining
+    # cards, such as dealCard.deal_card_from
+    def card_source(count, drawn):
+        cards = []
+        for _ in range(count):
+            card = deal_from(FULL_DECK & ~drawn)
+            drawn |= card_bit(card)
+            cards.append(card)
+        return cards
+    return card_source
+
+class DrawPokerEngine:
+    def __init__(self, card_source=None, pay_table=default_pay_table, credits=0, excluded=JOKER_CARDS,
+                 color_multiplier=COLOR_MULTIPLIER, suit_multiplier=SUIT_MULTIPLIER):
+        self.card_source = card_source or random_card_source()
+        self.pay_table = pay_table
+        # Cards that are never dealt (the jokers, as in the original game)
+        self.excluded = excluded
+        self.color_multiplier = color_multiplier
+        self.suit_multiplier = suit_multiplier
+        self.credits = credits
+        self.bet = 1
+        self.max_bet = MAX_BET
+        self.state = NEW_GAME
+        self.win = 0
+        self.hands_played = 0
+        self.reset_hand()
+
+    def reset_hand(self):
+        self.hand = [None] * 5  # Card ids, None for face down
+        self.held = [False] * 5
+        self.ranking = None  # Ranking of the hand once all five cards are showing
+        self.drawn = self.excluded  # Bitmask of the cards out of the deck
+        self.double_up_card = None
+        self.double_up_choice = None
+
+    def add_credits(self, amount):
+        self.credits += amount
+
+    def change_bet(self, delta):
+        # Bets can change between hands only; returns whether the bet changed
+        bet = self.bet + delta
+        if self.state == DEAL or not 1 <= bet <= self.max_bet:
+            return False
+        self.bet = bet
+        return True
+
+    def payout(self, ranking):
+        return self.pay_table[ranking][self.bet - 1] if ranking in self.pay_table else 0
+
+    def take_cards(self, cards, count):
+        cards = list(cards)
+        if len(cards) != count or len(set(cards)) != count:
+            raise ValueError(f"Expected {count} distinct cards, got {cards}")
+        for card in cards:
+            if self.drawn & card_bit(card):
+                raise ValueError(f"Card {card} was already dealt")
+        self.drawn |= card_set(cards)
+        return cards
+
+    # The hand
+
+    def begin_hand(self):
+        # Place the bet and bank any win not taken yet; the hand shows five backs
+        # until deal() is given its cards. Returns the number of cards needed.
+        if self.state == DEAL:
+            raise ValueError("A hand is already in play")
+        if self.credits == 0:
+            raise ValueError("Add Credits To Play")
+        if self.credits < self.bet:
+            raise ValueError("Not enough credits!")
+        self.reset_hand()
+        self.credits -= self.bet
+        self.credits += self.win
+        self.win = 0
+        self.state = DEAL
+        return 5
+
+    def deal(self, cards):
+        if self.state != DEAL:
+            raise ValueError("No hand is waiting for cards")
+        self.hand = self.take_cards(cards, 5)
+        self.ranking = evaluate_hand(self.hand)
+        return self.hand
+
+    def start_hand(self):
+        self.deal(self.card_source(self.begin_hand(), self.drawn))
+        return self.hand
+
+    def cancel_hand(self):
+        # Give the bet back when the cards for begin_hand() could not be dealt
+        if self.state == DEAL and all(card is None for card in self.hand):
+            self.credits += self.bet
+            self.reset_hand()
+            self.state = NEW_GAME
+
+    def toggle_hold(self, position):
+        if self.state == DEAL and self.hand[position] is not None:
+            self.held[position] = not self.held[position]
+
+    def begin_draw(self):
+        # Turn every card that is not held face down; returns their positions, which
+        # finish_draw() fills in order
+        if self.state != DEAL:
+            raise ValueError("No hand to draw to")
+        replaced = [i for i in range(5) if not self.held[i] or self.hand[i] is None]
+        for i in replaced:
+            self.hand[i] = None
+        self.ranking = None
+        return replaced
+
+    def finish_draw(self, cards):
+        replacements = iter(self.take_cards(cards, self.hand.count(None)))
+        self.hand = [card if card is not None else next(replacements) for card in self.hand]
+        self.ranking = evaluate_hand(self.hand)
+        self.win = self.payout(self.ranking)
+        self.state = NEW_GAME
+        self.hands_played += 1
+        return self.ranking
+
+    def draw(self):
+        return self.finish_draw(self.card_source(len(self.begin_draw()), self.drawn))
+
+    # Winnings and the double-up
+
+    def take_win(self):
+        if self.state == NEW_GAME and self.win > 0:
+            self.credits += self.win
+            self.win = 0
+
+    def enter_double_up(self):
+        if self.state != NEW_GAME or self.win == 0:
+            raise ValueError("No win to double up")
+        self.state = DBL_UP
+        self.reset_hand()
+
+    def choose_double_up(self, choice):
+        if self.state != DBL_UP:
+            raise ValueError("Not in double up")
+        if choice not in DOUBLE_UP_CHOICES:
+            raise ValueError(f"Unknown double up choice: {choice}")
+        self.double_up_choice = choice
+
+    def begin_double_up(self):
+        # Returns the number of cards settle_double_up() needs
+        if self.state != DBL_UP:
+            raise ValueError("Not in double up")
+        if self.double_up_choice is None:
+            raise ValueError("Please select a suit or color.")
+        self.double_up_card = None
+        return 1
+
+    def settle_double_up(self, card):
+        # Show the card and pay or clear the win; a lost double-up ends in NEW_GAME
+        self.double_up_card = self.take_cards([card], 1)[0]
+        suit_name = SUITS[card_suit(self.double_up_card)]
+        if self.double_up_choice in ['red', 'black']:
+            card_color = 'red' if suit_name in RED_SUITS else 'black'
+            won = self.double_up_choice == card_color
+            multiplier = self.color_multiplier
+        else:
+            won = self.double_up_choice == suit_name.lower()
+            multiplier = self.suit_multiplier
+        self.win = self.win * multiplier if won else 0
+        self.double_up_choice = None
+        if self.win == 0:
+            self.state = NEW_GAME
+        return self.win
+
+    def double_up(self, choice=None):
+        if choice is not None:
+            self.choose_double_up(choice)
+        self.begin_double_up()
+        return self.settle_double_up(self.card_source(1, self.drawn)[0])
+
+    def leave_double_up(self):
+        # Back to the game, banking the win
+        if self.state != DBL_UP:
+            raise ValueError("Not in double up")
+        self.credits += self.win
+        self.win = 0
+        self.state = NEW_GAME
+        self.double_up_card = None
+        self.double_up_choice = None
@@ -1,6 +1,142 @@
 from collections import Counter
+from functools import lru_cache
+from itertools import combinations_with_replacement
+
+import numpy as np
+
+from cards import CARD_NAMES, JOKERS, RANKS, SUITS, to_card
+
+# Hand classes, weakest first. evaluate_cards returns an index into this tuple.
+HAND_CLASSES = (
+    "HighCard", "OnePair", "JacksOrBetter", "TwoPair", "ThreeOfAKind", "Straight",
+    "Flush", "FullHouse", "FourOfAKind", "StraightFlush", "RoyalFlush",
+)
+HAND_CLASS_CODES = {name: code for code, name in enumerate(HAND_CLASSES)}
 
 def evaluate_hand(cards):
+    # Accepts card ids or card names ("10 of Hearts", "Joker 1")
+    return HAND_CLASSES[evaluate_cards([to_card(card) for card in cards])]
+
+def evaluate_cards(cards):
+    # O(1) lookup: the product of the rank primes identifies the rank multiset,
+    # and the AND of the suit bits is non-zero only when every non-joker shares a suit
+    a, b, c, d, e = cards
+    key = CARD_PRIMES[a] * CARD_PRIMES[b] * CARD_PRIMES[c] * CARD_PRIMES[d] * CARD_PRIMES[e]
+    if CARD_SUIT_BITS[a] & CARD_SUIT_BITS[b] & CARD_SUIT_BITS[c] & CARD_SUIT_BITS[d] & CARD_SUIT_BITS[e]:
+        return FLUSH_TABLE[key]
+    return HAND_TABLE[key]
+
+# Hands scored per numpy pass in evaluate_hands; keeps the temporary arrays in cache
+EVALUATE_CHUNK_SIZE = 1 << 14
+
+def evaluate_hands(hands, chunk_size=EVALUATE_CHUNK_SIZE):
+    # Vectorized evaluate_cards for an (N, 5) array of card ids; returns N hand class codes
+    hands = np.asarray(hands)
+    if hands.ndim != 2 or hands.shape[1] != 5:
+        raise ValueError(f"Expected an (N, 5) array of card ids, got shape {hands.shape}")
+    tables = get_batch_tables()
+    result = np.empty(len(hands), dtype=np.int8)
+    for start in range(0, len(hands), chunk_size):
+        result[start:start + chunk_size] = evaluate_hands_chunk(tables, hands[start:start + chunk_size])
+    return result
+
+@lru_cache(maxsize=1)
+def get_batch_tables():
+    # Per-card numpy tables for evaluate_hands, built on first use. Rank fields are three
+    # bits wide (counts 0..4); value bits mark 2..14, with the Ace also counted as 1.
+    non_jokers = np.arange(52)
+    rank_fields = np.zeros(len(CARD_NAMES), dtype=np.int64)
+    rank_fields[:52] = 1 << (3 * (non_jokers % 13))
+    value_bits = np.zeros(len(CARD_NAMES), dtype=np.int64)
+    value_bits[:52] = (1 << (non_jokers % 13 + 2)) | np.where(non_jokers % 13 == 12, 1 << 1, 0)
+    suit_bits = np.asarray(CARD_SUIT_BITS, dtype=np.int8)
+    is_joker = (np.arange(len(CARD_NAMES)) >= 52).astype(np.int8)
+
+    # Cards missing from the most complete five-value window, for every set of value bits
+    all_bits = np.arange(1 << 15)
+    straight_gaps = np.full(1 << 15, 5, dtype=np.int8)
+    for start in range(1, 11):
+        in_window = sum((all_bits >> value) & 1 for value in range(start, start + 5))
+        np.minimum(straight_gaps, 5 - in_window, out=straight_gaps)
+    return rank_fields, value_bits, suit_bits, is_joker, straight_gaps
+
+def evaluate_hands_chunk(tables, cards):
+    rank_fields, value_bits, suit_bits, is_joker, straight_gaps = tables
+    cards = cards.astype(np.intp)
+    columns = [cards[:, column] for column in range(5)]
+
+    # Rank histogram packed three bits per rank, plus the rank presence bits by value
+    # and the common suit bits, accumulated one card column at a time
+    histogram = rank_fields[columns[0]].copy()
+    present = value_bits[columns[0]].copy()
+    common_suit = suit_bits[columns[0]].copy()
+    num_jokers = is_joker[columns[0]].copy()
+    for column in columns[1:]:
+        histogram += rank_fields[column]
+        present |= value_bits[column]
+        common_suit &= suit_bits[column]
+        num_jokers += is_joker[column]
+
+    is_flush = common_suit != 0
+    is_straight = straight_gaps[present] <= num_jokers
+
+    # Ranks held at least two, three and four times, as one bit per rank field
+    at_least_2 = ((histogram >> 1) | (histogram >> 2)) & RANK_FIELD_LOW_BITS
+    at_least_3 = ((histogram >> 2) | ((histogram >> 1) & histogram)) & RANK_FIELD_LOW_BITS
+    at_least_4 = (histogram >> 2) & RANK_FIELD_LOW_BITS
+    exactly_2 = at_least_2 & ~at_least_3
+
+    # Mirrors get_best_hand_with_jokers: the jokers are added to the largest rank count
+    top = 1 + (at_least_2 != 0) + (at_least_3 != 0) + (at_least_4 != 0) + num_jokers
+    two_groups = (at_least_2 & (at_least_2 - 1)) != 0
+    has_jokers = num_jokers > 0
+    pair_is_high = (exactly_2 & HIGH_PAIR_FIELDS) != 0
+    best_hand = np.select(
+        [
+            top == 4,
+            (top == 3) & (two_groups | has_jokers),
+            top == 3,
+            (top == 2) & two_groups,
+            (top == 2) & has_jokers,
+            (top == 2) & pair_is_high,
+            top == 2,
+            has_jokers,
+        ],
+        [
+            HAND_CLASS_CODES["FourOfAKind"],
+            HAND_CLASS_CODES["FullHouse"],
+            HAND_CLASS_CODES["ThreeOfAKind"],
+            HAND_CLASS_CODES["TwoPair"],
+            HAND_CLASS_CODES["ThreeOfAKind"],
+            HAND_CLASS_CODES["JacksOrBetter"],
+            HAND_CLASS_CODES["OnePair"],
+            HAND_CLASS_CODES["OnePair"],
+        ],
+        HAND_CLASS_CODES["HighCard"],
+    )
+
+    # evaluate_hand_reference checks best_hand against "Four of a Kind" and "Full House",
+    # which never match, so flushes and straights outrank every paired hand here too
+    is_straight_flush = is_straight & is_flush
+    return np.select(
+        [
+            is_straight_flush & (has_jokers | (present == ROYAL_VALUE_BITS)),
+            is_straight_flush,
+            is_flush,
+            is_straight,
+        ],
+        [
+            HAND_CLASS_CODES["RoyalFlush"],
+            HAND_CLASS_CODES["StraightFlush"],
+            HAND_CLASS_CODES["Flush"],
+            HAND_CLASS_CODES["Straight"],
+        ],
+        best_hand,
+    )
+
+def evaluate_hand_reference(cards):
+    # Original string-parsing evaluator. The lookup tables are generated from it,
+    # so it remains the definition of every hand class.
     # Handle Jokers
     jokers = [card for card in cards if 'Joker' in card]
     non_jokers = [card for card in cards if 'Joker' not in card]
@@ -118,3 +254,43 @@ def get_best_hand_with_jokers(rank_counts, num_jokers):
         return "OnePair"
     else:
         return "HighCard"
+
+# One prime per rank plus one for the jokers, so that equal products mean equal rank multisets
+RANK_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+JOKER_PRIME = 43
+CARD_PRIMES = [RANK_PRIMES[index % 13] for index in range(52)] + [JOKER_PRIME] * len(JOKERS)
+CARD_SUIT_BITS = [1 << (index // 13) for index in range(52)] + [0b1111] * len(JOKERS)
+
+# Masks over the packed rank histogram and value bits used by evaluate_hands
+RANK_FIELD_LOW_BITS = sum(1 << (3 * rank) for rank in range(13))
+HIGH_PAIR_FIELDS = sum(1 << (3 * rank) for rank in range(RANKS.index('Jack'), 13))
+ROYAL_VALUE_BITS = (0b11111 << 10) | (1 << 1)
+
+def build_lookup_tables():
+    # Enumerate every rank multiset (13 stands for a joker) and classify a representative
+    # hand with the reference evaluator, once off-suit and, where possible, as a flush
+    hand_table = {}
+    flush_table = {}
+    for ranks in combinations_with_replacement(range(14), 5):
+        num_jokers = ranks.count(13)
+        naturals = ranks[:5 - num_jokers]
+        if num_jokers > len(JOKERS) or any(naturals.count(rank) > 4 for rank in naturals):
+            continue
+        key = JOKER_PRIME ** num_jokers
+        for rank in naturals:
+            key *= RANK_PRIMES[rank]
+
+        suit_used = Counter()
+        off_suit = []
+        for rank in naturals:
+            off_suit.append(f"{RANKS[rank]} of {SUITS[suit_used[rank]]}")
+            suit_used[rank] += 1
+        if len(set(naturals)) == len(naturals):
+            suited = [f"{RANKS[rank]} of {SUITS[0]}" for rank in naturals]
+            flush_table[key] = HAND_CLASS_CODES[evaluate_hand_reference(suited + JOKERS[:num_jokers])]
+            # Distinct ranks all landed on the first suit, so move one card to break the flush
+            off_suit[-1] = f"{RANKS[naturals[-1]]} of {SUITS[1]}"
+        hand_table[key] = HAND_CLASS_CODES[evaluate_hand_reference(off_suit + JOKERS[:num_jokers])]
+    return hand_table, flush_table
+
+HAND_TABLE, FLUSH_TABLE = build_lookup_tables()
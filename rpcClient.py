@@ -0,0 +1,217 @@
+"""
+rpcClient.py
+
+The one JSON-RPC client every module uses to talk to the node. RPC.conf is read
+once, and calls reuse keep-alive HTTP connections from a small thread-safe pool.
+The pygame loop, the dealing workers and the entropy refills share the pool, so no
+call pays for a new TCP connection and auth setup.
+
+    rpc = get_rpc_client()
+    rpc.call("getblockcount")
+    rpc.listunspent(0, 9999999, [address])  # attribute calls, like AuthServiceProxy
+    rpc.batch([("getblockhash", [1]), ("getblockhash", [2])])
+
+Each method has its own timeout (METHOD_TIMEOUTS). Numbers in results are parsed
+as Decimal, and Decimal parameters are sent as numbers, as with AuthServiceProxy.
+An error answered by the node raises JSONRPCException with the node's error dict.
+A node that cannot be reached, or that answers something other than JSON-RPC,
+raises RpcConnectionError.
+
+Only read methods (READ_METHODS) are sent again when a reused connection turns out
+to have been closed by the node. Any other call (sendrawtransaction, importaddress)
+goes out once on a fresh connection, so it is never repeated behind the caller's back.
+"""
+
+import base64
+import configparser
+import decimal
+import http.client
+import json
+import os
+import sys
+import threading
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = 10
+# Seconds to wait for each method; wallet calls can take a while on a busy node
+METHOD_TIMEOUTS = {
+    "getblockcount": 10,
+    "getblockhash": 10,
+    "listunspent": 30,
+    "listaddressgroupings": 30,
+    "listsinceblock": 60,
+    "importaddress": 120,
+    "createrawtransaction": 10,
+    "fundrawtransaction": 30,
+    "signrawtransaction": 30,
+    "signrawtransactionwithwallet": 30,
+    "sendrawtransaction": 30,
+}
+# Calls that only read, so a request lost on a stale connection can safely be sent again
+READ_METHODS = {
+    "getbestblockhash", "getblockcount", "getblockhash", "gettransaction",
+    "decoderawtransaction", "listunspent", "listaddressgroupings", "listsinceblock",
+}
+# Idle connections kept open to the node; enough for the dealing workers, a
+# background refill and the UI at the same time
+POOL_SIZE = 16
+
+class JSONRPCException(RuntimeError):
+    def __init__(self, error):
+        super().__init__(f"{error.get('message')} (code {error.get('code')})")
+        self.error = error
+
+class RpcConnectionError(ConnectionError):
+    pass
+
+def get_config_path():
+    if getattr(sys, 'frozen', False):
+        # Running as compiled executable
+        return os.path.join(os.path.dirname(sys.executable), 'RPC.conf')
+    else:
+        # Running as script
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'RPC.conf')
+
+@lru_cache(maxsize=1)
+def load_config():
+    # The [rpcconfig] section of RPC.conf, read once
+    config_path = get_config_path()
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"RPC configuration file not found: {config_path}")
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    section = config['rpcconfig']
+    return {
+        'user': section['rpcuser'],
+        'password': section['rpcpassword'],
+        'host': section.get('rpchost', 'localhost'),
+        'port': section['rpcport'],
+    }
+
+def encode_decimal(value):
+    if isinstance(value, decimal.Decimal):
+        return float(round(value, 8))
+    raise TypeError(f"{value!r} is not JSON serializable")
+
+class RpcClient:
+    def __init__(self, url, user, password, pool_size=POOL_SIZE):
+        self.pool_size = pool_size
+        credentials = base64.b64encode(f"{user}:{password}".encode()).decode()
+        self.headers = {'Authorization': f"Basic {credentials}", 'Content-Type': 'application/json'}
+        self.lock = threading.Lock()
+        self.idle = []  # Open connections not in use, most recently used last
+        self.connections_opened = 0
+        self.url = url
+
+    @property
+    def url(self):
+        return self._url
+
+    @url.setter
+    def url(self, url):
+        # Pointing the client elsewhere (the benchmarks' stub node) drops the old connections
+        self._url = url
+        self.reset()
+
+    def open_connection(self, timeout):
+        parts = urlsplit(self.url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        with self.lock:
+            self.connections_opened += 1
+        return connection_class(parts.hostname, parts.port, timeout=timeout)
+
+    def acquire(self, timeout, reuse=True):
+        # An idle connection (reused) or a new one (not yet connected)
+        with self.lock:
+            connection = self.idle.pop() if reuse and self.idle else None
+        if connection is None:
+            return self.open_connection(timeout), False
+        return connection, True
+
+    def release(self, connection):
+        with self.lock:
+            if len(self.idle) < self.pool_size:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def reset(self):
+        # Close every idle connection, e.g. after the node restarted or changed address
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+    def timeout_for(self, method):
+        return METHOD_TIMEOUTS.get(method, DEFAULT_TIMEOUT)
+
+    def post(self, payload, timeout, read_only):
+        # A read-only request may use an idle connection and is sent again if the node had
+        # closed it; anything else is sent once, on a new connection
+        body = json.dumps(payload, default=encode_decimal)
+        path = urlsplit(self.url).path or '/'
+        while True:
+            connection, reused = self.acquire(timeout, reuse=read_only)
+            try:
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                connection.request('POST', path, body, self.headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                if reused and isinstance(e, (ConnectionError, http.client.RemoteDisconnected)):
+                    continue  # The node closed the idle connection; try a new one
+                raise RpcConnectionError(f"RPC request to {self.url} failed: {e}") from e
+            if response.will_close:
+                connection.close()
+            else:
+                self.release(connection)
+            try:
+                # The node answers RPC errors with HTTP 500 and a JSON body
+                return json.loads(data, parse_float=decimal.Decimal)
+            except ValueError:
+                raise RpcConnectionError(f"Non-JSON answer from {self.url}: HTTP {response.status} {response.reason}")
+
+    def call(self, method, *params, timeout=None):
+        payload = {"method": method, "params": list(params), "jsonrpc": "2.0", "id": 0}
+        reply = self.post(payload, timeout or self.timeout_for(method), method in READ_METHODS)
+        if reply.get('error'):
+            raise JSONRPCException(reply['error'])
+        return reply['result']
+
+    def batch(self, calls, timeout=None):
+        # Send [(method, params), ...] as one JSON-RPC batch array and return the results
+        # in call order. The node may answer a batch in any order, so replies are matched by id.
+        if not calls:
+            return []
+        payload = [
+            {"method": method, "params": params, "jsonrpc": "2.0", "id": call_id}
+            for call_id, (method, params) in enumerate(calls)
+        ]
+        timeout = timeout or max(self.timeout_for(method) for method, params in calls)
+        replies = self.post(payload, timeout, all(method in READ_METHODS for method, params in calls))
+        if isinstance(replies, dict):
+            # The whole batch was refused
+            raise JSONRPCException(replies.get('error') or {'message': 'Invalid batch reply', 'code': None})
+        replies = {reply['id']: reply for reply in replies}
+        results = []
+        for call_id, (method, params) in enumerate(calls):
+            reply = replies[call_id]
+            if reply.get('error'):
+                raise JSONRPCException(reply['error'])
+            results.append(reply['result'])
+        return results
+
+    def __getattr__(self, method):
+        # rpc.listunspent(...) is rpc.call("listunspent", ...)
+        if method.startswith('_'):
+            raise AttributeError(method)
+        return lambda *params, timeout=None: self.call(method, *params, timeout=timeout)
+
+@lru_cache(maxsize=1)
+def get_rpc_client():
+    config = load_config()
+    return RpcClient(f"http://{config['host']}:{config['port']}", config['user'], config['password'])
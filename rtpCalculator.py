@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+"""
+rtpCalculator.py
+
+Exact return to player of the pay table under optimal holds, for every coin column.
+
+Starting hands are reduced by suit isomorphism: a hand is identified by the sorted
+rank masks of its four suits plus its joker count, and each class is solved once
+with holdSolver and weighted by the number of hands it stands for. Classes are
+split into chunks solved by a multiprocessing pool; every finished chunk is written
+to the checkpoint directory so an interrupted run resumes where it stopped.
+
+Usage: python rtpCalculator.py [--workers N] [--no-jokers] [--checkpoint-dir DIR] [--output FILE]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from itertools import chain, combinations
+from math import comb, lcm
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from cards import DECK_SIZE, JOKER_1
+from holdSolver import NUM_CLASSES, compute_class_counts, get_subset_tables, payouts_for_bet
+from payTable import pay_table
+from pokerHandEvaluator import HAND_CLASSES
+
+BETS = range(1, 6)
+CHUNK_SIZE = 500
+DEFAULT_CHECKPOINT_DIR = "rtp_checkpoint"
+
+def starting_hand_classes(include_jokers=True):
+    # [(representative hand, number of starting hands it stands for)] under suit isomorphism
+    deck_size = DECK_SIZE if include_jokers else 52
+    count = comb(deck_size, 5)
+    hands = np.fromiter(chain.from_iterable(combinations(range(deck_size), 5)), dtype=np.int64, count=count * 5)
+    hands = hands.reshape(count, 5)
+
+    rows = np.arange(count)
+    suit_masks = np.zeros((count, 5), dtype=np.int64)  # column 4 collects the jokers
+    for column in hands.T:
+        is_joker = column >= JOKER_1
+        suit_masks[rows, np.where(is_joker, 4, column // 13)] += np.where(is_joker, 1, 1 << (column % 13))
+    natural_masks = -np.sort(-suit_masks[:, :4], axis=1)
+    keys = suit_masks[:, 4]
+    for suit in range(4):
+        keys = keys | (natural_masks[:, suit] << (2 + 13 * (3 - suit)))
+    keys, weights = np.unique(keys, return_counts=True)
+
+    classes = []
+    for key, weight in zip(keys.tolist(), weights.tolist()):
+        hand = []
+        for suit in range(4):
+            mask = key >> (2 + 13 * (3 - suit)) & 0x1FFF
+            hand.extend(suit * 13 + rank for rank in range(13) if mask >> rank & 1)
+        hand.extend(JOKER_1 + joker for joker in range(key & 0b11))
+        classes.append((hand, weight))
+    return classes
+
+# Every draw count C(remaining, k) divides this, so weighted EVs stay exact integers
+def draw_denominator(include_jokers):
+    remaining = (DECK_SIZE if include_jokers else 52) - 5
+    return lcm(*(comb(remaining + extra, k) for extra in range(3) for k in range(6)))
+
+def solve_chunk(task):
+    # Optimal hold per coin column for one chunk of starting hand classes
+    chunk_id, hand_classes, bet_payouts, include_jokers, denominator = task
+    start = time.perf_counter()
+    returns = [0] * len(bet_payouts)
+    frequencies = [[0] * NUM_CLASSES for _ in bet_payouts]
+    payout_matrix = np.asarray(bet_payouts, dtype=np.int64).T
+    for hand, weight in hand_classes:
+        counts = compute_class_counts(hand, include_jokers)
+        draws = counts.sum(axis=1)
+        totals = counts @ payout_matrix
+        evs = totals / draws[:, None]
+        for bet_index in range(len(bet_payouts)):
+            # Highest EV, first pattern on ties. Float EVs pick the candidates; near-ties
+            # are settled exactly on the common denominator.
+            column = evs[:, bet_index]
+            candidates = np.flatnonzero(column >= column.max() * (1 - 1e-9)).tolist()
+            best = max(candidates, key=lambda pattern: (int(totals[pattern, bet_index]) * (denominator // int(draws[pattern])), -pattern))
+            scale = denominator // int(draws[best])
+            returns[bet_index] += weight * int(totals[best, bet_index]) * scale
+            for hand_class, count in enumerate(counts[best].tolist()):
+                frequencies[bet_index][hand_class] += weight * count * scale
+    return {
+        "chunk": chunk_id,
+        "hands": sum(weight for hand, weight in hand_classes),
+        "classes": len(hand_classes),
+        "returns": returns,
+        "frequencies": frequencies,
+        "seconds": time.perf_counter() - start,
+        "worker": os.getpid(),
+    }
+
+def init_worker():
+    # Build the subset tables once per worker (a no-op when inherited through fork)
+    get_subset_tables()
+
+def settings_fingerprint(bet_payouts, include_jokers, chunk_size):
+    settings = json.dumps({"payouts": bet_payouts, "jokers": include_jokers, "chunk_size": chunk_size}, sort_keys=True)
+    return hashlib.sha256(settings.encode()).hexdigest()
+
+def write_json_atomic(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as file:
+        json.dump(data, file)
+    os.replace(temp_path, path)
+
+def load_checkpoint(checkpoint_dir, fingerprint):
+    # Finished chunk results from a previous run with the same settings
+    manifest_path = os.path.join(checkpoint_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            if json.load(file)["fingerprint"] != fingerprint:
+                raise ValueError(f"Checkpoint in {checkpoint_dir} was made with different settings; use another --checkpoint-dir")
+    else:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        write_json_atomic(manifest_path, {"fingerprint": fingerprint})
+    results = {}
+    for name in os.listdir(checkpoint_dir):
+        if name.startswith("chunk_") and name.endswith(".json"):
+            with open(os.path.join(checkpoint_dir, name)) as file:
+                result = json.load(file)
+            results[result["chunk"]] = result
+    return results
+
+def report(results, total_hands, denominator, wall_seconds, solved_now):
+    lines = []
+    total_returns = [sum(result["returns"][i] for result in results) for i in range(len(BETS))]
+    lines.append(f"Starting hands: {total_hands}")
+    lines.append("")
+    lines.append(f"{'Coins':>5}  {'RTP':>10}")
+    rtp = {}
+    for bet_index, bet in enumerate(BETS):
+        rtp[bet] = total_returns[bet_index] / (denominator * total_hands * bet)
+        lines.append(f"{bet:>5}  {rtp[bet] * 100:9.5f}%")
+
+    frequencies = {}
+    lines.append("")
+    lines.append("Final hand frequencies under optimal holds:")
+    lines.append(f"{'':16}" + "".join(f"{str(bet) + ' coin(s)':>14}" for bet in BETS))
+    for hand_class, name in enumerate(HAND_CLASSES):
+        row = []
+        for bet_index in range(len(BETS)):
+            total = sum(result["frequencies"][bet_index][hand_class] for result in results)
+            row.append(total / (denominator * total_hands))
+        frequencies[name] = row
+        lines.append(f"{name:16}" + "".join(f"{value:14.8f}" for value in row))
+
+    lines.append("")
+    lines.append("Throughput (chunks solved in this run):")
+    workers = {}
+    for result in solved_now:
+        worker = workers.setdefault(result["worker"], {"classes": 0, "seconds": 0.0})
+        worker["classes"] += result["classes"]
+        worker["seconds"] += result["seconds"]
+    for pid, worker in sorted(workers.items()):
+        lines.append(f"  worker {pid}: {worker['classes']} hand classes in {worker['seconds']:.1f} s "
+                     f"({worker['classes'] / worker['seconds']:.1f} classes/s)")
+    solved_classes = sum(result["classes"] for result in solved_now)
+    if wall_seconds > 0 and solved_classes:
+        lines.append(f"  total: {solved_classes / wall_seconds:.1f} classes/s over {wall_seconds:.1f} s wall time")
+    print("\n".join(lines))
+    return {"rtp": rtp, "frequencies": frequencies, "starting_hands": total_hands}
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact RTP of the pay table under optimal holds")
+    parser.add_argument("--workers", type=int, default=cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--no-jokers", action="store_true", help="use the 52-card deck DrawPoker deals from")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="hand classes per checkpointed chunk")
+    parser.add_argument("--checkpoint-dir", default=DEFAULT_CHECKPOINT_DIR)
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    include_jokers = not args.no_jokers
+    bet_payouts = [payouts_for_bet(pay_table, bet) for bet in BETS]
+    denominator = draw_denominator(include_jokers)
+    fingerprint = settings_fingerprint(bet_payouts, include_jokers, args.chunk_size)
+    try:
+        results = load_checkpoint(args.checkpoint_dir, fingerprint)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+
+    hand_classes = starting_hand_classes(include_jokers)
+    total_hands = sum(weight for hand, weight in hand_classes)
+    chunks = [hand_classes[start:start + args.chunk_size] for start in range(0, len(hand_classes), args.chunk_size)]
+    tasks = [(chunk_id, chunk, bet_payouts, include_jokers, denominator)
+             for chunk_id, chunk in enumerate(chunks) if chunk_id not in results]
+    print(f"{len(hand_classes)} starting hand classes in {len(chunks)} chunks, {len(results)} already checkpointed")
+
+    get_subset_tables()
+    solved_now = []
+    start = time.perf_counter()
+    try:
+        with Pool(args.workers, initializer=init_worker) as pool:
+            for result in pool.imap_unordered(solve_chunk, tasks):
+                write_json_atomic(os.path.join(args.checkpoint_dir, f"chunk_{result['chunk']:05d}.json"), result)
+                results[result["chunk"]] = result
+                solved_now.append(result)
+                print(f"  chunk {result['chunk']} done ({len(results)}/{len(chunks)})", file=sys.stderr)
+    except KeyboardInterrupt:
+        print(f"Interrupted; {len(results)}/{len(chunks)} chunks are checkpointed in {args.checkpoint_dir}")
+        sys.exit(1)
+    wall_seconds = time.perf_counter() - start
+
+    summary = report(list(results.values()), total_hands, denominator, wall_seconds, solved_now)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=2)
+
+if __name__ == "__main__":
+    main()
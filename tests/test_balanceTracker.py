@@ -0,0 +1,114 @@
+"""
+BalanceTracker against a simulated watch-only wallet: after every refresh the
+tracked balance must equal a full listunspent scan, other addresses' payments must
+never be decoded, and the hourly full scan must clear what the deltas kept.
+
+Usage: python -m pytest tests
+"""
+import random
+from decimal import Decimal
+
+import balanceTracker
+from balanceTracker import BalanceTracker
+
+POOL = "pool"
+OTHER = "player"  # Another address in the same watch-only wallet
+
+class FakeWallet:
+    def __init__(self):
+        self.blocks = ["b0"]
+        self.transactions = {}  # txid -> {"vin": [(txid, vout)], "vout": [(address, amount)], "block": height or None}
+        self.decoded = []  # txids passed to decoderawtransaction
+        self.listings = 0
+
+    def mine(self):
+        self.blocks.append(f"b{len(self.blocks)}")
+        for transaction in self.transactions.values():
+            if transaction["block"] is None:
+                transaction["block"] = len(self.blocks) - 1
+
+    def send(self, vin, vout):
+        txid = f"tx{len(self.transactions)}"
+        self.transactions[txid] = {"vin": vin, "vout": vout, "block": None}
+        return txid
+
+    def outputs_of(self, address):
+        return {(txid, vout) for txid, transaction in self.transactions.items()
+                for vout, (to, amount) in enumerate(transaction["vout"]) if to == address}
+
+    def unspent(self, address=POOL):
+        spent = {outpoint for transaction in self.transactions.values() for outpoint in transaction["vin"]}
+        return {(txid, vout): amount for txid, transaction in self.transactions.items()
+                for vout, (to, amount) in enumerate(transaction["vout"])
+                if to == address and (txid, vout) not in spent}
+
+    # The RPC calls BalanceTracker makes
+
+    def getbestblockhash(self):
+        return self.blocks[-1]
+
+    def listunspent(self, minconf, maxconf, addresses):
+        self.listings += 1
+        return [{"txid": txid, "vout": vout, "amount": amount} for (txid, vout), amount in self.unspent().items()]
+
+    def listsinceblock(self, block, confirmations, watch_only):
+        height = self.blocks.index(block)
+        wallet_outputs = self.outputs_of(POOL) | self.outputs_of(OTHER)
+        entries = []
+        for txid, transaction in self.transactions.items():
+            if transaction["block"] is not None and transaction["block"] <= height:
+                continue
+            for vout, (to, amount) in enumerate(transaction["vout"]):
+                if to in (POOL, OTHER):
+                    entries.append({"category": "receive", "address": to, "txid": txid, "vout": vout, "amount": amount})
+            if any(outpoint in wallet_outputs for outpoint in transaction["vin"]):
+                entries.append({"category": "send", "address": "elsewhere", "txid": txid, "vout": 0, "amount": -1})
+        return {"transactions": entries, "removed": [], "lastblock": self.blocks[-1]}
+
+    def batch(self, calls):
+        if calls[0][0] == "gettransaction":
+            return [{"hex": params[0]} for method, params in calls]
+        self.decoded.extend(params[0] for method, params in calls)
+        return [{"vin": [{"txid": txid, "vout": vout} for txid, vout in self.transactions[params[0]]["vin"]]}
+                for method, params in calls]
+
+def test_balance_matches_a_full_scan_after_every_refresh():
+    rng = random.Random(1)
+    wallet = FakeWallet()
+    for _ in range(50):
+        wallet.send([], [(POOL, Decimal(rng.randint(1, 100)))])
+    wallet.mine()
+    tracker = BalanceTracker([POOL], rpc=wallet)
+    tracker.refresh()
+    other_payments = set()
+    for step in range(200):
+        roll = rng.random()
+        unspent = list(wallet.unspent().items())
+        if roll < 0.3:
+            wallet.send([], [(POOL, Decimal(rng.randint(1, 100)))])
+        elif roll < 0.5:
+            other_payments.add(wallet.send([], [(OTHER, Decimal(rng.randint(1, 100)))]))
+        elif roll < 0.8 and unspent:
+            spent = rng.sample(unspent, min(len(unspent), rng.randint(1, 3)))
+            total = sum(amount for outpoint, amount in spent)
+            wallet.send([outpoint for outpoint, amount in spent], [("elsewhere", total - 1), (POOL, Decimal("0.5"))])
+        if rng.random() < 0.3:
+            wallet.mine()
+        tracker.refresh()
+        assert tracker.balance() == sum(wallet.unspent().values()), step
+    assert wallet.listings == 1
+    assert not other_payments & set(wallet.decoded)
+
+def test_full_scan_clears_the_delta_bookkeeping():
+    wallet = FakeWallet()
+    funding = wallet.send([], [(POOL, Decimal(10))])
+    wallet.mine()
+    tracker = BalanceTracker([POOL], rpc=wallet)
+    tracker.refresh()
+    wallet.send([(funding, 0)], [("elsewhere", Decimal(9))])
+    tracker.refresh()
+    assert tracker.decoded and tracker.spent
+    tracker.last_full_scan -= balanceTracker.FULL_SCAN_INTERVAL
+    tracker.refresh()
+    assert (tracker.decoded, tracker.spent, tracker.full_scans) == (set(), set(), 2)
+    assert tracker.balance() == 0
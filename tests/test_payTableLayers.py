@@ -0,0 +1,44 @@
+"""
+The pre-rendered pay table (DrawPoker.draw_pay_table) against drawing the table
+directly with render_pay_table, for every ranking and bet. Runs on SDL's dummy
+video and audio drivers.
+
+Usage: python -m pytest tests
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("BLOCK_HASH_CACHE", "")
+
+pygame = pytest.importorskip("pygame")
+DrawPoker = pytest.importorskip("DrawPoker")
+
+from pokerEngine import MAX_BET
+
+def table_area():
+    width = DrawPoker.PAY_TABLE_FIRST_COL_WIDTH + 5 * DrawPoker.PAY_TABLE_OTHER_COL_WIDTH
+    height = DrawPoker.PAY_TABLE_CELL_HEIGHT * (len(DrawPoker.pay_table) + 1)
+    return pygame.Rect((DrawPoker.WINDOW_WIDTH - width) // 2, DrawPoker.PAY_TABLE_TOP, width + 1, height + 1)
+
+def pixels(area):
+    return pygame.image.tobytes(DrawPoker.screen.subsurface(area), "RGB")
+
+@pytest.mark.parametrize("bet", range(1, MAX_BET + 1))
+def test_composited_table_matches_direct_drawing(bet):
+    screen = DrawPoker.screen
+    area = table_area()
+    saved_bet = DrawPoker.engine.bet
+    DrawPoker.engine.bet = bet
+    try:
+        for ranking in [None] + list(DrawPoker.pay_table):
+            screen.fill(DrawPoker.COLORS['background'])
+            DrawPoker.draw_pay_table(ranking)
+            composited = pixels(area)
+            screen.fill(DrawPoker.COLORS['background'])
+            DrawPoker.render_pay_table(screen.subsurface(area), ranking, bet)
+            assert composited == pixels(area), f"ranking {ranking}, bet {bet}"
+    finally:
+        DrawPoker.engine.bet = saved_bet
@@ -0,0 +1,143 @@
+"""
+Money handling in DrawPokerEngine: the bet, the payout, the cancel_hand refund and
+the double-up. Cards come from a scripted card source, so every hand is known.
+
+Usage: python -m pytest tests
+"""
+import pytest
+
+from cards import card_index
+from pokerEngine import DBL_UP, DEAL, NEW_GAME, DrawPokerEngine
+
+def cards(*names):
+    return [card_index(name) for name in names]
+
+def scripted_source(*deals):
+    # Hands out the given card lists in order, one per request
+    deals = list(deals)
+
+    def card_source(count, drawn):
+        dealt = deals.pop(0)
+        assert len(dealt) == count
+        return dealt
+    return card_source
+
+def test_deal_draw_and_payout():
+    engine = DrawPokerEngine(scripted_source(
+        cards("Jack of Hearts", "Jack of Spades", "2 of Clubs", "5 of Diamonds", "9 of Clubs"),
+        cards("Jack of Clubs", "3 of Hearts", "4 of Spades"),
+    ), credits=10)
+    engine.change_bet(1)
+    engine.start_hand()
+    assert (engine.state, engine.credits, engine.ranking) == (DEAL, 8, "JacksOrBetter")
+    engine.toggle_hold(0)
+    engine.toggle_hold(1)
+    assert engine.draw() == "ThreeOfAKind"
+    assert engine.hand[:2] == cards("Jack of Hearts", "Jack of Spades")
+    assert (engine.state, engine.win, engine.credits) == (NEW_GAME, 6, 8)
+    engine.take_win()
+    assert (engine.win, engine.credits) == (0, 14)
+
+def test_next_hand_banks_an_untaken_win():
+    engine = DrawPokerEngine(scripted_source(
+        cards("Ace of Hearts", "Ace of Spades", "2 of Clubs", "5 of Diamonds", "9 of Clubs"),
+        cards("3 of Hearts", "4 of Spades", "7 of Clubs"),
+        cards("2 of Hearts", "4 of Clubs", "6 of Diamonds", "8 of Spades", "10 of Clubs"),
+    ), credits=5)
+    engine.start_hand()
+    engine.toggle_hold(0)
+    engine.toggle_hold(1)
+    engine.draw()
+    assert (engine.win, engine.credits) == (1, 4)
+    engine.start_hand()
+    assert (engine.win, engine.credits) == (0, 4)
+
+def test_losing_hand_pays_nothing():
+    engine = DrawPokerEngine(scripted_source(
+        cards("2 of Hearts", "4 of Clubs", "6 of Diamonds", "8 of Spades", "10 of Clubs"),
+        cards("3 of Hearts", "5 of Spades", "7 of Clubs", "9 of Diamonds", "Queen of Clubs"),
+    ), credits=3)
+    engine.start_hand()
+    assert engine.draw() == "HighCard"
+    assert (engine.state, engine.win, engine.credits) == (NEW_GAME, 0, 2)
+
+def test_cancel_hand_refunds_the_bet():
+    engine = DrawPokerEngine(credits=10)
+    engine.change_bet(2)
+    engine.begin_hand()
+    assert (engine.state, engine.credits) == (DEAL, 7)
+    engine.cancel_hand()
+    assert (engine.state, engine.credits) == (NEW_GAME, 10)
+
+def test_cancel_hand_after_the_deal_keeps_the_bet():
+    engine = DrawPokerEngine(scripted_source(
+        cards("2 of Hearts", "4 of Clubs", "6 of Diamonds", "8 of Spades", "10 of Clubs"),
+    ), credits=10)
+    engine.start_hand()
+    engine.cancel_hand()
+    assert (engine.state, engine.credits) == (DEAL, 9)
+
+def test_bets_need_credits():
+    engine = DrawPokerEngine(credits=0)
+    with pytest.raises(ValueError):
+        engine.begin_hand()
+    engine = DrawPokerEngine(credits=2)
+    engine.change_bet(2)
+    with pytest.raises(ValueError):
+        engine.begin_hand()
+
+def won_hand(*double_up_cards):
+    # An engine in NEW_GAME with a win of 2 (two pair at a bet of 1) and 9 credits
+    engine = DrawPokerEngine(scripted_source(
+        cards("King of Hearts", "King of Spades", "5 of Clubs", "5 of Diamonds", "9 of Clubs"),
+        *[[card] for card in double_up_cards],
+    ), credits=10)
+    engine.start_hand()
+    for position in range(5):
+        engine.toggle_hold(position)
+    engine.finish_draw([])
+    assert (engine.win, engine.credits) == (2, 9)
+    return engine
+
+def test_double_up_color_win():
+    engine = won_hand(card_index("7 of Diamonds"))
+    engine.enter_double_up()
+    assert engine.double_up("red") == 4
+    assert engine.state == DBL_UP
+    engine.leave_double_up()
+    assert (engine.state, engine.win, engine.credits) == (NEW_GAME, 0, 13)
+
+def test_double_up_suit_win():
+    engine = won_hand(card_index("Queen of Clubs"))
+    engine.enter_double_up()
+    assert engine.double_up("clubs") == 8
+    engine.leave_double_up()
+    assert engine.credits == 17
+
+def test_double_up_loss_clears_the_win():
+    engine = won_hand(card_index("Ace of Spades"))
+    engine.enter_double_up()
+    assert engine.double_up("red") == 0
+    assert (engine.state, engine.win, engine.credits) == (NEW_GAME, 0, 9)
+    with pytest.raises(ValueError):
+        engine.leave_double_up()
+
+def test_double_up_twice_then_leave():
+    engine = won_hand(card_index("2 of Hearts"), card_index("3 of Spades"))
+    engine.enter_double_up()
+    engine.double_up("red")
+    engine.double_up("black")
+    assert engine.win == 8
+    engine.leave_double_up()
+    assert engine.credits == 17
+
+def test_double_up_needs_a_win_and_a_choice():
+    engine = DrawPokerEngine(credits=5)
+    with pytest.raises(ValueError):
+        engine.enter_double_up()
+    engine = won_hand()
+    engine.enter_double_up()
+    with pytest.raises(ValueError):
+        engine.begin_double_up()
+    with pytest.raises(ValueError):
+        engine.choose_double_up("green")
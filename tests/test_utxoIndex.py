@@ -0,0 +1,163 @@
+"""
+UtxoIndex and cashOut.send_lucky against a fake node: seeding, inputs held back
+while a broadcast is in flight, our own change spendable at once, reconciles that
+run before and after the node has seen a broadcast, and a broadcast whose outcome
+is unknown.
+
+Usage: python -m pytest tests
+"""
+import hashlib
+from decimal import Decimal
+
+import pytest
+from ecdsa import SECP256k1, SigningKey
+
+import cashOut
+import utxoIndex
+from rpcClient import JSONRPCException, RpcConnectionError
+from utxoIndex import UtxoIndex
+
+PRIVKEY_HEX = hashlib.sha256(b"utxo index test key").hexdigest()
+
+def address_of(privkey_hex):
+    public_key = SigningKey.from_string(bytes.fromhex(privkey_hex), curve=SECP256k1).get_verifying_key()
+    return cashOut.public_key_to_address(public_key.to_string("compressed"))
+
+def pool_address():
+    return address_of(PRIVKEY_HEX)
+
+# The player being paid
+OTHER_ADDRESS = address_of(hashlib.sha256(b"utxo index test player").hexdigest())
+
+class FakeNode:
+    def __init__(self, script_pubkey, amounts):
+        self.script_pubkey = script_pubkey
+        # (txid, vout) -> [amount in coins, confirmations]
+        self.unspent = {(hashlib.sha256(bytes([index])).hexdigest(), 0): [Decimal(amount), 10]
+                        for index, amount in enumerate(amounts)}
+        self.listings = 0
+        self.broadcasts = []
+        self.broadcast_error = None
+
+    def listunspent(self, minconf, maxconf, addresses):
+        self.listings += 1
+        return [{'txid': txid, 'vout': vout, 'amount': amount, 'scriptPubKey': self.script_pubkey,
+                 'confirmations': confirmations}
+                for (txid, vout), (amount, confirmations) in self.unspent.items()]
+
+    def sendrawtransaction(self, raw_tx_hex):
+        if self.broadcast_error is not None:
+            raise self.broadcast_error
+        self.broadcasts.append(raw_tx_hex)
+        return cashOut.transaction_id(bytes.fromhex(raw_tx_hex))
+
+    def accept(self, txid, tx, address):
+        # The node has seen the transaction: its inputs are spent, its change unconfirmed
+        for txin in tx['inputs']:
+            del self.unspent[(txin['txid'], txin['vout'])]
+        for vout, txout in enumerate(tx['outputs']):
+            if txout['address'] == address:
+                self.unspent[(txid, vout)] = [Decimal(txout['amount']) / Decimal(10**8), 0]
+
+@pytest.fixture
+def node(monkeypatch):
+    address = pool_address()
+    node = FakeNode(cashOut.create_script_pubkey(address), [5, 5, 5, 5])
+    monkeypatch.setattr(cashOut, "from_address", address)
+    monkeypatch.setattr(cashOut, "dev_fee_address", address)
+    monkeypatch.setattr(cashOut, "privkey_hex", PRIVKEY_HEX)
+    monkeypatch.setattr(cashOut, "get_rpc_client", lambda: node)
+    monkeypatch.setattr(utxoIndex, "get_rpc_client", lambda: node)
+    # A fresh index per test, without the background reconcile thread
+    monkeypatch.setattr(UtxoIndex, "start", lambda self: None)
+    cashOut.get_utxo_index.cache_clear()
+    yield node
+    cashOut.get_utxo_index.cache_clear()
+
+def outpoints(utxos):
+    return {(utxo['transaction_hash'], utxo['index']) for utxo in utxos}
+
+def spend(index, address, amount_satoshis):
+    # Build a transaction from the index the way send_lucky does, and record its broadcast
+    tx = cashOut.create_raw_transaction(index.utxos(), OTHER_ADDRESS, amount_satoshis, 2250000, 0)
+    tx['outputs'][-1]['address'] = address  # Change back to the pool
+    txid = hashlib.sha256(repr(tx).encode()).hexdigest()
+    index.record_broadcast(txid, tx)
+    return txid, tx
+
+def test_back_to_back_cashouts_list_once_and_never_reuse_inputs(node):
+    index = cashOut.get_utxo_index(cashOut.from_address)
+    for cashouts in range(1, 4):
+        assert cashOut.send_lucky(OTHER_ADDRESS, 3, 1) is not None
+        # Each cashout spent one new input, none of which is offered again
+        assert len(index.in_flight) == cashouts
+        assert not outpoints(index.utxos()) & set(index.in_flight)
+    assert node.listings == 1
+    assert len(node.broadcasts) == 3
+
+def test_change_is_spendable_before_the_node_lists_it(node):
+    address = cashOut.from_address
+    index = UtxoIndex(address, rpc=node)
+    txid, tx = spend(index, address, 300000000)
+    change = (txid, len(tx['outputs']) - 1)
+    assert change in outpoints(index.utxos())
+    # A reconcile from before the node saw the broadcast keeps the inputs out and the change in
+    index.reconcile()
+    assert change in outpoints(index.utxos())
+    assert set(index.in_flight) == {(txin['txid'], txin['vout']) for txin in tx['inputs']}
+    # Once the node has it, the inputs are gone and the unconfirmed change is ours to spend
+    node.accept(txid, tx, address)
+    index.reconcile()
+    assert change in outpoints(index.utxos())
+    assert (index.in_flight, index.pending_change) == ({}, {})
+
+def test_spending_change_chains_on_unconfirmed_outputs(node):
+    address = cashOut.from_address
+    while len(node.unspent) > 1:
+        del node.unspent[sorted(node.unspent)[0]]
+    index = UtxoIndex(address, rpc=node)
+    first, first_tx = spend(index, address, 300000000)
+    second, second_tx = spend(index, address, 100000000)
+    assert (first, len(first_tx['outputs']) - 1) in {(txin['txid'], txin['vout']) for txin in second_tx['inputs']}
+    node.accept(first, first_tx, address)
+    node.accept(second, second_tx, address)
+    index.reconcile()
+    assert (second, len(second_tx['outputs']) - 1) in outpoints(index.utxos())
+    assert (first, len(first_tx['outputs']) - 1) not in outpoints(index.utxos())
+
+def test_dropped_broadcast_releases_its_inputs(node, monkeypatch):
+    address = cashOut.from_address
+    index = UtxoIndex(address, rpc=node)
+    txid, tx = spend(index, address, 300000000)
+    clock = [utxoIndex.time.monotonic()]
+    monkeypatch.setattr(utxoIndex.time, "monotonic", lambda: clock[0])
+    index.reconcile()
+    assert index.in_flight
+    clock[0] += utxoIndex.IN_FLIGHT_TIMEOUT
+    index.reconcile()
+    assert (index.in_flight, index.pending_change) == ({}, {})
+    assert outpoints(index.utxos()) == set(node.unspent)
+
+def test_other_unconfirmed_payments_wait_for_confirmations(node):
+    node.unspent[("f" * 64, 0)] = [Decimal(7), 0]
+    index = UtxoIndex(cashOut.from_address, rpc=node)
+    assert ("f" * 64, 0) not in outpoints(index.utxos())
+
+def test_refused_broadcast_relists_the_node(node):
+    node.broadcast_error = JSONRPCException({'message': 'missing inputs', 'code': -25})
+    assert cashOut.send_lucky(OTHER_ADDRESS, 1, 0) is None
+    assert cashOut.get_utxo_index(cashOut.from_address).outputs is None
+    cashOut.get_utxo_index(cashOut.from_address).utxos()
+    assert node.listings == 2
+
+def test_unknown_broadcast_outcome_holds_the_inputs_back(node):
+    node.broadcast_error = RpcConnectionError("timed out")
+    assert cashOut.send_lucky(OTHER_ADDRESS, 3, 1) is None
+    index = cashOut.get_utxo_index(cashOut.from_address)
+    held = set(index.in_flight)
+    assert len(held) == 1 and not held & outpoints(index.utxos())
+    # The change of a transaction that may not exist is not spent
+    assert index.pending_change == {}
+    node.broadcast_error = None
+    assert cashOut.send_lucky(OTHER_ADDRESS, 3, 1) is not None
+    assert len(index.in_flight) == 2
@@ -0,0 +1,95 @@
+"""
+uiTimeline.py
+
+Timed UI states (messages, overlays, reveal pauses, delayed calls) kept on a
+timeline instead of blocking waits. The main loop reads the clock and calls update()
+once a frame; a state is active from the time it was added until its duration has
+passed, then it is removed and its on_end callback runs. Nothing ever sleeps, so
+events keep being handled while a message or overlay is on screen.
+
+States of one kind can be queued: queue() starts one right away if none of that
+kind is showing, else it waits its turn, so a burst of messages shows one after
+another rather than stacking up. Times are in milliseconds of the clock the
+timeline was given (pygame.time.get_ticks in the game).
+"""
+
+import itertools
+import time
+from collections import deque
+
+def monotonic_ms():
+    return int(time.monotonic() * 1000)
+
+class TimedState:
+    def __init__(self, state_id, kind, start, duration, on_end, data):
+        self.id = state_id
+        self.kind = kind
+        self.start = start
+        self.end = start + duration
+        self.on_end = on_end
+        self.data = data
+
+class Timeline:
+    def __init__(self, clock=monotonic_ms, max_queued=3):
+        self.clock = clock
+        # Longest wait per kind; when more are queued the oldest waiting one is dropped
+        self.max_queued = max_queued
+        self.states = []
+        self.queues = {}  # kind -> deque of (duration, on_end, data) waiting to start
+        self.ids = itertools.count()
+
+    def add(self, kind, duration, on_end=None, **data):
+        state = TimedState(next(self.ids), kind, self.clock(), duration, on_end, data)
+        self.states.append(state)
+        return state
+
+    def queue(self, kind, duration, on_end=None, **data):
+        # Start now if nothing of this kind is active, else after the ones before it
+        if not self.is_active(kind):
+            return self.add(kind, duration, on_end, **data)
+        waiting = self.queues.setdefault(kind, deque())
+        if (duration, on_end, data) not in waiting:
+            waiting.append((duration, on_end, data))
+            while len(waiting) > self.max_queued:
+                waiting.popleft()
+        return None
+
+    def after(self, delay, callback):
+        # Call `callback` from update() once `delay` has passed
+        return self.add("call", delay, callback)
+
+    def cancel(self, kind):
+        # End every state of a kind now, without its callbacks, and drop its queue
+        self.states = [state for state in self.states if state.kind != kind]
+        self.queues.pop(kind, None)
+
+    def update(self):
+        now = self.clock()
+        ended = [state for state in self.states if state.end <= now]
+        if not ended:
+            return
+        self.states = [state for state in self.states if state.end > now]
+        for state in ended:
+            waiting = self.queues.get(state.kind)
+            if waiting and not self.is_active(state.kind):
+                duration, on_end, data = waiting.popleft()
+                self.add(state.kind, duration, on_end, **data)
+        for state in ended:
+            if state.on_end is not None:
+                state.on_end()
+
+    def active(self, kind):
+        return [state for state in self.states if state.kind == kind]
+
+    def is_active(self, kind):
+        return any(state.kind == kind for state in self.states)
+
+    def snapshot(self, kinds):
+        # Ids of the active states of these kinds; changes whenever one starts or ends
+        return tuple(state.id for state in self.states if state.kind in kinds)
+
+    def time_to_next_change(self, longest):
+        # Milliseconds until the next state ends, at most `longest`
+        if not self.states:
+            return longest
+        return max(0, min(longest, min(state.end for state in self.states) - self.clock()))
@@ -0,0 +1,138 @@
+"""
+utxoIndex.py
+
+In-process set of one address's unspent outputs, for cashOut. The set is seeded
+by one listunspent and then kept current locally:
+
+- record_broadcast(txid, tx) takes the inputs of a broadcast transaction out of
+  the set at once. The next cashout cannot pick them, even before the node has
+  seen the transaction.
+- The same call adds the transaction's change back to the address. The change
+  can be spent right away, although it is unconfirmed.
+- record_possible_broadcast(txid, tx) is for a broadcast whose outcome is unknown
+  (the connection failed). The inputs are held back the same way, but the change
+  is only used once the node lists it.
+- A background thread reconciles with the node every RECONCILE_INTERVAL
+  seconds. An input that the node still lists as unspent IN_FLIGHT_TIMEOUT after
+  its broadcast is released, because the transaction never made it.
+
+Outputs are dicts in cashOut's format: transaction_hash, index, value (satoshis)
+and scriptPubKey. Other people's unconfirmed payments are left out until they
+have min_confirmations, as cashOut always did.
+"""
+
+import logging
+import threading
+import time
+from decimal import Decimal
+
+from rpcClient import JSONRPCException, RpcConnectionError, get_rpc_client
+
+RECONCILE_INTERVAL = 5 * 60
+IN_FLIGHT_TIMEOUT = 30 * 60
+
+def to_satoshis(amount):
+    return int(Decimal(str(amount)) * Decimal('1e8'))
+
+class UtxoIndex:
+    def __init__(self, address, rpc=None, min_confirmations=1, reconcile_interval=RECONCILE_INTERVAL):
+        self.address = address
+        self.rpc = rpc  # The shared client unless one is given, looked up on first use
+        self.min_confirmations = min_confirmations
+        self.reconcile_interval = reconcile_interval
+        self.lock = threading.Lock()
+        self.outputs = None  # (txid, vout) -> output, None until seeded
+        self.in_flight = {}  # (txid, vout) spent by a broadcast transaction -> time of the broadcast
+        self.own_txids = set()  # Our broadcasts, whose unconfirmed change is spendable
+        self.pending_change = {}  # (txid, vout) -> (output, time) of change the node has not listed yet
+        self.thread = None
+        self.listings = 0
+
+    def reconcile(self):
+        # Replace the set with the node's listing, keeping in-flight spends out of it
+        if self.rpc is None:
+            self.rpc = get_rpc_client()
+        listed = self.rpc.listunspent(0, 9999999, [self.address])
+        now = time.monotonic()
+        with self.lock:
+            outputs = {}
+            for utxo in listed:
+                if utxo.get('confirmations', 0) < self.min_confirmations and utxo['txid'] not in self.own_txids:
+                    continue
+                outputs[(utxo['txid'], utxo['vout'])] = {
+                    'transaction_hash': utxo['txid'],
+                    'index': utxo['vout'],
+                    'value': to_satoshis(utxo['amount']),
+                    'scriptPubKey': utxo['scriptPubKey'],
+                }
+            for outpoint, broadcast_at in list(self.in_flight.items()):
+                # Gone from the listing: the node has seen the spend. Still listed long
+                # after the broadcast: the transaction was dropped.
+                if outpoint not in outputs or now - broadcast_at >= IN_FLIGHT_TIMEOUT:
+                    del self.in_flight[outpoint]
+                    if outpoint not in outputs:
+                        self.pending_change.pop(outpoint, None)
+            # Change from a broadcast the listing predates stays until the node lists it
+            for outpoint, (output, broadcast_at) in list(self.pending_change.items()):
+                if outpoint in outputs or now - broadcast_at >= IN_FLIGHT_TIMEOUT:
+                    del self.pending_change[outpoint]
+                else:
+                    outputs[outpoint] = output
+            self.outputs = outputs
+            self.listings += 1
+
+    def utxos(self):
+        # The spendable outputs, seeding the set on first use
+        if self.outputs is None:
+            self.reconcile()
+            self.start()
+        with self.lock:
+            return [dict(output) for outpoint, output in self.outputs.items() if outpoint not in self.in_flight]
+
+    def record_broadcast(self, txid, tx):
+        # Spend the inputs of a transaction we broadcast and add its change to the set
+        now = time.monotonic()
+        with self.lock:
+            self.own_txids.add(txid)
+            for txin in tx['inputs']:
+                self.in_flight[(txin['txid'], txin['vout'])] = now
+            for vout, txout in enumerate(tx['outputs']):
+                if txout['address'] == self.address:
+                    output = {
+                        'transaction_hash': txid,
+                        'index': vout,
+                        'value': txout['amount'],
+                        # Change goes back to the address the inputs came from
+                        'scriptPubKey': tx['inputs'][0]['scriptPubKey'],
+                    }
+                    self.pending_change[(txid, vout)] = (output, now)
+                    if self.outputs is not None:
+                        self.outputs[(txid, vout)] = output
+
+    def record_possible_broadcast(self, txid, tx):
+        # The node may or may not have the transaction: keep its inputs out of the set
+        # until a reconcile shows them spent or IN_FLIGHT_TIMEOUT releases them
+        now = time.monotonic()
+        with self.lock:
+            self.own_txids.add(txid)
+            for txin in tx['inputs']:
+                self.in_flight[(txin['txid'], txin['vout'])] = now
+
+    def invalidate(self):
+        # The set disagrees with the node (a broadcast was refused); re-list before the next use
+        with self.lock:
+            self.outputs = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            time.sleep(self.reconcile_interval)
+            try:
+                self.reconcile()
+            except (RpcConnectionError, JSONRPCException) as e:
+                logging.warning(f"UTXO reconcile for {self.address} failed: {e}")